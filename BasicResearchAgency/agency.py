@@ -10,6 +10,10 @@ import os
 import sys
 
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+# Modules in mcp/ and agents/ import their neighbours by module name (the
+# report archive lives with the MCP server, the Qloo client with its tool)
+for directory in ("mcp", "agents"):
+    sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), directory))
 
 from agency_swarm import Agency, Agent
 from agents import WebSearchTool, HostedMCPTool, QlooInsightsTool
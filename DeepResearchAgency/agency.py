@@ -5,19 +5,24 @@ Deep Research Agency
 Four-agent handoffs pattern with clarification workflow.
 Triage → [Clarifying, Instruction] → Research using deep research model.
 """
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+# Modules in mcp/ and agents/ import their neighbours by module name (the
+# report archive lives with the MCP server, the Qloo client with its tool)
+for directory in ("mcp", "agents"):
+    sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), directory))
+
 from agency_swarm import Agency, Agent
 from ClarifyingAgent.ClarifyingAgent import ClarifyingAgent
 from InstructionBuilderAgent.InstructionBuilderAgent import InstructionBuilderAgent
 from ResearchAgent.ResearchAgent import ResearchAgent
 from utils import run_agency_demo
 
-import os
-import sys
-
 from dotenv import load_dotenv
 
 load_dotenv()
-sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 research_agent = ResearchAgent()
 instruction_builder_agent = InstructionBuilderAgent(research_agent)
@@ -4,17 +4,29 @@ Qloo Insights Tool for Cultural Intelligence
 Integrates with Qloo's Taste AI API to provide cultural and consumer preference insights.
 """
 
+import asyncio
 import json
 import logging
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-import httpx
 from agency_swarm.tools import BaseTool
 from pydantic import BaseModel, Field
 
+# Helper modules are imported by name: agents/ is on sys.path (see the agency
+# entry points, tests/conftest.py and the benchmarks)
+from qloo_cache import cache_key, get_cache
+from qloo_client import ENDPOINTS, build_request, get_insights
+from qloo_limits import get_guard
+
 logger = logging.getLogger(__name__)
 
+# Batch mode: API requests in flight at once, and per tool call
+QLOO_BATCH_CONCURRENCY = int(os.getenv("QLOO_BATCH_CONCURRENCY", "4"))
+QLOO_BATCH_MAX_REQUESTS = int(os.getenv("QLOO_BATCH_MAX_REQUESTS", "12"))
+
+PRIVACY_NOTE = "*Cultural insights powered by Qloo's Taste AI™ - privacy-first cultural intelligence with no personal identifying data.*\n"
+
 
 class QlooInsightsTool(BaseTool):
     """
@@ -49,10 +61,25 @@ class QlooInsightsTool(BaseTool):
         description="Type of insight to retrieve: 'recommendations', 'affinities', 'trends', or 'analysis'"
     )
 
-    def run(self) -> str:
+    entities: Optional[List[str]] = Field(
+        default=None,
+        description="Batch mode: more entities to analyze alongside 'entity' in the same call, for comparisons (e.g., ['Adidas', 'Puma'])"
+    )
+
+    insight_types: Optional[List[str]] = Field(
+        default=None,
+        description="Batch mode: several insight types to retrieve at once, replacing 'insight_type' (e.g., ['recommendations', 'affinities', 'trends'])"
+    )
+
+    async def run(self) -> str:
         """
         Execute Qloo API call to get cultural insights.
-        
+
+        The call is awaited by the agent runtime and goes through the
+        process-wide pooled HTTP client, so it neither blocks a worker thread
+        nor pays a new connection handshake. Responses are cached (see
+        qloo_cache); if the API fails, the last good response is returned.
+
         Returns:
             str: Formatted cultural insights and recommendations
         """
@@ -60,89 +87,140 @@ class QlooInsightsTool(BaseTool):
         if not api_key:
             return "❌ Error: QLOO_API_KEY not found in environment variables. Please set your Qloo API key."
 
+        if self.entities or self.insight_types:
+            return await self._run_batch(api_key)
+
         try:
             # Prepare API request
-            insights = self._get_qloo_insights(api_key)
+            insights, status, age = await self._get_qloo_insights(api_key)
             
             if not insights:
                 return f"No cultural insights found for '{self.entity}'. The entity might not be in Qloo's database or the API request failed."
             
             # Format the response
-            return self._format_insights(insights)
+            formatted = self._format_insights(insights)
+            if status == "fallback":
+                formatted += f"*⚠️ The Qloo API is unavailable; these are cached insights from {age / 3600:.1f} hours ago.*\n"
+            return formatted
             
         except Exception as e:
             logger.error(f"Qloo API error: {e}")
             return f"❌ Error accessing Qloo API: {str(e)}"
 
-    def _get_qloo_insights(self, api_key: str) -> Dict[str, Any]:
+    async def _run_batch(self, api_key: str) -> str:
+        """
+        Retrieve every (entity, insight type) combination in one tool call.
+
+        Requests run concurrently, at most QLOO_BATCH_CONCURRENCY at a time,
+        and are merged into one response with a section per entity. Failed
+        requests are listed at the end instead of failing the whole batch.
+
+        Returns:
+            str: Formatted insights for all entities
         """
-        Make API call to Qloo's Taste AI API.
+        entities = self._unique([self.entity, *(self.entities or [])])
+        insight_types = self._unique(self.insight_types or [self.insight_type], key=lambda t: ENDPOINTS.get(t, ENDPOINTS["recommendations"]))
+        requests = [(entity, insight_type) for entity in entities for insight_type in insight_types]
+        if len(requests) > QLOO_BATCH_MAX_REQUESTS:
+            return f"❌ Error: {len(entities)} entities × {len(insight_types)} insight types is {len(requests)} Qloo requests, more than the {QLOO_BATCH_MAX_REQUESTS} allowed per call. Please split the batch."
+
+        semaphore = asyncio.Semaphore(QLOO_BATCH_CONCURRENCY)
+
+        async def fetch(entity: str, insight_type: str):
+            async with semaphore:
+                return await self._get_qloo_insights(api_key, entity, insight_type)
+
+        results = await asyncio.gather(*(fetch(*request) for request in requests), return_exceptions=True)
+
+        merged: Dict[str, Dict[str, Any]] = {entity: {} for entity in entities}
+        failures, notes = [], []
+        for (entity, insight_type), result in zip(requests, results):
+            if isinstance(result, Exception):
+                logger.error(f"Qloo API error for {insight_type} of '{entity}': {result}")
+                failures.append(f"- {insight_type} for '{entity}': {result}")
+                continue
+            insights, status, age = result
+            for key, value in (insights or {}).items():
+                if key == "metadata":
+                    merged[entity].setdefault(key, value)
+                else:
+                    merged[entity][key] = value
+            if status == "fallback":
+                notes.append(f"- {insight_type} for '{entity}': cached insights from {age / 3600:.1f} hours ago")
+
+        if len(failures) == len(requests):
+            return "❌ Error accessing Qloo API:\n" + "\n".join(failures)
+
+        formatted = f"# 🎯 Qloo Cultural Insights: {' vs '.join(entities)}\n\n"
+        for entity in entities:
+            if merged[entity]:
+                formatted += self._format_insights(merged[entity], entity=entity, footer=False)
+            else:
+                formatted += f"## 🎯 Qloo Cultural Insights for '{entity}'\n\nNo cultural insights found for '{entity}'.\n\n"
+        if notes:
+            formatted += "### ⚠️ Qloo API Unavailable, Showing Cached Insights\n\n" + "\n".join(notes) + "\n\n"
+        if failures:
+            formatted += "### ⚠️ Partial Results\n\nThese requests failed:\n" + "\n".join(failures) + "\n\n"
+        formatted += "---\n" + PRIVACY_NOTE
+        return formatted
+
+    @staticmethod
+    def _unique(values: List[str], key=lambda value: " ".join(value.casefold().split())) -> List[str]:
+        """Drop duplicates (by key) and blanks, keeping the first spelling and order."""
+        seen, unique = set(), []
+        for value in values:
+            if value.strip() and key(value) not in seen:
+                seen.add(key(value))
+                unique.append(value.strip())
+        return unique
+
+    async def _get_qloo_insights(
+        self, api_key: str, entity: Optional[str] = None, insight_type: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], str, float]:
+        """
+        Make API call to Qloo's Taste AI API, answering from the cache when possible.
+
+        API calls go through the process-wide client-side limits (quota
+        bucket, Retry-After-aware retries, circuit breaker; see qloo_limits).
         
         Args:
             api_key: Qloo API key
+            entity: Entity to analyze instead of self.entity
+            insight_type: Insight type instead of self.insight_type
             
         Returns:
-            Dict containing API response data
+            tuple: (API response data, cache status, age in seconds) as
+            returned by InsightCache.get
         """
-        # Use hackathon-specific URL if available, otherwise default
-        base_url = os.getenv("QLOO_API_URL", "https://api.qloo.com/v1")
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        # Build request parameters
-        params = {
-            "entity": self.entity,
-            "limit": 20  # Get top 20 recommendations/insights
-        }
-        
-        if self.tags:
-            params["tags"] = ",".join(self.tags)
-        if self.demographics:
-            params["demographics"] = self.demographics
-        if self.location:
-            params["location"] = self.location
-            
-        try:
-            with httpx.Client(timeout=30.0) as client:
-                # Try different endpoints based on insight type
-                if self.insight_type == "recommendations":
-                    response = client.get(f"{base_url}/recommendations", headers=headers, params=params)
-                elif self.insight_type == "affinities":
-                    response = client.get(f"{base_url}/affinities", headers=headers, params=params)
-                elif self.insight_type == "trends":
-                    response = client.get(f"{base_url}/trends", headers=headers, params=params)
-                else:
-                    # Default to recommendations
-                    response = client.get(f"{base_url}/recommendations", headers=headers, params=params)
-                
-                response.raise_for_status()
-                return response.json()
-                
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code == 401:
-                raise Exception("Invalid Qloo API key. Please check your QLOO_API_KEY.")
-            elif e.response.status_code == 429:
-                raise Exception("Qloo API rate limit exceeded. Please try again later.")
-            else:
-                raise Exception(f"Qloo API error (HTTP {e.response.status_code}): {e.response.text}")
-        except httpx.TimeoutException:
-            raise Exception("Qloo API request timed out. Please try again.")
-        except Exception as e:
-            raise Exception(f"Network error accessing Qloo API: {str(e)}")
+        path, params = build_request(
+            entity or self.entity,
+            self.tags,
+            self.demographics,
+            self.location,
+            insight_type or self.insight_type,
+        )
+        return await get_cache().get(
+            cache_key(path, params),
+            lambda: get_guard().call(
+                "insights", lambda: get_insights(api_key, path, params)
+            ),
+        )
 
-    def _format_insights(self, insights: Dict[str, Any]) -> str:
+    def _format_insights(
+        self, insights: Dict[str, Any], entity: Optional[str] = None, footer: bool = True
+    ) -> str:
         """
         Format Qloo API response into readable insights.
         
         Args:
             insights: Raw API response data
+            entity: Entity the insights are about (default self.entity)
+            footer: Append the privacy note
             
         Returns:
             str: Formatted insights text
         """
-        formatted = f"## 🎯 Qloo Cultural Insights for '{self.entity}'\n\n"
+        formatted = f"## 🎯 Qloo Cultural Insights for '{entity or self.entity}'\n\n"
         
         # Add context information
         context_parts = []
@@ -218,7 +296,8 @@ class QlooInsightsTool(BaseTool):
             formatted += "\n"
         
         # Add privacy note
-        formatted += "---\n"
-        formatted += "*Cultural insights powered by Qloo's Taste AI™ - privacy-first cultural intelligence with no personal identifying data.*\n"
+        if footer:
+            formatted += "---\n"
+            formatted += PRIVACY_NOTE
         
         return formatted
\ No newline at end of file
@@ -0,0 +1,313 @@
+"""
+Fake Qloo API for Tests and Benchmarks
+
+A local stand-in for the Qloo Taste AI API serving /recommendations,
+/affinities and /trends in the response shapes QlooInsightsTool formats.
+Results are derived deterministically from the request parameters. Latency,
+server errors and 429s follow a configurable QlooBehavior, so the tool can be
+load-tested offline. The app counts requests, failures and the client
+connections requests arrived on, which shows whether callers reuse
+connections.
+
+Usage:
+    python agents/fake_qloo.py [--port 8200] [--latency 0.05] [--jitter 0.3]
+        [--error-rate 0.01] [--rate-limit-rate 0.02] [--rate-limit 10]
+    QLOO_API_URL=http://127.0.0.1:8200/v1 QLOO_API_KEY=test ...
+"""
+
+import argparse
+import asyncio
+import hashlib
+import math
+import random
+import threading
+import time
+from collections import Counter
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+CATEGORIES = ["music", "film", "fashion", "dining", "travel", "brands", "books"]
+
+
+def _seed(*parts: str) -> int:
+    return int(hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:8], 16)
+
+
+def _score(seed: int, i: int) -> float:
+    return round(0.99 - ((seed >> (i % 24)) % 40) / 100 - i * 0.01, 2)
+
+
+def recommendations(entity: str, context: str, limit: int) -> dict:
+    seed = _seed(entity, context)
+    return {
+        "recommendations": [
+            {
+                "name": f"{entity} pick {i + 1}",
+                "score": _score(seed, i),
+                "category": CATEGORIES[(seed + i) % len(CATEGORIES)],
+            }
+            for i in range(limit)
+        ],
+        "metadata": {"entity": entity, "context": context or "global"},
+    }
+
+
+def affinities(entity: str, context: str, limit: int) -> dict:
+    seed = _seed(entity, context)
+    return {
+        "affinities": {
+            category: [
+                {
+                    "name": f"{category.title()} {entity} {i + 1}",
+                    "score": _score(seed, i),
+                }
+                for i in range(max(limit // 4, 1))
+            ]
+            for category in CATEGORIES[seed % 3 : seed % 3 + 4]
+        },
+        "metadata": {"entity": entity, "context": context or "global"},
+    }
+
+
+def trends(entity: str, context: str, limit: int) -> dict:
+    seed = _seed(entity, context)
+    return {
+        "trends": [
+            {
+                "name": f"{entity} trend {i + 1}",
+                "momentum": _score(seed, i),
+                "description": f"Rising interest in {entity} {CATEGORIES[i % 7]}",
+            }
+            for i in range(max(limit // 2, 1))
+        ],
+        "metadata": {"entity": entity, "context": context or "global"},
+    }
+
+
+class QlooBehavior:
+    """
+    Latency and failure distribution of the fake Qloo API.
+
+    Latency is log-normal around the median with an optional share of slow
+    outliers, so percentiles look like a real network service rather than a
+    constant sleep.
+
+    Args:
+        latency: Median seconds added to every request
+        jitter: Log-normal sigma of the latency (0 gives a fixed latency)
+        tail_rate: Fraction of requests that take tail_latency instead
+        tail_latency: Seconds taken by slow outliers
+        error_rate: Fraction of requests answered with a 500
+        rate_limit_rate: Fraction of requests answered with a 429
+        retry_after: Seconds sent as Retry-After on those 429 responses
+        seed: Random seed for reproducible runs
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        tail_rate: float = 0.0,
+        tail_latency: float = 1.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 0.1,
+        seed: int | None = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+
+    def delay(self) -> float:
+        """Draw the latency of one request in seconds."""
+        if self.tail_rate and self.rng.random() < self.tail_rate:
+            return self.tail_latency
+        if self.jitter <= 0 or self.latency <= 0:
+            return self.latency
+        return self.latency * math.exp(self.rng.gauss(0, self.jitter))
+
+    def failure(self) -> JSONResponse | None:
+        """Draw whether one request fails, returning the error response if so."""
+        draw = self.rng.random()
+        if draw < self.rate_limit_rate:
+            return JSONResponse(
+                {"error": "Rate limit exceeded"},
+                status_code=429,
+                headers={"Retry-After": f"{self.retry_after:g}"},
+            )
+        if draw < self.rate_limit_rate + self.error_rate:
+            return JSONResponse({"error": "Internal server error"}, status_code=500)
+        return None
+
+
+def create_fake_qloo_app(
+    latency: float = 0.0,
+    api_key: str | None = None,
+    rate_limit: float = 0.0,
+    behavior: QlooBehavior | None = None,
+) -> Starlette:
+    """
+    Build the fake Qloo API.
+
+    Args:
+        latency: Seconds added to every request
+        api_key: Bearer token to require (any non-empty token if None)
+        rate_limit: Requests per second to accept (0 for no limit); faster
+            requests get a 429 with a fractional Retry-After
+        behavior: Latency and failure distribution (overrides latency)
+
+    Returns:
+        Starlette: App exposing counters on app.state (calls per insight
+        type, errors, rate_limited, connections)
+    """
+    behavior = behavior or QlooBehavior(latency=latency)
+    app = Starlette()
+    app.state.behavior = behavior
+    app.state.calls = Counter()
+    app.state.connections = set()
+    app.state.errors = 0
+    app.state.rate_limited = 0
+    app.state.next_allowed = 0.0
+
+    def route(insight_type: str, build):
+        async def handler(request: Request):
+            app.state.calls[insight_type] += 1
+            app.state.connections.add(request.client)
+            token = request.headers.get("authorization", "").removeprefix("Bearer ")
+            if not token or (api_key is not None and token != api_key):
+                return JSONResponse({"error": "Invalid API key"}, status_code=401)
+            if rate_limit:
+                now = time.monotonic()
+                if now < app.state.next_allowed:
+                    app.state.rate_limited += 1
+                    return JSONResponse(
+                        {"error": "Rate limit exceeded"},
+                        status_code=429,
+                        headers={"Retry-After": f"{app.state.next_allowed - now:.3f}"},
+                    )
+                app.state.next_allowed = now + 1 / rate_limit
+
+            delay = behavior.delay()
+            if delay:
+                await asyncio.sleep(delay)
+            failure = behavior.failure()
+            if failure is not None:
+                if failure.status_code == 429:
+                    app.state.rate_limited += 1
+                else:
+                    app.state.errors += 1
+                return failure
+            params = request.query_params
+            if not params.get("entity"):
+                return JSONResponse({"error": "entity is required"}, status_code=400)
+            context = "|".join(
+                params.get(name, "") for name in ("tags", "demographics", "location")
+            ).strip("|")
+            return JSONResponse(
+                build(params["entity"], context, int(params.get("limit", 20)))
+            )
+
+        app.add_route(f"/v1/{insight_type}", handler, methods=["GET"])
+
+    route("recommendations", recommendations)
+    route("affinities", affinities)
+    route("trends", trends)
+    return app
+
+
+class FakeQlooServer:
+    """
+    Runs the fake Qloo API with uvicorn on a background thread.
+
+    Args:
+        app: ASGI app from create_fake_qloo_app
+        ssl_certfile / ssl_keyfile: Serve HTTPS with this certificate
+    """
+
+    def __init__(
+        self,
+        app,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        ssl_certfile: str | None = None,
+        ssl_keyfile: str | None = None,
+    ):
+        config = uvicorn.Config(
+            app,
+            host=host,
+            port=port,
+            log_level="warning",
+            ssl_certfile=ssl_certfile,
+            ssl_keyfile=ssl_keyfile,
+        )
+        self.scheme = "https" if ssl_certfile else "http"
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        sock = self.server.servers[0].sockets[0]
+        host, port = sock.getsockname()[:2]
+        return f"{self.scheme}://{host}:{port}/v1"
+
+    def __enter__(self) -> "FakeQlooServer":
+        self.thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Fake Qloo server failed to start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Qloo Taste AI API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--tail-rate", type=float, default=0.0)
+    parser.add_argument("--tail-latency", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument(
+        "--rate-limit", type=float, default=0.0, help="Requests per second accepted"
+    )
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    behavior = QlooBehavior(
+        latency=args.latency,
+        jitter=args.jitter,
+        tail_rate=args.tail_rate,
+        tail_latency=args.tail_latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    print(f"🧪 Fake Qloo API on http://{args.host}:{args.port}/v1")
+    print(f"   QLOO_API_URL=http://{args.host}:{args.port}/v1 QLOO_API_KEY=test")
+    uvicorn.run(
+        create_fake_qloo_app(rate_limit=args.rate_limit, behavior=behavior),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Qloo Insight Cache
+
+Research runs ask Qloo for the same entity/tags/demographics/location/insight
+combinations again and again, while taste data changes slowly. Responses are
+cached under the normalized request, in memory and optionally on disk
+(SQLite), with three ages:
+
+    fresh   younger than ttl: served without calling the API
+    stale   younger than stale_ttl: served at once and refreshed in the
+            background (stale-while-revalidate)
+    expired older: refreshed before answering
+
+If a refresh fails (API error, rate limit, network), the last good response
+is served instead of an error, however old it is.
+
+Configuration (environment):
+    QLOO_CACHE_TTL: Seconds a response is fresh (default 3600, 0 disables)
+    QLOO_CACHE_STALE_TTL: Seconds a response may be served while refreshing
+        (default 86400)
+    QLOO_CACHE_MAX_ENTRIES: Responses kept in memory (default 1000)
+    QLOO_CACHE_PATH: SQLite file for the disk tier (unset keeps memory only)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+QLOO_CACHE_TTL = float(os.getenv("QLOO_CACHE_TTL", "3600"))
+QLOO_CACHE_STALE_TTL = float(os.getenv("QLOO_CACHE_STALE_TTL", "86400"))
+QLOO_CACHE_MAX_ENTRIES = int(os.getenv("QLOO_CACHE_MAX_ENTRIES", "1000"))
+QLOO_CACHE_PATH = os.getenv("QLOO_CACHE_PATH", "")
+
+_cache: Optional["InsightCache"] = None
+
+
+def _normalize(value: str) -> str:
+    return " ".join(value.casefold().split())
+
+
+def cache_key(path: str, params: Dict[str, Any]) -> str:
+    """
+    Cache key of one request: endpoint plus normalized parameters.
+
+    Case, extra whitespace and tag order do not change the key, so
+    "Nike"/["sport", "Fashion"] and " nike "/["fashion", "sport"] share an entry.
+    """
+    normalized = {}
+    for name, value in params.items():
+        if name == "tags":
+            value = ",".join(sorted({_normalize(tag) for tag in value.split(",")}))
+        elif isinstance(value, str):
+            value = _normalize(value)
+        normalized[name] = value
+    return json.dumps([path, normalized], sort_keys=True)
+
+
+@dataclass
+class CachedInsights:
+    value: Dict[str, Any]
+    fetched_at: float
+
+
+class InsightDiskStore:
+    """
+    SQLite tier of the insight cache, shared across processes and restarts.
+
+    Args:
+        path: SQLite database file (created with its directory if missing)
+        max_age: Entries older than this many seconds are purged on open
+    """
+
+    def __init__(self, path: str | Path, max_age: float | None = None):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None, timeout=5
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS insights ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        if max_age:
+            self._db.execute(
+                "DELETE FROM insights WHERE fetched_at < ?", (time.time() - max_age,)
+            )
+
+    def get(self, key: str) -> Optional[CachedInsights]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, fetched_at FROM insights WHERE key = ?", (key,)
+            ).fetchone()
+        return CachedInsights(json.loads(row[0]), row[1]) if row else None
+
+    def set(self, key: str, entry: CachedInsights):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO insights (key, value, fetched_at) "
+                "VALUES (?, ?, ?)",
+                (key, json.dumps(entry.value), entry.fetched_at),
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class InsightCache:
+    """
+    Two-tier TTL cache with stale-while-revalidate and last-good fallback.
+
+    Loads and refreshes are single-flight per key: concurrent callers share
+    one API call.
+
+    Args:
+        ttl: Seconds a response is fresh (0 disables caching)
+        stale_ttl: Seconds a response may be served while it is refreshed
+        max_entries: Responses kept in the in-memory LRU
+        store: Optional disk tier
+        clock: Wall-clock time source (overridable in tests)
+    """
+
+    def __init__(
+        self,
+        ttl: float = QLOO_CACHE_TTL,
+        stale_ttl: float = QLOO_CACHE_STALE_TTL,
+        max_entries: int = QLOO_CACHE_MAX_ENTRIES,
+        store: Optional[InsightDiskStore] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = max(stale_ttl, ttl)
+        self.max_entries = max_entries
+        self.store = store
+        self.clock = clock
+        self._entries: OrderedDict[str, CachedInsights] = OrderedDict()
+        self._loading: Dict[str, asyncio.Task] = {}
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.refreshes = 0
+        self.fallbacks = 0
+
+    def _remember(self, key: str, entry: CachedInsights):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _lookup(self, key: str) -> Optional[CachedInsights]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self.store is not None:
+            entry = await asyncio.to_thread(self.store.get, key)
+            if entry is not None:
+                self.disk_hits += 1
+                self._remember(key, entry)
+        return entry
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Dict[str, Any]]]):
+        value = await loader()
+        entry = CachedInsights(value, self.clock())
+        self._remember(key, entry)
+        if self.store is not None:
+            await asyncio.to_thread(self.store.set, key, entry)
+        return entry
+
+    def _start_load(self, key: str, loader) -> asyncio.Task:
+        task = self._loading.get(key)
+        # Tasks belong to one event loop; another loop starts its own load
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._load(key, loader))
+            self._loading[key] = task
+            task.add_done_callback(lambda done: self._finish_load(key, done))
+        return task
+
+    def _finish_load(self, key: str, task: asyncio.Task):
+        if self._loading.get(key) is task:
+            del self._loading[key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug(f"Qloo cache load for {key} failed: {task.exception()}")
+
+    async def get(
+        self, key: str, loader: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Tuple[Dict[str, Any], str, float]:
+        """
+        Return the response for key, calling loader when it is not fresh.
+
+        Returns:
+            tuple: (response, status, age in seconds) where status is "fresh",
+            "stale" (refreshing in the background), "miss" (just loaded) or
+            "fallback" (the refresh failed and the last good response is served)
+
+        Raises:
+            Exception: The loader's error when there is no cached response
+        """
+        if self.ttl <= 0:
+            self.misses += 1
+            return await loader(), "miss", 0.0
+
+        entry = await self._lookup(key)
+        if entry is not None:
+            age = self.clock() - entry.fetched_at
+            if age < self.ttl:
+                self.hits += 1
+                return entry.value, "fresh", age
+            if age < self.stale_ttl:
+                self.stale_hits += 1
+                if key not in self._loading:
+                    self.refreshes += 1
+                self._start_load(key, loader)
+                return entry.value, "stale", age
+
+        self.misses += 1
+        try:
+            loaded = await asyncio.shield(self._start_load(key, loader))
+        except Exception as e:
+            if entry is None:
+                raise
+            self.fallbacks += 1
+            logger.warning(f"Serving last good Qloo response after error: {e}")
+            return entry.value, "fallback", self.clock() - entry.fetched_at
+        return loaded.value, "miss", 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "refreshes": self.refreshes,
+            "fallbacks": self.fallbacks,
+        }
+
+
+def get_cache() -> InsightCache:
+    """Return the process-wide insight cache configured from the environment."""
+    global _cache
+    if _cache is None:
+        store = None
+        if QLOO_CACHE_PATH:
+            store = InsightDiskStore(QLOO_CACHE_PATH, max_age=QLOO_CACHE_STALE_TTL * 7)
+        _cache = InsightCache(store=store)
+    return _cache
@@ -0,0 +1,207 @@
+"""
+Qloo API Client
+
+HTTP plumbing shared by every QlooInsightsTool call. Instead of opening a new
+connection (TCP and TLS handshake) per call, requests go through one pooled
+httpx.AsyncClient per event loop with keep-alive connections and optional
+HTTP/2, so concurrent research sessions reuse warm connections.
+
+Configuration (environment):
+    QLOO_API_URL: API base URL (default https://api.qloo.com/v1)
+    QLOO_HTTP2: Set to 1 to negotiate HTTP/2 (needs the h2 package)
+    QLOO_MAX_CONNECTIONS / QLOO_MAX_KEEPALIVE: Pool size limits
+    QLOO_KEEPALIVE_EXPIRY: Seconds an idle connection is kept open
+    QLOO_TIMEOUT / QLOO_CONNECT_TIMEOUT: Request and connect timeouts
+"""
+
+import asyncio
+import logging
+import os
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from resilience import retry_after_seconds
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = "https://api.qloo.com/v1"
+
+# Connection pool shared by all tool calls in this process
+QLOO_HTTP2 = os.getenv("QLOO_HTTP2", "0").lower() in ("1", "true", "yes")
+QLOO_MAX_CONNECTIONS = int(os.getenv("QLOO_MAX_CONNECTIONS", "20"))
+# httpcore drops idle connections whenever the pool holds more than
+# max_keepalive in total, so a lower value churns connections under load
+QLOO_MAX_KEEPALIVE = int(os.getenv("QLOO_MAX_KEEPALIVE", str(QLOO_MAX_CONNECTIONS)))
+QLOO_KEEPALIVE_EXPIRY = float(os.getenv("QLOO_KEEPALIVE_EXPIRY", "30"))
+QLOO_TIMEOUT = float(os.getenv("QLOO_TIMEOUT", "30"))
+QLOO_CONNECT_TIMEOUT = float(os.getenv("QLOO_CONNECT_TIMEOUT", "5"))
+
+# API path per insight type; anything else falls back to recommendations
+ENDPOINTS = {
+    "recommendations": "/recommendations",
+    "affinities": "/affinities",
+    "trends": "/trends",
+}
+
+# One client per event loop: an AsyncClient must not be shared across loops
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+class QlooAPIError(Exception):
+    """
+    A Qloo API call failed; the message is meant for the agent.
+
+    Args:
+        message: Description of the failure
+        status_code: HTTP status, or None for timeouts and network errors
+        retry_after: Seconds the API asked us to wait (Retry-After), if any
+    """
+
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def api_url() -> str:
+    # Use hackathon-specific URL if available, otherwise default
+    return os.getenv("QLOO_API_URL", DEFAULT_API_URL)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def create_client(**kwargs) -> httpx.AsyncClient:
+    """
+    Create an AsyncClient with the shared pool limits and timeouts.
+
+    Keyword arguments override the defaults (e.g. verify, http2, limits).
+    """
+    http2 = kwargs.pop("http2", QLOO_HTTP2)
+    if http2 and not _http2_available():
+        logger.warning(
+            "QLOO_HTTP2 is set but the h2 package is missing; using HTTP/1.1"
+        )
+        http2 = False
+    options = {
+        "http2": http2,
+        "limits": httpx.Limits(
+            max_connections=QLOO_MAX_CONNECTIONS,
+            max_keepalive_connections=QLOO_MAX_KEEPALIVE,
+            keepalive_expiry=QLOO_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(QLOO_TIMEOUT, connect=QLOO_CONNECT_TIMEOUT),
+    }
+    options.update(kwargs)
+    return httpx.AsyncClient(**options)
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the pooled client of the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = create_client()
+        _clients[loop] = client
+    return client
+
+
+async def close_client():
+    """Close the running event loop's pooled client (e.g. on shutdown)."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def build_request(
+    entity: str,
+    tags: Optional[List[str]] = None,
+    demographics: Optional[str] = None,
+    location: Optional[str] = None,
+    insight_type: str = "recommendations",
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Build the API path and query parameters for one insight request.
+
+    Returns:
+        tuple: (path, params)
+    """
+    params = {
+        "entity": entity,
+        "limit": 20,  # Get top 20 recommendations/insights
+    }
+    if tags:
+        params["tags"] = ",".join(tags)
+    if demographics:
+        params["demographics"] = demographics
+    if location:
+        params["location"] = location
+    return ENDPOINTS.get(insight_type, ENDPOINTS["recommendations"]), params
+
+
+async def get_insights(
+    api_key: str,
+    path: str,
+    params: Dict[str, Any],
+    client: Optional[httpx.AsyncClient] = None,
+) -> Dict[str, Any]:
+    """
+    Call a Qloo endpoint through the pooled client.
+
+    Args:
+        api_key: Qloo API key
+        path: Endpoint path from build_request
+        params: Query parameters from build_request
+        client: Client to use instead of the pooled one
+
+    Returns:
+        Dict containing API response data
+
+    Raises:
+        QlooAPIError: The request failed (message suitable for the agent)
+    """
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
+    client = client or get_client()
+    try:
+        response = await client.get(
+            f"{api_url()}{path}", headers=headers, params=params
+        )
+        response.raise_for_status()
+        return response.json()
+
+    except httpx.HTTPStatusError as e:
+        status = e.response.status_code
+        if status == 401:
+            raise QlooAPIError(
+                "Invalid Qloo API key. Please check your QLOO_API_KEY.", status
+            )
+        elif status == 429:
+            raise QlooAPIError(
+                "Qloo API rate limit exceeded. Please try again later.",
+                status,
+                retry_after_seconds(e.response.headers),
+            )
+        else:
+            raise QlooAPIError(
+                f"Qloo API error (HTTP {status}): {e.response.text}", status
+            )
+    except httpx.TimeoutException:
+        raise QlooAPIError("Qloo API request timed out. Please try again.")
+    except Exception as e:
+        raise QlooAPIError(f"Network error accessing Qloo API: {str(e)}")
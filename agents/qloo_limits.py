@@ -0,0 +1,108 @@
+"""
+Qloo API Client-Side Limits
+
+Every research session in the process shares one Qloo API key. Without
+coordination, throttled calls come back to the model as "try again later",
+it retries at once, and the throttling gets worse. All Qloo calls therefore
+go through one process-wide guard:
+
+- a token bucket paces requests to the key's quota, and a 429 with
+  Retry-After pauses the whole bucket rather than only the throttled call
+- throttled, timed-out and 5xx calls are retried with jittered exponential
+  backoff, waiting at least as long as Retry-After asks
+- a circuit breaker fails fast while the API is down instead of making every
+  caller wait for timeouts
+
+The bucket, breaker and retry loop are the MCP server's (mcp/resilience.py);
+this module adapts them to Qloo errors and settings.
+
+Configuration (environment):
+    QLOO_REQUESTS_PER_MINUTE: Quota of the API key (default 60, 0 disables pacing)
+    QLOO_BURST: Requests allowed back to back (default 10)
+    QLOO_MAX_RETRIES: Retries after the first attempt (default 3)
+    QLOO_RETRY_BASE_DELAY / QLOO_RETRY_MAX_DELAY: Backoff bounds in seconds
+        (defaults 0.5 / 20)
+    QLOO_BREAKER_FAILURE_THRESHOLD: Consecutive failures that open the circuit
+        (default 5, 0 disables)
+    QLOO_BREAKER_RESET_TIMEOUT: Seconds before a trial call (default 30)
+"""
+
+import os
+from typing import Optional
+
+from qloo_client import QlooAPIError
+from resilience import CircuitBreaker, TokenBucket, UpstreamGuard, classify_status
+
+QLOO_REQUESTS_PER_MINUTE = float(os.getenv("QLOO_REQUESTS_PER_MINUTE", "60"))
+QLOO_BURST = float(os.getenv("QLOO_BURST", "10"))
+QLOO_MAX_RETRIES = int(os.getenv("QLOO_MAX_RETRIES", "3"))
+QLOO_RETRY_BASE_DELAY = float(os.getenv("QLOO_RETRY_BASE_DELAY", "0.5"))
+QLOO_RETRY_MAX_DELAY = float(os.getenv("QLOO_RETRY_MAX_DELAY", "20"))
+QLOO_BREAKER_FAILURE_THRESHOLD = int(os.getenv("QLOO_BREAKER_FAILURE_THRESHOLD", "5"))
+QLOO_BREAKER_RESET_TIMEOUT = float(os.getenv("QLOO_BREAKER_RESET_TIMEOUT", "30"))
+
+_guard: Optional["QlooGuard"] = None
+
+
+class CircuitOpenError(QlooAPIError):
+    """Raised without calling the API while the circuit breaker is open."""
+
+
+def classify_error(error: Exception) -> Optional[str]:
+    """
+    Decide whether a Qloo error is worth retrying.
+
+    Returns:
+        str | None: "rate_limited" for 429s, "unavailable" for timeouts,
+        network errors and 5xx responses, None for errors a retry cannot fix
+    """
+    if not isinstance(error, QlooAPIError) or isinstance(error, CircuitOpenError):
+        return None
+    return classify_status(error.status_code)
+
+
+class QlooCircuitBreaker(CircuitBreaker):
+    """Circuit breaker whose rejections are QlooAPIErrors the agent can read."""
+
+    name = "Qloo API"
+    open_error = CircuitOpenError
+
+
+class QlooGuard(UpstreamGuard):
+    """
+    Client-side limits around Qloo API calls: quota bucket, retries and breaker.
+
+    Failures surface as QlooAPIError, which the tool turns into a message for
+    the agent; the API's Retry-After comes from the error itself.
+    """
+
+    name = "Qloo API"
+
+    def classify(self, error: Exception) -> Optional[str]:
+        return classify_error(error)
+
+    def server_delay(self, error: Exception) -> Optional[float]:
+        return error.retry_after
+
+    def give_up(
+        self, operation: str, error: Exception, attempts: int, delay: float
+    ) -> Exception:
+        return QlooAPIError(
+            f"{error} (gave up after {attempts} attempt(s))", error.status_code, delay
+        )
+
+
+def get_guard() -> QlooGuard:
+    """Return the process-wide guard configured from the QLOO_* settings."""
+    global _guard
+    if _guard is None:
+        _guard = QlooGuard(
+            limiter=TokenBucket(QLOO_REQUESTS_PER_MINUTE / 60, QLOO_BURST),
+            breaker=QlooCircuitBreaker(
+                QLOO_BREAKER_FAILURE_THRESHOLD, QLOO_BREAKER_RESET_TIMEOUT
+            ),
+            max_retries=QLOO_MAX_RETRIES,
+            base_delay=QLOO_RETRY_BASE_DELAY,
+            max_delay=QLOO_RETRY_MAX_DELAY,
+        )
+    return _guard
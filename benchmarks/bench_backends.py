@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark: local vector index vs OpenAI vector store backend
+
+Measures search latency (p50/p99) of the local NumPy backend against the
+OpenAI backend pointed at a local fake upstream that simulates the network
+round trip of the hosted vector store API.
+
+Usage:
+    python benchmarks/bench_backends.py [--queries 200] [--latency 0.08] [--docs 0]
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the mcp directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "mcp"))
+
+from backends import LocalVectorIndexBackend, OpenAIVectorStoreBackend
+from fake_vector_store import (
+    DEFAULT_VECTOR_STORE_ID,
+    FakeCorpus,
+    FakeUpstreamServer,
+    create_fake_upstream_app,
+)
+from server import create_openai_client
+
+QUERIES = [
+    "TechCorp Solutions revenue",
+    "AI industry market size 2024",
+    "key products and services",
+    "growth rate of the AI market",
+    "competitive landscape",
+    "headquarters and employees",
+    "enterprise customers",
+    "cloud infrastructure",
+]
+
+WORDS = (
+    "market revenue growth product customer platform cloud data model "
+    "research analysis enterprise strategy sales region quarter forecast "
+    "team hardware software service partner contract pricing support"
+).split()
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def write_synthetic_corpus(directory: Path, docs: int, words_per_doc: int = 600):
+    rng = random.Random(42)
+    for i in range(docs):
+        text = " ".join(rng.choice(WORDS) for _ in range(words_per_doc))
+        (directory / f"doc_{i:05d}.txt").write_text(text, encoding="utf-8")
+
+
+async def measure(backend, queries: list[str]) -> list[float]:
+    samples = []
+    for query in queries:
+        start = time.perf_counter()
+        await backend.search(query)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(name: str, samples: list[float]):
+    print(
+        f"{name:<28} p50={percentile(samples, 50):8.2f} ms  "
+        f"p99={percentile(samples, 99):8.2f} ms  "
+        f"mean={statistics.mean(samples):8.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument(
+        "--latency", type=float, default=0.08, help="Simulated upstream latency (s)"
+    )
+    parser.add_argument(
+        "--docs",
+        type=int,
+        default=0,
+        help="Synthetic documents to add to the files/ corpus",
+    )
+    args = parser.parse_args()
+
+    # Keep per-request server logging out of the timings
+    logging.getLogger().setLevel(logging.WARNING)
+
+    queries = [QUERIES[i % len(QUERIES)] for i in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_dir = Path(tmp) / "files"
+        corpus_dir.mkdir()
+        for path in (project_root / "files").iterdir():
+            (corpus_dir / path.name).write_text(path.read_text(encoding="utf-8"))
+        write_synthetic_corpus(corpus_dir, args.docs)
+
+        print("🚀 Backend search latency benchmark")
+        print(f"📁 Corpus: {len(list(corpus_dir.iterdir()))} files")
+        print(f"🌐 Simulated upstream latency: {args.latency * 1000:.0f} ms")
+        print("=" * 70)
+
+        start = time.perf_counter()
+        local = LocalVectorIndexBackend(
+            corpus_dir, index_dir=Path(tmp) / "index"
+        ).load()
+        print(f"Index build: {(time.perf_counter() - start) * 1000:.1f} ms")
+        start = time.perf_counter()
+        local = LocalVectorIndexBackend(
+            corpus_dir, index_dir=Path(tmp) / "index"
+        ).load()
+        print(
+            f"Index reload (memory-mapped): {(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+        print(f"Chunks indexed: {len(local.chunks)}")
+        print("-" * 70)
+
+        report("local (numpy mmap)", asyncio.run(measure(local, queries)))
+
+        corpus = FakeCorpus.from_directory(corpus_dir)
+        app = create_fake_upstream_app(corpus, latency=args.latency)
+        with FakeUpstreamServer(app) as upstream:
+            client = create_openai_client(api_key="test", base_url=upstream.base_url)
+            remote = OpenAIVectorStoreBackend(client, DEFAULT_VECTOR_STORE_ID)
+            report("openai (fake upstream)", asyncio.run(measure(remote, queries)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: batch MCP tools vs single-item tools
+
+Runs the real MCP server over SSE against the local fake upstream and
+compares a research turn made of N searches and N fetches issued as single
+tool calls against the same work issued as one search_many and one
+fetch_many call.
+
+Usage:
+    python benchmarks/bench_batch_tools.py [--items 8] [--latency 0.08] [--rounds 5]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add the mcp directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "mcp"))
+
+import server
+from backends import OpenAIVectorStoreBackend
+from fake_vector_store import (
+    DEFAULT_VECTOR_STORE_ID,
+    FakeCorpus,
+    FakeUpstreamServer,
+    create_fake_upstream_app,
+)
+from fastmcp import Client
+
+TOPICS = ["revenue", "products", "market", "growth", "customers", "cloud", "AI"]
+
+
+def build_corpus(documents: int) -> FakeCorpus:
+    return FakeCorpus(
+        {
+            f"doc_{i:03d}.txt": f"Document {i} about {TOPICS[i % len(TOPICS)]} "
+            f"and TechCorp {TOPICS[(i + 1) % len(TOPICS)]}. " * 40
+            for i in range(documents)
+        }
+    )
+
+
+async def single_calls(url: str, queries: list[str], ids: list[str]) -> int:
+    async with Client(f"{url}/sse") as client:
+        for query in queries:
+            await client.call_tool("search", {"query": query})
+        for file_id in ids:
+            await client.call_tool("fetch", {"id": file_id})
+    return len(queries) + len(ids)
+
+
+async def batch_calls(url: str, queries: list[str], ids: list[str]) -> int:
+    async with Client(f"{url}/sse") as client:
+        response = await client.call_tool("search_many", {"queries": queries})
+        assert all(not r["error"] for r in json.loads(response[0].text)["results"])
+        response = await client.call_tool("fetch_many", {"ids": ids})
+        assert all(not d["error"] for d in json.loads(response[0].text)["documents"])
+    return 2
+
+
+def run_scenario(scenario, upstream_url: str, queries, ids) -> tuple[float, int]:
+    # Fresh server per run so every scenario starts with cold caches
+    client = server.create_openai_client(api_key="test", base_url=upstream_url)
+    mcp = server.create_server(
+        OpenAIVectorStoreBackend(client, DEFAULT_VECTOR_STORE_ID)
+    )
+    with FakeUpstreamServer(mcp.http_app(transport="sse")) as mcp_server:
+        start = time.perf_counter()
+        round_trips = asyncio.run(scenario(mcp_server.url, queries, ids))
+        return (time.perf_counter() - start) * 1000, round_trips
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--items", type=int, default=8, help="Searches and fetches")
+    parser.add_argument(
+        "--latency", type=float, default=0.08, help="Simulated upstream latency (s)"
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    # Keep per-request server logging out of the timings
+    logging.getLogger().setLevel(logging.WARNING)
+
+    corpus = build_corpus(args.items)
+    ids = sorted(corpus.texts)[: args.items]
+
+    print("🚀 Batch vs single-item MCP tool benchmark (SSE transport)")
+    print(f"🔢 {args.items} searches + {args.items} fetches per research turn")
+    print(f"🌐 Simulated upstream latency: {args.latency * 1000:.0f} ms")
+    print("=" * 70)
+
+    app = create_fake_upstream_app(corpus, latency=args.latency)
+    with FakeUpstreamServer(app) as upstream:
+        for name, scenario in [
+            ("single tools", single_calls),
+            ("batch tools", batch_calls),
+        ]:
+            samples = []
+            for round_index in range(args.rounds):
+                queries = [
+                    f"TechCorp {TOPICS[i % len(TOPICS)]} round {round_index} item {i}"
+                    for i in range(args.items)
+                ]
+                elapsed, round_trips = run_scenario(
+                    scenario, upstream.base_url, queries, ids
+                )
+                samples.append(elapsed)
+            print(
+                f"{name:<14} tool calls={round_trips:3d}  "
+                f"median={statistics.median(samples):8.1f} ms  "
+                f"min={min(samples):8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
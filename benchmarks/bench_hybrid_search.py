@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Benchmark: hybrid BM25 + vector retrieval on a synthetic corpus
+
+Builds a local index over a synthetic corpus (100k chunks by default) with
+product codes planted in random documents, then compares latency and
+recall@10 of vector-only, BM25-only and hybrid (reciprocal rank fusion)
+retrieval for exact-code queries and descriptive queries.
+
+Usage:
+    python benchmarks/bench_hybrid_search.py [--chunks 100000] [--queries 200]
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the mcp directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "mcp"))
+
+from backends import HashingEmbedder, LocalVectorIndexBackend
+
+CHUNK_SIZE = 200
+CHUNKS_PER_FILE = 50
+WORDS_PER_CHUNK = 31
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def build_corpus(directory: Path, chunks: int, queries: int, rng: random.Random):
+    """Write synthetic files and return (code queries, descriptive queries)."""
+    vocabulary = [
+        f"{rng.choice('bcdfgklmnprstv')}{rng.choice('aeiou')}{i}" for i in range(5000)
+    ]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    files = max(1, chunks // CHUNKS_PER_FILE)
+
+    code_queries = []
+    text_queries = []
+    targets = set(rng.sample(range(files), min(files, queries)))
+    for file_index in range(files):
+        name = f"doc_{file_index:06d}.txt"
+        lines = [
+            " ".join(rng.choices(vocabulary, weights, k=WORDS_PER_CHUNK))
+            for _ in range(CHUNKS_PER_FILE)
+        ]
+        if file_index in targets:
+            code = f"PX{rng.randrange(10**6):06d}"
+            line = rng.randrange(len(lines))
+            lines[line] += f" {code}"
+            context = " ".join(rng.sample(lines[line].split()[:-1], 3))
+            code_queries.append((f"{code} {context}", name))
+            text_queries.append((" ".join(lines[line].split()[5:13]), name))
+        (directory / name).write_text("\n".join(lines), encoding="utf-8")
+    return code_queries, text_queries
+
+
+def evaluate(name: str, retrieve, queries, backend) -> None:
+    latencies = []
+    found = 0
+    for query, filename in queries:
+        start = time.perf_counter()
+        keys = retrieve(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        titles = {backend.documents[key[0]]["title"] for key, _ in keys}
+        found += filename in titles
+    print(
+        f"  {name:<8} recall@10={found / len(queries):6.3f}  "
+        f"p50={percentile(latencies, 50):7.2f} ms  "
+        f"p99={percentile(latencies, 99):7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--chunks", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=256, help="Embedding dimensions")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    rng = random.Random(7)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus_dir = Path(tmp) / "files"
+        corpus_dir.mkdir()
+        code_queries, text_queries = build_corpus(
+            corpus_dir, args.chunks, args.queries, rng
+        )
+
+        print("🚀 Hybrid retrieval benchmark")
+        print("=" * 70)
+        start = time.perf_counter()
+        backend = LocalVectorIndexBackend(
+            corpus_dir,
+            index_dir=Path(tmp) / "index",
+            embedder=HashingEmbedder(dim=args.dim),
+            chunk_size=CHUNK_SIZE,
+            chunk_overlap=0,
+        ).load()
+        print(
+            f"📁 {len(backend.documents)} files, {len(backend.chunks)} chunks "
+            f"indexed in {time.perf_counter() - start:.1f} s"
+        )
+
+        def vector(query):
+            return backend.top_k_chunks(query, 10)
+
+        def lexical(query):
+            return backend.lexical.search(query, 10)
+
+        def hybrid(query):
+            return asyncio.run(backend._ranked_chunks(query))
+
+        for label, queries in [
+            ("Exact product-code queries", code_queries),
+            ("Descriptive queries", text_queries),
+        ]:
+            print(f"\n{label} ({len(queries)}):")
+            evaluate("vector", vector, queries, backend)
+            evaluate("bm25", lexical, queries, backend)
+            evaluate("hybrid", hybrid, queries, backend)
+
+        # Incremental update: change one file and re-sync the lexical index
+        changed = corpus_dir / code_queries[0][1]
+        changed.write_text(changed.read_text() + " PX999999", encoding="utf-8")
+        start = time.perf_counter()
+        index = backend._read_index()
+        reindexed = time.perf_counter()
+        backend._update_lexical(index)
+        done = time.perf_counter()
+        print(
+            f"\n🔁 Re-sync after one changed file: vector index "
+            f"{reindexed - start:.1f} s, BM25 update {(done - reindexed) * 1000:.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark: incremental corpus ingestion into the vector store
+
+Writes a synthetic corpus and times re-syncs into the fake vector store
+upstream with nothing changed and with a handful of edits, additions and
+deletions. The manifest makes a re-sync cost one directory walk plus the
+work for the changed files.
+
+By default the previous sync is simulated by writing its manifest directly
+(an initial upload of 50k files through the fake takes minutes); --initial
+runs and times the real initial sync instead.
+
+Usage:
+    python benchmarks/bench_ingest.py [--files 50000] [--changed 20] [--initial]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the mcp directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "mcp"))
+
+from fake_vector_store import (
+    DEFAULT_VECTOR_STORE_ID,
+    FakeCorpus,
+    FakeUpstreamServer,
+    create_fake_upstream_app,
+)
+from ingest import VectorStoreSync, file_sha256, scan_corpus
+from server import create_openai_client
+
+TOPICS = ["revenue", "products", "market", "growth", "customers", "cloud", "AI"]
+
+
+def write_corpus(corpus: Path, files: int):
+    for i in range(files):
+        folder = corpus / f"team_{i % 50:02d}" / f"project_{i % 7}"
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / f"doc_{i:05d}.md").write_text(
+            f"# Document {i}\n\nTechCorp {TOPICS[i % len(TOPICS)]} notes. " * 10
+        )
+
+
+def seed_manifest(corpus: Path, manifest: Path):
+    """Record every file as synced, as a completed initial sync would."""
+    sync = VectorStoreSync(
+        None, DEFAULT_VECTOR_STORE_ID, corpus, manifest_path=manifest
+    )
+    for i, (relative, stat) in enumerate(scan_corpus(corpus).items()):
+        sync.files[relative] = {
+            "file_id": f"file-seeded{i:08d}",
+            "sha256": file_sha256(corpus / relative),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+    sync.save_manifest()
+
+
+def run_sync(base_url: str, corpus: Path, manifest: Path, concurrency: int) -> dict:
+    client = create_openai_client(api_key="test", base_url=base_url)
+    sync = VectorStoreSync(
+        client,
+        DEFAULT_VECTOR_STORE_ID,
+        corpus,
+        manifest_path=manifest,
+        concurrency=concurrency,
+    )
+    return asyncio.run(sync.run())
+
+
+def report(label: str, summary: dict):
+    print(
+        f"{label:<28} {summary['seconds']:8.2f} s  "
+        f"(plan {summary['plan_seconds']:.2f} s, {summary['upload']} uploaded, "
+        f"{summary['delete']} deleted, {summary['unchanged']} unchanged)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--files", type=int, default=50000)
+    parser.add_argument("--changed", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument(
+        "--initial", action="store_true", help="Time the initial full sync too"
+    )
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print("🚀 Incremental ingestion benchmark")
+    print(
+        f"📁 {args.files} files, {args.latency * 1000:.0f} ms upstream latency, "
+        f"concurrency {args.concurrency}"
+    )
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus, manifest = Path(tmp) / "files", Path(tmp) / "manifest.json"
+        write_corpus(corpus, args.files)
+        app = create_fake_upstream_app(FakeCorpus({}), latency=args.latency)
+
+        with FakeUpstreamServer(app) as upstream:
+            if args.initial:
+                report(
+                    "initial sync",
+                    run_sync(upstream.base_url, corpus, manifest, args.concurrency),
+                )
+            else:
+                seed_manifest(corpus, manifest)
+            report(
+                "re-sync, nothing changed",
+                run_sync(upstream.base_url, corpus, manifest, args.concurrency),
+            )
+
+            paths = sorted(corpus.rglob("*.md"))
+            step = max(len(paths) // max(args.changed, 1), 1)
+            for path in paths[::step][: args.changed]:
+                path.write_text(path.read_text() + "\nUpdated.")
+            for path in paths[1::step][: args.changed // 2]:
+                path.unlink()
+            for i in range(args.changed // 2):
+                (corpus / f"new_{i}.md").write_text(f"New document {i}")
+            for path in paths[2::step][: args.changed]:
+                os.utime(path, ns=(0, 0))  # Touched, content unchanged
+
+            report(
+                f"re-sync, {args.changed} edits",
+                run_sync(upstream.base_url, corpus, manifest, args.concurrency),
+            )
+        print(f"📡 Upstream requests: {app.state.calls}")
+
+
+if __name__ == "__main__":
+    main()
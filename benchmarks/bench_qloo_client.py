@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Qloo API calls with and without connection reuse
+
+Runs the fake Qloo API locally and compares per-call latency of opening a
+new HTTP client for every call (the previous behavior) with the shared
+pooled client, sequentially and with concurrent callers. --tls serves HTTPS
+with a throwaway self-signed certificate so every new connection also pays
+a TLS handshake, as against the real API.
+
+Usage:
+    python benchmarks/bench_qloo_client.py [--calls 200] [--concurrency 8] [--tls]
+"""
+
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import os
+import ssl
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the agents directory (and mcp/, home of the shared resilience module)
+project_root = Path(__file__).parent.parent
+for directory in ("mcp", "agents"):
+    sys.path.insert(0, str(project_root / directory))
+
+import qloo_client
+from fake_qloo import FakeQlooServer, create_fake_qloo_app
+
+ENTITIES = ["Nike", "Adidas", "Taylor Swift", "sushi", "Netflix", "Tokyo"]
+
+
+def write_self_signed_cert(directory: Path) -> tuple[str, str]:
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "127.0.0.1")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(hours=1))
+        .add_extension(
+            x509.SubjectAlternativeName(
+                [x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]
+            ),
+            critical=False,
+        )
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = directory / "cert.pem", directory / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(
+        key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    return str(cert_path), str(key_path)
+
+
+async def call(client_options: dict, pooled: bool, i: int) -> float:
+    path, params = qloo_client.build_request(ENTITIES[i % len(ENTITIES)])
+    start = time.perf_counter()
+    if pooled:
+        await qloo_client.get_insights("test", path, params)
+    else:
+        async with qloo_client.create_client(**client_options) as client:
+            await qloo_client.get_insights("test", path, params, client=client)
+    return time.perf_counter() - start
+
+
+async def run_mode(client_options: dict, pooled: bool, calls: int, concurrency: int):
+    if pooled:
+        # Seed the pool with this benchmark's client settings
+        qloo_client._clients[asyncio.get_running_loop()] = qloo_client.create_client(
+            **client_options
+        )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(i: int) -> float:
+        async with semaphore:
+            return await call(client_options, pooled, i)
+
+    start = time.perf_counter()
+    timings = await asyncio.gather(*(limited(i) for i in range(calls)))
+    elapsed = time.perf_counter() - start
+    if pooled:
+        await qloo_client.close_client()
+    return sorted(timings), elapsed
+
+
+def percentile(values: list[float], pct: float) -> float:
+    return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument(
+        "--tls", action="store_true", help="Serve the fake API over HTTPS"
+    )
+    args = parser.parse_args()
+
+    print("🚀 Qloo client connection reuse benchmark")
+    print(
+        f"📡 {args.calls} calls, {'HTTPS' if args.tls else 'HTTP'}, "
+        f"{args.latency * 1000:.0f} ms server latency"
+    )
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client_options, server_options = {}, {}
+        if args.tls:
+            cert, key = write_self_signed_cert(Path(tmp))
+            server_options = {"ssl_certfile": cert, "ssl_keyfile": key}
+            client_options = {"verify": ssl.create_default_context(cafile=cert)}
+
+        app = create_fake_qloo_app(latency=args.latency)
+        with FakeQlooServer(app, **server_options) as server:
+            os.environ["QLOO_API_URL"] = server.base_url
+            print(
+                f"{'mode':<30} {'p50 ms':>8} {'p99 ms':>8} {'calls/s':>9} {'conns':>6}"
+            )
+            for concurrency in (1, args.concurrency):
+                for label, pooled in (("new client per call", False), ("pooled", True)):
+                    app.state.connections.clear()
+                    timings, elapsed = asyncio.run(
+                        run_mode(client_options, pooled, args.calls, concurrency)
+                    )
+                    print(
+                        f"{label + f', {concurrency} caller(s)':<30} "
+                        f"{percentile(timings, 50) * 1000:8.2f} "
+                        f"{percentile(timings, 99) * 1000:8.2f} "
+                        f"{args.calls / elapsed:9.0f} {len(app.state.connections):6d}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
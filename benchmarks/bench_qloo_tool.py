@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Load test: QlooInsightsTool throughput, tail latency and formatting cost
+
+Starts the fake Qloo API (agents/fake_qloo.py) with a configurable latency,
+error and 429 distribution and drives QlooInsightsTool.run() from concurrent
+research sessions for a fixed duration, mixing single and batch calls.
+Reports throughput, latency percentiles and error rate per call kind, the
+API calls and retries behind them, and the time spent in _format_insights,
+both per call under load and in isolation per insight type.
+
+Use it as a regression gate: --max-p99-ms, --min-throughput and
+--max-error-rate set absolute limits, and --baseline compares against the
+--json output of an earlier run. The exit code is 1 when a gate fails.
+
+Usage:
+    python benchmarks/bench_qloo_tool.py [--sessions 16] [--duration 10] [--json out.json]
+    python benchmarks/bench_qloo_tool.py --error-rate 0.05 --rate-limit-rate 0.05
+    python benchmarks/bench_qloo_tool.py --cache-ttl 3600 --contexts 50
+    python benchmarks/bench_qloo_tool.py --baseline out.json --tolerance 0.15
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the agents directory (and mcp/, home of the shared resilience module)
+project_root = Path(__file__).parent.parent
+for directory in ("mcp", "agents"):
+    sys.path.insert(0, str(project_root / directory))
+
+import fake_qloo
+import qloo_cache
+import qloo_client
+import qloo_limits
+from fake_qloo import FakeQlooServer, QlooBehavior, create_fake_qloo_app
+from qloo_cache import InsightCache
+from qloo_limits import QlooCircuitBreaker, QlooGuard
+from QlooInsightsTool import QlooInsightsTool
+from resilience import TokenBucket
+
+BRANDS = ["Nike", "Adidas", "Puma", "Patagonia", "Uniqlo", "Zara", "Lego", "Sony"]
+TAGS = [["fashion"], ["music", "pop"], ["food", "japanese"], ["travel"], None]
+DEMOGRAPHICS = ["Gen Z", "millennials", "adults 25-34", None]
+LOCATIONS = ["United States", "Tokyo", "Europe", None]
+INSIGHT_TYPES = ["recommendations", "affinities", "trends"]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def build_contexts(count: int, seed: int) -> list[dict]:
+    """Distinct entity/tags/demographics/location combinations callers draw from."""
+    rng = random.Random(seed)
+    return [
+        {
+            "entity": f"{rng.choice(BRANDS)} {i}",
+            "tags": rng.choice(TAGS),
+            "demographics": rng.choice(DEMOGRAPHICS),
+            "location": rng.choice(LOCATIONS),
+        }
+        for i in range(count)
+    ]
+
+
+def make_tool(
+    rng: random.Random, contexts: list[dict], batch: bool
+) -> QlooInsightsTool:
+    context = rng.choice(contexts)
+    if batch:
+        # Compare against a second entity with the same tags, demographics and location
+        return QlooInsightsTool(
+            **context,
+            entities=[rng.choice(contexts)["entity"]],
+            insight_types=rng.sample(INSIGHT_TYPES, 2),
+        )
+    return QlooInsightsTool(**context, insight_type=rng.choice(INSIGHT_TYPES))
+
+
+def measure_formatting(iterations: int) -> dict:
+    """Time _format_insights alone on typical responses of each insight type."""
+    tool = QlooInsightsTool(
+        entity="Nike", tags=["fashion", "sport"], demographics="Gen Z", location="Tokyo"
+    )
+    results = {}
+    for insight_type in INSIGHT_TYPES:
+        build = getattr(fake_qloo, insight_type)
+        insights = build("Nike", "fashion,sport|Gen Z|Tokyo", 20)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            tool._format_insights(insights)
+        results[insight_type] = (time.perf_counter() - start) / iterations * 1e6
+    return results
+
+
+async def drive(
+    sessions: int,
+    duration: float,
+    warmup: float,
+    contexts: list[dict],
+    batch_ratio: float,
+    seed: int,
+) -> list[tuple[str, float, bool]]:
+    """
+    Run concurrent sessions calling the tool and record every call.
+
+    Returns:
+        list[tuple[str, float, bool]]: (kind, seconds, succeeded) for calls
+        that started after the warmup period
+    """
+    samples = []
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    async def session_loop(session_index: int):
+        rng = random.Random(seed + session_index)
+        while time.perf_counter() < stop_at:
+            batch = rng.random() < batch_ratio
+            tool = make_tool(rng, contexts, batch)
+            call_start = time.perf_counter()
+            result = await tool.run()
+            if call_start >= measure_from:
+                samples.append(
+                    (
+                        "batch" if batch else "single",
+                        time.perf_counter() - call_start,
+                        not result.startswith("❌"),
+                    )
+                )
+
+    try:
+        await asyncio.gather(*(session_loop(i) for i in range(sessions)))
+    finally:
+        await qloo_client.close_client()
+    return samples
+
+
+def summarize(samples: list[tuple[str, float, bool]], duration: float) -> dict:
+    summary = {}
+    for kind in ["all", "single", "batch"]:
+        selected = [s for s in samples if kind == "all" or s[0] == kind]
+        if not selected:
+            continue
+        latencies = [s[1] * 1000 for s in selected]
+        errors = sum(not s[2] for s in selected)
+        summary[kind] = {
+            "calls": len(selected),
+            "throughput": len(selected) / duration,
+            "error_rate": errors / len(selected),
+            "p50_ms": percentile(latencies, 50),
+            "p90_ms": percentile(latencies, 90),
+            "p99_ms": percentile(latencies, 99),
+            "max_ms": max(latencies),
+        }
+    return summary
+
+
+def check_gates(summary: dict, args, baseline: dict | None) -> list[str]:
+    overall = summary["all"]
+    failures = []
+    if args.min_throughput and overall["throughput"] < args.min_throughput:
+        failures.append(
+            f"throughput {overall['throughput']:.1f} calls/s < {args.min_throughput}"
+        )
+    if args.max_p99_ms and overall["p99_ms"] > args.max_p99_ms:
+        failures.append(f"p99 {overall['p99_ms']:.1f} ms > {args.max_p99_ms} ms")
+    if overall["error_rate"] > args.max_error_rate:
+        failures.append(
+            f"error rate {overall['error_rate']:.2%} > {args.max_error_rate:.2%}"
+        )
+
+    if baseline:
+        before = baseline["summary"]["all"]
+        slack = 1 + args.tolerance
+        if overall["throughput"] * slack < before["throughput"]:
+            failures.append(
+                f"throughput {overall['throughput']:.1f} calls/s regressed from "
+                f"{before['throughput']:.1f}"
+            )
+        for key in ["p50_ms", "p99_ms"]:
+            if overall[key] > before[key] * slack:
+                failures.append(
+                    f"{key[:3]} {overall[key]:.1f} ms regressed from {before[key]:.1f} ms"
+                )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--batch-ratio", type=float, default=0.2)
+    parser.add_argument(
+        "--contexts", type=int, default=200, help="Distinct request contexts"
+    )
+    parser.add_argument(
+        "--cache-ttl", type=float, default=0.0, help="Insight cache TTL (0 disables)"
+    )
+    parser.add_argument("--format-iterations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+
+    client = parser.add_argument_group("client-side limits")
+    client.add_argument(
+        "--requests-per-minute", type=float, default=0.0, help="0 disables pacing"
+    )
+    client.add_argument("--burst", type=float, default=10)
+    client.add_argument("--max-retries", type=int, default=3)
+    client.add_argument("--retry-base-delay", type=float, default=0.05)
+
+    upstream = parser.add_argument_group("fake Qloo API")
+    upstream.add_argument("--latency", type=float, default=0.05)
+    upstream.add_argument("--jitter", type=float, default=0.3)
+    upstream.add_argument("--tail-rate", type=float, default=0.01)
+    upstream.add_argument("--tail-latency", type=float, default=0.5)
+    upstream.add_argument("--error-rate", type=float, default=0.0)
+    upstream.add_argument("--rate-limit-rate", type=float, default=0.0)
+    upstream.add_argument("--retry-after", type=float, default=0.1)
+    upstream.add_argument(
+        "--rate-limit", type=float, default=0.0, help="Requests per second accepted"
+    )
+
+    gates = parser.add_argument_group("regression gate")
+    gates.add_argument("--json", help="Write the results to this file")
+    gates.add_argument("--baseline", help="Results file of an earlier run")
+    gates.add_argument("--tolerance", type=float, default=0.15)
+    gates.add_argument("--min-throughput", type=float)
+    gates.add_argument("--max-p99-ms", type=float)
+    gates.add_argument("--max-error-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    contexts = build_contexts(args.contexts, args.seed)
+    behavior = QlooBehavior(
+        latency=args.latency,
+        jitter=args.jitter,
+        tail_rate=args.tail_rate,
+        tail_latency=args.tail_latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+
+    print("🚀 QlooInsightsTool load test")
+    print(
+        f"👥 {args.sessions} sessions, {args.duration:.0f}s after {args.warmup:.0f}s "
+        f"warmup, {args.batch_ratio:.0%} batch calls, {args.contexts} contexts, "
+        f"cache {'off' if args.cache_ttl <= 0 else f'{args.cache_ttl:.0f}s'}"
+    )
+    print(
+        f"🧪 Fake Qloo API: median {args.latency * 1000:.0f} ms, jitter "
+        f"{args.jitter}, {args.tail_rate:.1%} at {args.tail_latency * 1000:.0f} ms, "
+        f"{args.error_rate:.1%} errors, {args.rate_limit_rate:.1%} 429s"
+        + (f", {args.rate_limit:.0f} req/s quota" if args.rate_limit else "")
+    )
+    print("=" * 70)
+
+    # Retries and failures are counted in the summary instead of logged
+    logging.basicConfig(level=logging.CRITICAL)
+
+    # Replace the process-wide cache and guard with this run's settings
+    qloo_cache._cache = InsightCache(ttl=args.cache_ttl)
+    guard = qloo_limits._guard = QlooGuard(
+        TokenBucket(args.requests_per_minute / 60, args.burst),
+        QlooCircuitBreaker(failure_threshold=0, reset_timeout=30),
+        max_retries=args.max_retries,
+        base_delay=args.retry_base_delay,
+        rng=random.Random(args.seed),
+    )
+
+    # Time _format_insights inside the loaded tool calls
+    format_times = []
+    format_insights = QlooInsightsTool._format_insights
+
+    def timed_format(self, *a, **kw):
+        start = time.perf_counter()
+        try:
+            return format_insights(self, *a, **kw)
+        finally:
+            format_times.append(time.perf_counter() - start)
+
+    QlooInsightsTool._format_insights = timed_format
+
+    app = create_fake_qloo_app(rate_limit=args.rate_limit, behavior=behavior)
+    with FakeQlooServer(app) as server:
+        os.environ["QLOO_API_URL"] = server.base_url
+        os.environ["QLOO_API_KEY"] = "test"
+        samples = asyncio.run(
+            drive(
+                args.sessions,
+                args.duration,
+                args.warmup,
+                contexts,
+                args.batch_ratio,
+                args.seed,
+            )
+        )
+    QlooInsightsTool._format_insights = format_insights
+
+    if not samples:
+        print("❌ No calls completed")
+        sys.exit(1)
+
+    summary = summarize(samples, args.duration)
+    for kind, stats in summary.items():
+        print(
+            f"{kind:<7} {stats['calls']:6d} calls  {stats['throughput']:7.1f}/s  "
+            f"p50={stats['p50_ms']:7.1f}  p90={stats['p90_ms']:7.1f}  "
+            f"p99={stats['p99_ms']:7.1f}  max={stats['max_ms']:7.1f} ms  "
+            f"errors={stats['error_rate']:.2%}"
+        )
+
+    upstream = {
+        "calls": sum(app.state.calls.values()),
+        "errors": app.state.errors,
+        "rate_limited": app.state.rate_limited,
+        "connections": len(app.state.connections),
+    }
+    print(f"📡 Qloo API: {upstream}")
+    print(
+        f"🛡️ Client: {guard.retries} retries, {guard.failures} failed calls, "
+        f"{guard.limiter.waits} paced waits; cache: {qloo_cache._cache.stats()}"
+    )
+
+    formatting = {
+        "calls": len(format_times),
+        "mean_us": sum(format_times) / max(len(format_times), 1) * 1e6,
+        "p99_us": percentile(format_times, 99) * 1e6 if format_times else 0.0,
+        "total_s": sum(format_times),
+        "isolated_us": measure_formatting(args.format_iterations),
+    }
+    print(
+        f"🖋️ _format_insights under load: {formatting['calls']} calls, mean "
+        f"{formatting['mean_us']:.0f} µs, p99 {formatting['p99_us']:.0f} µs, "
+        f"{formatting['total_s'] / (args.warmup + args.duration):.2%} of wall time"
+    )
+    print(
+        "   in isolation: "
+        + ", ".join(f"{k} {v:.0f} µs" for k, v in formatting["isolated_us"].items())
+    )
+
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps(
+                {
+                    "config": vars(args),
+                    "summary": summary,
+                    "upstream": upstream,
+                    "client": guard.stats(),
+                    "formatting": formatting,
+                },
+                indent=2,
+            )
+        )
+        print(f"💾 Results written to {args.json}")
+
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else None
+    failures = check_gates(summary, args, baseline)
+    print("=" * 70)
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ All performance gates passed")
+
+
+if __name__ == "__main__":
+    main()
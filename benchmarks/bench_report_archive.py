@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark: full-text search over the research report archive
+
+Fills a report archive with synthetic research reports (markdown with
+headings, findings and cited links) and measures search_reports query
+latency for common, rare and multi-word queries.
+
+Usage:
+    python benchmarks/bench_report_archive.py [--reports 100000] [--queries 200]
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the mcp directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "mcp"))
+
+from report_archive import ReportArchive
+
+COMPANIES = ["TechCorp", "Globex", "Initech", "Umbrella", "Hooli", "Stark", "Wayne"]
+TOPICS = [
+    "electric vehicles",
+    "cloud computing",
+    "consumer electronics",
+    "renewable energy",
+    "streaming media",
+    "sportswear",
+    "quantum computing",
+    "fintech payments",
+    "biotech",
+    "semiconductors",
+]
+REGIONS = ["Europe", "North America", "Southeast Asia", "Latin America", "Japan"]
+WORDS = (
+    "market share revenue growth margin customers adoption pricing strategy "
+    "competition regulation supply chain demand forecast investment risk "
+    "partnership launch segment brand loyalty survey analyst outlook quarter"
+).split()
+
+QUERY_SETS = {
+    "common word": ["market", "revenue", "growth", "customers"],
+    "rare word": ["quantum", "biotech", "Umbrella", "Japan"],
+    "question": [
+        "electric vehicles market share in Europe",
+        "What is the outlook for cloud computing pricing?",
+        "Hooli streaming media partnership",
+        "renewable energy investment risk in Latin America",
+    ],
+}
+
+
+def make_report(rng: random.Random, i: int) -> dict:
+    company, topic, region = (
+        rng.choice(COMPANIES),
+        rng.choice(TOPICS),
+        rng.choice(REGIONS),
+    )
+    query = f"{company} {topic} outlook in {region}"
+    paragraphs = [
+        " ".join(rng.choices(WORDS, k=60))
+        + f" [{company} report](https://example.com/{i}/{n})"
+        for n in range(rng.randint(4, 10))
+    ]
+    markdown = f"# {query}\n\n## Findings\n\n" + "\n\n".join(paragraphs)
+    return {
+        "markdown": markdown,
+        "query": query,
+        "created_at": 1_700_000_000 + i * 60,
+    }
+
+
+def fill(archive: ReportArchive, reports: int, batch: int = 2000):
+    rng = random.Random(42)
+    for start in range(0, reports, batch):
+        archive.add_many(
+            [make_report(rng, i) for i in range(start, min(start + batch, reports))]
+        )
+    archive.optimize()
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--reports", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args()
+
+    print("🚀 Report archive benchmark")
+    print(f"📚 {args.reports} reports, {args.queries} queries per set")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "archive.db"
+        archive = ReportArchive(path)
+        start = time.perf_counter()
+        fill(archive, args.reports)
+        elapsed = time.perf_counter() - start
+        print(
+            f"📥 Indexed in {elapsed:.1f} s ({args.reports / elapsed:,.0f} reports/s), "
+            f"{path.stat().st_size / 1e6:,.0f} MB on disk"
+        )
+
+        print(
+            f"\n{'query set':<14} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'hits':>6}"
+        )
+        for name, queries in QUERY_SETS.items():
+            timings, hits = [], 0
+            for n in range(args.queries):
+                start = time.perf_counter()
+                results = archive.search(queries[n % len(queries)], limit=args.limit)
+                timings.append((time.perf_counter() - start) * 1000)
+                hits += len(results)
+            print(
+                f"{name:<14} {percentile(timings, 50):8.2f} {percentile(timings, 95):8.2f} "
+                f"{percentile(timings, 99):8.2f} {hits / args.queries:6.1f}"
+            )
+        archive.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Load test: MCP server throughput and latency over SSE
+
+Starts the fake vector store upstream (mcp/fake_vector_store.py) with a
+configurable latency and error distribution, starts the real server
+(python mcp/server.py) pointed at it, and drives the SSE endpoint with
+concurrent MCP clients issuing a mix of search and fetch calls. Reports
+throughput and latency percentiles per tool.
+
+Use it as a regression gate: --max-p99-ms, --min-throughput and
+--max-error-rate set absolute limits, and --baseline compares against the
+--json output of an earlier run. The exit code is 1 when a gate fails.
+
+Usage:
+    python benchmarks/bench_server_load.py [--clients 16] [--duration 10] [--json out.json]
+    python benchmarks/bench_server_load.py --baseline out.json --tolerance 0.15
+    python benchmarks/bench_server_load.py --url http://127.0.0.1:8001  # existing server
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+# Add the mcp directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "mcp"))
+
+from fake_vector_store import (
+    DEFAULT_VECTOR_STORE_ID,
+    FakeCorpus,
+    FakeUpstreamServer,
+    UpstreamBehavior,
+    create_fake_upstream_app,
+)
+from fastmcp import Client
+
+TOPICS = ["revenue", "products", "market", "growth", "customers", "cloud", "AI"]
+
+
+def build_corpus(documents: int) -> FakeCorpus:
+    return FakeCorpus(
+        {
+            f"doc_{i:04d}.txt": f"Document {i} about {TOPICS[i % len(TOPICS)]} "
+            f"and TechCorp {TOPICS[(i + 3) % len(TOPICS)]} in region {i % 13}. " * 60
+            for i in range(documents)
+        }
+    )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def start_server(port: int, upstream_url: str, cache: bool):
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "test",
+        "OPENAI_BASE_URL": upstream_url,
+        "VECTOR_STORE_ID": DEFAULT_VECTOR_STORE_ID,
+        "MCP_BACKEND": "openai",
+        "MCP_TRANSPORT": "sse",
+        "MCP_PORT": str(port),
+        "MCP_PERSISTENT_CACHE_PATH": "",
+    }
+    env.pop("VECTOR_STORE_IDS", None)
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    if not cache:
+        env["MCP_SEARCH_CACHE_MAX_BYTES"] = "0"
+        env["MCP_DOCUMENT_CACHE_MAX_BYTES"] = "0"
+    process = subprocess.Popen(
+        [sys.executable, str(project_root / "mcp" / "server.py")],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.monotonic() + 60
+    while True:
+        if time.monotonic() > deadline or process.poll() is not None:
+            process.kill()
+            raise RuntimeError("MCP server failed to start")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/readyz", timeout=2).is_success:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+
+
+async def drive(
+    url: str,
+    clients: int,
+    duration: float,
+    warmup: float,
+    queries: list[str],
+    ids: list[str],
+    fetch_ratio: float,
+    seed: int,
+) -> list[tuple[str, float, bool]]:
+    """
+    Run concurrent MCP clients against url and record every call.
+
+    Returns:
+        list[tuple[str, float, bool]]: (tool, seconds, succeeded) for calls
+        that started after the warmup period
+    """
+    samples = []
+    start = time.perf_counter()
+    measure_from = start + warmup
+    stop_at = measure_from + duration
+
+    async def client_loop(client_index: int):
+        rng = random.Random(seed + client_index)
+        async with Client(f"{url}/sse") as client:
+            while time.perf_counter() < stop_at:
+                if ids and rng.random() < fetch_ratio:
+                    tool, arguments = "fetch", {"id": rng.choice(ids)}
+                else:
+                    tool, arguments = "search", {"query": rng.choice(queries)}
+                call_start = time.perf_counter()
+                try:
+                    await client.call_tool(tool, arguments)
+                    succeeded = True
+                except Exception:
+                    succeeded = False
+                if call_start >= measure_from:
+                    samples.append((tool, time.perf_counter() - call_start, succeeded))
+
+    await asyncio.gather(*(client_loop(i) for i in range(clients)))
+    return samples
+
+
+def summarize(samples: list[tuple[str, float, bool]], duration: float) -> dict:
+    summary = {}
+    for tool in ["all", "search", "fetch"]:
+        selected = [s for s in samples if tool == "all" or s[0] == tool]
+        if not selected:
+            continue
+        latencies = [s[1] * 1000 for s in selected]
+        errors = sum(not s[2] for s in selected)
+        summary[tool] = {
+            "calls": len(selected),
+            "throughput": len(selected) / duration,
+            "error_rate": errors / len(selected),
+            "p50_ms": percentile(latencies, 50),
+            "p90_ms": percentile(latencies, 90),
+            "p99_ms": percentile(latencies, 99),
+            "max_ms": max(latencies),
+        }
+    return summary
+
+
+def check_gates(summary: dict, args, baseline: dict | None) -> list[str]:
+    overall = summary["all"]
+    failures = []
+    if args.min_throughput and overall["throughput"] < args.min_throughput:
+        failures.append(
+            f"throughput {overall['throughput']:.1f} calls/s < {args.min_throughput}"
+        )
+    if args.max_p99_ms and overall["p99_ms"] > args.max_p99_ms:
+        failures.append(f"p99 {overall['p99_ms']:.1f} ms > {args.max_p99_ms} ms")
+    if overall["error_rate"] > args.max_error_rate:
+        failures.append(
+            f"error rate {overall['error_rate']:.2%} > {args.max_error_rate:.2%}"
+        )
+
+    if baseline:
+        before = baseline["summary"]["all"]
+        slack = 1 + args.tolerance
+        if overall["throughput"] * slack < before["throughput"]:
+            failures.append(
+                f"throughput {overall['throughput']:.1f} calls/s regressed from "
+                f"{before['throughput']:.1f}"
+            )
+        for key in ["p50_ms", "p99_ms"]:
+            if overall[key] > before[key] * slack:
+                failures.append(
+                    f"{key[:3]} {overall[key]:.1f} ms regressed from {before[key]:.1f} ms"
+                )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--url", help="Drive an already running server instead")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--fetch-ratio", type=float, default=0.3)
+    parser.add_argument(
+        "--queries", type=int, default=200, help="Distinct queries in the pool"
+    )
+    parser.add_argument("--documents", type=int, default=200)
+    parser.add_argument("--no-cache", action="store_true", help="Disable caches")
+    parser.add_argument("--seed", type=int, default=0)
+
+    upstream = parser.add_argument_group("fake upstream")
+    upstream.add_argument("--latency", type=float, default=0.05)
+    upstream.add_argument("--jitter", type=float, default=0.3)
+    upstream.add_argument("--tail-rate", type=float, default=0.01)
+    upstream.add_argument("--tail-latency", type=float, default=0.5)
+    upstream.add_argument("--error-rate", type=float, default=0.0)
+    upstream.add_argument("--rate-limit-rate", type=float, default=0.0)
+
+    gates = parser.add_argument_group("regression gate")
+    gates.add_argument("--json", help="Write the results to this file")
+    gates.add_argument("--baseline", help="Results file of an earlier run")
+    gates.add_argument("--tolerance", type=float, default=0.15)
+    gates.add_argument("--min-throughput", type=float)
+    gates.add_argument("--max-p99-ms", type=float)
+    gates.add_argument("--max-error-rate", type=float, default=0.01)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.documents)
+    ids = list(corpus.filenames)
+    rng = random.Random(args.seed)
+    queries = [
+        f"TechCorp {rng.choice(TOPICS)} {rng.choice(TOPICS)} region {i % 13} {i}"
+        for i in range(args.queries)
+    ]
+    behavior = UpstreamBehavior(
+        latency=args.latency,
+        jitter=args.jitter,
+        tail_rate=args.tail_rate,
+        tail_latency=args.tail_latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )
+
+    print("🚀 MCP server load test (SSE)")
+    print(
+        f"👥 {args.clients} clients, {args.duration:.0f}s after {args.warmup:.0f}s "
+        f"warmup, {args.fetch_ratio:.0%} fetches, {args.queries} distinct queries"
+    )
+    if not args.url:
+        print(
+            f"🧪 Fake upstream: median {args.latency * 1000:.0f} ms, jitter "
+            f"{args.jitter}, {args.tail_rate:.1%} at {args.tail_latency * 1000:.0f} ms, "
+            f"{args.error_rate:.1%} errors, {args.rate_limit_rate:.1%} 429s"
+        )
+    print("=" * 70)
+
+    fake = FakeUpstreamServer(create_fake_upstream_app(corpus, behavior=behavior))
+    process = None
+    with fake:
+        url = args.url
+        if not url:
+            port = free_port()
+            process = start_server(port, fake.base_url, cache=not args.no_cache)
+            url = f"http://127.0.0.1:{port}"
+        try:
+            samples = asyncio.run(
+                drive(
+                    url,
+                    args.clients,
+                    args.duration,
+                    args.warmup,
+                    queries,
+                    ids,
+                    args.fetch_ratio,
+                    args.seed,
+                )
+            )
+        finally:
+            if process:
+                process.terminate()
+                process.wait(timeout=30)
+        upstream_calls = dict(fake.server.config.app.state.calls)
+
+    if not samples:
+        print("❌ No calls completed")
+        sys.exit(1)
+
+    summary = summarize(samples, args.duration)
+    for tool, stats in summary.items():
+        print(
+            f"{tool:<7} {stats['calls']:6d} calls  {stats['throughput']:7.1f}/s  "
+            f"p50={stats['p50_ms']:7.1f}  p90={stats['p90_ms']:7.1f}  "
+            f"p99={stats['p99_ms']:7.1f}  max={stats['max_ms']:7.1f} ms  "
+            f"errors={stats['error_rate']:.2%}"
+        )
+    if not args.url:
+        print(f"📡 Upstream requests: {upstream_calls}")
+
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps(
+                {"config": vars(args), "summary": summary, "upstream": upstream_calls},
+                indent=2,
+            )
+        )
+        print(f"💾 Results written to {args.json}")
+
+    baseline = json.loads(Path(args.baseline).read_text()) if args.baseline else None
+    failures = check_gates(summary, args, baseline)
+    print("=" * 70)
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ All performance gates passed")
+
+
+if __name__ == "__main__":
+    main()
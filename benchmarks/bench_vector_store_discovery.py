@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: vector store discovery at server startup
+
+Builds a synthetic workspace: the project (with an agency files_vs_* folder,
+a research-ui/node_modules tree and a reports/ folder) next to a large
+sibling checkout. Then times, from the project root:
+
+- the previous unbounded recursive glob ("**/files_vs_*" and "../**/files_vs_*")
+- the bounded walk (cold, no manifest)
+- a startup that reuses the cached manifest
+- the bounded walk when started from mcp/ (falls back to the parent)
+
+Usage:
+    python benchmarks/bench_vector_store_discovery.py [--packages 20000] [--rounds 3]
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the mcp directory to Python path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "mcp"))
+
+from vector_utils import detect_vector_store_id
+
+
+def build_workspace(workspace: Path, packages: int) -> Path:
+    project = workspace / "project"
+    (project / "BasicResearchAgency" / "files_vs_bench123").mkdir(parents=True)
+    (project / "mcp").mkdir()
+    for i in range(200):
+        (project / "reports" / f"run_{i:03d}").mkdir(parents=True)
+
+    # A front-end dependency tree and a big sibling checkout, 3 levels each
+    for tree in (project / "research-ui" / "node_modules", workspace / "monorepo"):
+        for i in range(packages):
+            (tree / f"pkg_{i:05d}" / "lib" / "src").mkdir(parents=True)
+    return project
+
+
+def legacy_discovery() -> list[str]:
+    folders = []
+    for pattern in ["**/files_vs_*", "../**/files_vs_*"]:
+        folders.extend(glob.glob(pattern, recursive=True))
+    return list(set(folders))
+
+
+def timed(function, rounds: int) -> tuple[float, object]:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = function()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--packages", type=int, default=20000, help="Packages per large tree"
+    )
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    os.environ.pop("VECTOR_STORE_ID", None)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        project = build_workspace(Path(tmp), args.packages)
+        directories = sum(len(dirs) for _, dirs, _ in os.walk(tmp))
+        print("🚀 Vector store discovery benchmark")
+        print(
+            f"📁 {directories} directories in the workspace "
+            f"(built in {time.perf_counter() - start:.1f} s)"
+        )
+        print("=" * 70)
+
+        os.chdir(project)
+        manifest = Path(tmp) / "index" / "vector_store.json"
+
+        legacy_ms, folders = timed(legacy_discovery, args.rounds)
+        print(f"legacy recursive glob   {legacy_ms:9.1f} ms  ({len(folders)} found)")
+
+        def cold():
+            manifest.unlink(missing_ok=True)
+            return detect_vector_store_id(manifest)
+
+        bounded_ms, store_id = timed(cold, args.rounds)
+        print(f"bounded walk (cold)     {bounded_ms:9.1f} ms  ({store_id})")
+
+        cached_ms, store_id = timed(lambda: detect_vector_store_id(manifest), 5)
+        print(f"cached manifest         {cached_ms:9.1f} ms  ({store_id})")
+
+        os.chdir(project / "mcp")
+        mcp_ms, store_id = timed(cold, args.rounds)
+        print(f"bounded walk from mcp/  {mcp_ms:9.1f} ms  ({store_id})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark: MCP server throughput vs number of worker processes
+
+Starts the real server (python mcp/server.py) with the local backend over
+stateless streamable HTTP for each worker count, drives it with concurrent
+MCP clients issuing uncached searches, and reports throughput and latency.
+Results and caches are per worker, so caching is disabled to measure the
+request path itself.
+
+Usage:
+    python benchmarks/bench_workers.py [--workers 1,2,4] [--clients 16] [--duration 10]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from fastmcp import Client
+
+project_root = Path(__file__).parent.parent
+
+TOPICS = ["revenue", "products", "market", "growth", "customers", "cloud", "AI"]
+
+
+def write_corpus(directory: Path, documents: int):
+    directory.mkdir(parents=True, exist_ok=True)
+    for i in range(documents):
+        (directory / f"doc_{i:04d}.txt").write_text(
+            f"Document {i} about {TOPICS[i % len(TOPICS)]} and TechCorp "
+            f"{TOPICS[(i + 3) % len(TOPICS)]} in region {i % 13}. " * 60,
+            encoding="utf-8",
+        )
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workers: int, port: int, corpus: Path, index: Path):
+    env = {
+        **os.environ,
+        "MCP_BACKEND": "local",
+        "MCP_CORPUS_DIR": str(corpus),
+        "MCP_INDEX_DIR": str(index),
+        "MCP_TRANSPORT": "streamable-http",
+        "MCP_WORKERS": str(workers),
+        "MCP_PORT": str(port),
+        "MCP_SEARCH_CACHE_MAX_BYTES": "0",
+        "MCP_DOCUMENT_CACHE_MAX_BYTES": "0",
+    }
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    process = subprocess.Popen(
+        [sys.executable, str(project_root / "mcp" / "server.py")],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    # Wait until every worker has loaded the index and answers /readyz
+    deadline = time.monotonic() + 120
+    ready = 0
+    while ready < workers * 5:
+        if time.monotonic() > deadline or process.poll() is not None:
+            process.kill()
+            raise RuntimeError(f"Server with {workers} workers failed to start")
+        try:
+            response = httpx.get(f"http://127.0.0.1:{port}/readyz", timeout=2)
+            ready += response.status_code == 200
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    return process
+
+
+async def drive(url: str, clients: int, duration: float) -> list[float]:
+    latencies: list[float] = []
+    stop_at = time.perf_counter() + duration
+
+    async def client_loop(client_index: int):
+        async with Client(url) as client:
+            i = 0
+            while time.perf_counter() < stop_at:
+                query = f"TechCorp {TOPICS[i % len(TOPICS)]} region {client_index} {i}"
+                start = time.perf_counter()
+                await client.call_tool("search", {"query": query})
+                latencies.append(time.perf_counter() - start)
+                i += 1
+
+    await asyncio.gather(*(client_loop(i) for i in range(clients)))
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--workers", default="1,2,4", help="Worker counts to test")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--documents", type=int, default=300)
+    args = parser.parse_args()
+
+    print("🚀 MCP server worker scaling benchmark (streamable HTTP)")
+    print(f"🖥️  {os.cpu_count()} CPUs, {args.clients} concurrent clients")
+    print("=" * 70)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = Path(tmp) / "files"
+        write_corpus(corpus, args.documents)
+
+        baseline = None
+        for workers in [int(n) for n in args.workers.split(",")]:
+            port = free_port()
+            process = start_server(workers, port, corpus, Path(tmp) / "index")
+            try:
+                latencies = asyncio.run(
+                    drive(f"http://127.0.0.1:{port}/mcp", args.clients, args.duration)
+                )
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+
+            throughput = len(latencies) / args.duration
+            baseline = baseline or throughput
+            ordered = sorted(latencies)
+            print(
+                f"workers={workers:<2}  {throughput:7.1f} calls/s  "
+                f"(x{throughput / baseline:.2f})  "
+                f"p50={statistics.median(ordered) * 1000:7.1f} ms  "
+                f"p99={ordered[int(len(ordered) * 0.99)] * 1000:7.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,901 @@
+#!/usr/bin/env python3
+"""
+Vector Store Backends
+
+Pluggable retrieval backends behind the MCP server's search and fetch tools.
+The OpenAI backend talks to a hosted vector store; the local backend chunks and
+embeds the files/ corpus once and answers queries from a memory-mapped NumPy
+matrix, so the server can run without network access. The federated backend
+searches several stores at once and merges their rankings.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import zlib
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from filters import filter_conditions, matches, to_openai_filter
+from lexical import BM25Index, reciprocal_rank_fusion, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Default number of chunks returned per search (matches the OpenAI API default)
+DEFAULT_TOP_K = 10
+
+# Candidates taken from each ranking before hybrid rank fusion, per result
+HYBRID_CANDIDATE_FACTOR = 4
+
+# File types indexed by the local backend (same set the agencies upload)
+SUPPORTED_EXTENSIONS = {".txt", ".md", ".json", ".csv"}
+
+INDEX_FORMAT_VERSION = 1
+
+
+class BackendConfigurationError(ValueError):
+    """Raised when a backend is missing credentials, a store ID or its index."""
+
+
+def search_options(
+    max_results: int | None = None,
+    filters: dict[str, Any] | None = None,
+    score_threshold: float | None = None,
+) -> dict[str, Any]:
+    """Keyword arguments for VectorStoreBackend.search, leaving out unset options."""
+    options = {
+        "max_results": max_results,
+        "filters": filters or None,
+        "score_threshold": score_threshold,
+    }
+    return {name: value for name, value in options.items() if value is not None}
+
+
+class VectorStoreBackend:
+    """Base class for the retrieval backends used by the MCP server."""
+
+    name = "base"
+
+    # Admission control applied to upstream requests, if any
+    guard = None
+
+    @property
+    def store_id(self) -> str:
+        """Identifier of the underlying store, used to namespace cached results."""
+        raise NotImplementedError
+
+    def check_ready(self):
+        """Raise BackendConfigurationError if the backend cannot serve requests yet."""
+
+    async def store_version(self) -> str | None:
+        """
+        Return a token that changes whenever the store's contents change.
+
+        Used to invalidate cached results; None means the version is unknown.
+        """
+        return None
+
+    async def search(
+        self,
+        query: str,
+        max_results: int | None = None,
+        filters: dict[str, Any] | None = None,
+        score_threshold: float | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Search the store for chunks relevant to a query.
+
+        Limits, filters and thresholds are applied by the index itself, so
+        excluded chunks are never transferred.
+
+        Args:
+            query: Natural language search query
+            max_results: Maximum number of hits (backend default if None)
+            filters: Attribute filters (see filters.py)
+            score_threshold: Minimum relevance score (0-1) of returned hits
+
+        Returns:
+            list: Chunk hits as dicts with id, title, text, score and url
+        """
+        raise NotImplementedError
+
+    async def fetch(self, file_id: str) -> dict[str, Any]:
+        """
+        Retrieve a complete document.
+
+        Args:
+            file_id: Document ID returned by search
+
+        Returns:
+            dict: Document with id, title, text, url and metadata
+        """
+        raise NotImplementedError
+
+
+class OpenAIVectorStoreBackend(VectorStoreBackend):
+    """
+    Backend that searches a hosted OpenAI vector store with an AsyncOpenAI client.
+
+    Args:
+        client: AsyncOpenAI client (None when no API key is configured)
+        vector_store_id: Vector store to query
+        guard: Optional UpstreamGuard (rate limiter, retries, circuit breaker)
+            wrapped around every API request
+    """
+
+    name = "openai"
+
+    def __init__(self, client, vector_store_id: str | None, guard=None):
+        self.client = client
+        self.vector_store_id = vector_store_id
+        self.guard = guard
+
+    async def _request(self, operation: str, request):
+        if self.guard is None:
+            return await request()
+        return await self.guard.call(operation, request)
+
+    @property
+    def store_id(self) -> str:
+        return self.vector_store_id or ""
+
+    def _check_configured(self, action: str):
+        if not self.client:
+            logger.error("OpenAI client not initialized - API key missing")
+            raise BackendConfigurationError(
+                f"OpenAI API key is required for vector store {action}"
+            )
+
+        if not self.vector_store_id:
+            logger.error("Vector store ID not configured")
+            raise BackendConfigurationError(f"Vector store ID is required for {action}")
+
+    def check_ready(self):
+        if not self.client:
+            raise BackendConfigurationError("OpenAI client is not initialized")
+        if not self.vector_store_id:
+            raise BackendConfigurationError("Vector store ID has not been detected")
+
+    @staticmethod
+    def file_url(file_id: str) -> str:
+        return f"https://platform.openai.com/storage/files/{file_id}"
+
+    async def store_version(self) -> str | None:
+        self._check_configured("version check")
+        store = await self._request(
+            "version check",
+            lambda: self.client.vector_stores.retrieve(self.vector_store_id),
+        )
+        counts = store.file_counts
+        return f"{counts.total}:{counts.completed}:{store.usage_bytes}"
+
+    async def search(
+        self,
+        query: str,
+        max_results: int | None = None,
+        filters: dict[str, Any] | None = None,
+        score_threshold: float | None = None,
+    ) -> list[dict[str, Any]]:
+        self._check_configured("search")
+
+        options = {}
+        if max_results:
+            options["max_num_results"] = max_results
+        if openai_filter := to_openai_filter(filters):
+            options["filters"] = openai_filter
+        if score_threshold is not None:
+            options["ranking_options"] = {"score_threshold": score_threshold}
+
+        response = await self._request(
+            "search",
+            lambda: self.client.vector_stores.search(
+                vector_store_id=self.vector_store_id, query=query, **options
+            ),
+        )
+
+        hits = []
+        if hasattr(response, "data") and response.data:
+            for i, item in enumerate(response.data):
+                item_id = getattr(item, "file_id", f"vs_{i}")
+
+                # Extract text content
+                content_list = getattr(item, "content", [])
+                text_content = ""
+                if content_list and len(content_list) > 0:
+                    first_content = content_list[0]
+                    if hasattr(first_content, "text"):
+                        text_content = first_content.text
+                    elif isinstance(first_content, dict):
+                        text_content = first_content.get("text", "")
+
+                hits.append(
+                    {
+                        "id": item_id,
+                        "title": getattr(item, "filename", f"Document {i + 1}"),
+                        "text": text_content,
+                        "score": getattr(item, "score", None),
+                        "url": self.file_url(item_id),
+                    }
+                )
+        return hits
+
+    async def fetch(self, file_id: str) -> dict[str, Any]:
+        self._check_configured("file retrieval")
+
+        # Fetch file content and metadata from the vector store concurrently
+        content_response, file_info = await asyncio.gather(
+            self._request(
+                "file content",
+                lambda: self.client.vector_stores.files.content(
+                    vector_store_id=self.vector_store_id, file_id=file_id
+                ),
+            ),
+            self._request(
+                "file retrieval",
+                lambda: self.client.vector_stores.files.retrieve(
+                    vector_store_id=self.vector_store_id, file_id=file_id
+                ),
+            ),
+        )
+
+        # Extract content
+        if hasattr(content_response, "data") and content_response.data:
+            content_parts = []
+            for content_item in content_response.data:
+                if hasattr(content_item, "text"):
+                    content_parts.append(content_item.text)
+            file_content = "\n".join(content_parts)
+        else:
+            file_content = "No content available"
+
+        metadata = None
+        if hasattr(file_info, "attributes") and file_info.attributes:
+            metadata = file_info.attributes
+
+        return {
+            "id": file_id,
+            "title": getattr(file_info, "filename", f"Document {file_id}"),
+            "text": file_content,
+            "url": self.file_url(file_id),
+            "metadata": metadata,
+        }
+
+
+class HashingEmbedder:
+    """
+    Dependency-free text embedder based on the hashing trick.
+
+    Word unigrams and bigrams are hashed with CRC32 into a fixed number of
+    signed buckets and the vector is L2-normalized, so cosine similarity is a
+    plain dot product. CRC32 is stable across processes, which keeps persisted
+    embeddings valid between server restarts.
+    """
+
+    def __init__(self, dim: int = 1024):
+        self.dim = dim
+
+    @property
+    def signature(self) -> str:
+        return f"hashing-crc32-uni-bi-{self.dim}"
+
+    def _features(self, text: str) -> list[str]:
+        tokens = tokenize(text)
+        return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """
+        Embed a batch of texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            np.ndarray: float32 matrix of shape (len(texts), dim) with unit rows
+        """
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            features = self._features(text)
+            if not features:
+                continue
+            hashes = np.fromiter(
+                (zlib.crc32(f.encode("utf-8")) for f in features),
+                dtype=np.uint32,
+                count=len(features),
+            )
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            np.add.at(matrix[row], hashes % self.dim, signs)
+
+        # Sublinear term frequency, then unit length
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+def chunk_text(text: str, chunk_size: int = 800, overlap: int = 100):
+    """
+    Split text into overlapping character windows that end on whitespace.
+
+    Args:
+        text: Document text
+        chunk_size: Target chunk length in characters
+        overlap: Characters shared between consecutive chunks
+
+    Returns:
+        list: (start, end) character offsets of each chunk
+    """
+    spans = []
+    start = 0
+    length = len(text)
+    while start < length:
+        end = min(start + chunk_size, length)
+        if end < length:
+            # Prefer to break at the last whitespace inside the window
+            split = text.rfind(" ", start + chunk_size // 2, end)
+            newline = text.rfind("\n", start + chunk_size // 2, end)
+            split = max(split, newline)
+            if split > start:
+                end = split
+        if text[start:end].strip():
+            spans.append((start, end))
+        if end >= length:
+            break
+        start = max(end - overlap, start + 1)
+    return spans
+
+
+class LocalVectorIndexBackend(VectorStoreBackend):
+    """
+    Backend that serves search and fetch from a local index of the corpus.
+
+    The corpus is chunked and embedded once; embeddings are saved as a .npy
+    matrix next to a JSON manifest and loaded memory-mapped, so a restart
+    only re-embeds when the corpus files change. With hybrid enabled, a BM25
+    index over the same chunks is queried in parallel and the two rankings
+    are merged with reciprocal rank fusion, so exact terms such as product
+    codes match even when their embeddings do not.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        corpus_dir: str | os.PathLike,
+        index_dir: str | os.PathLike | None = None,
+        embedder: HashingEmbedder | None = None,
+        chunk_size: int = 800,
+        chunk_overlap: int = 100,
+        top_k: int = DEFAULT_TOP_K,
+        hybrid: bool = True,
+    ):
+        self.corpus_dir = Path(corpus_dir).resolve()
+        self.index_dir = (
+            Path(index_dir)
+            if index_dir
+            else self.corpus_dir.parent / ".mcp_index" / self.corpus_dir.name
+        )
+        self.embedder = embedder or HashingEmbedder()
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.top_k = top_k
+
+        self.fingerprint = None
+        self.documents: dict[str, dict[str, Any]] = {}
+        self.chunks: list[dict[str, Any]] = []
+        self.matrix: np.ndarray | None = None
+        self.chunk_keys: list[tuple[str, int]] = []
+        self._chunks_by_key: dict[tuple[str, int], dict[str, Any]] = {}
+        # Matrix rows [start, end) of each file's chunks, for filtered searches
+        self._file_rows: dict[str, tuple[int, int]] = {}
+
+        # Lexical index, keyed by (file ID, chunk number) and updated per file
+        self.lexical = BM25Index() if hybrid else None
+        self._lexical_files: dict[str, tuple[str, int]] = {}
+
+    @property
+    def store_id(self) -> str:
+        return f"local:{self.corpus_dir}"
+
+    @staticmethod
+    def file_id_for(relative_path: str) -> str:
+        digest = hashlib.sha1(relative_path.encode("utf-8")).hexdigest()
+        return f"local-{digest[:24]}"
+
+    def _corpus_files(self) -> list[Path]:
+        files = []
+        for root, dirs, names in os.walk(self.corpus_dir):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(names):
+                path = Path(root) / name
+                if path.suffix.lower() in SUPPORTED_EXTENSIONS:
+                    files.append(path)
+        return files
+
+    def _compute_fingerprint(self, files: list[Path]) -> str:
+        digest = hashlib.sha1()
+        digest.update(
+            f"{INDEX_FORMAT_VERSION}|{self.embedder.signature}|"
+            f"{self.chunk_size}|{self.chunk_overlap}".encode()
+        )
+        for path in files:
+            stat = path.stat()
+            relative = path.relative_to(self.corpus_dir).as_posix()
+            digest.update(f"|{relative}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()
+
+    def load(self) -> "LocalVectorIndexBackend":
+        """
+        Load the index from disk, rebuilding it if the corpus changed.
+
+        Returns:
+            LocalVectorIndexBackend: self, for chaining
+
+        Raises:
+            ValueError: If the corpus directory does not exist
+        """
+        index = self._read_index()
+        self._update_lexical(index)
+        self._apply(index)
+        return self
+
+    def _read_index(self) -> tuple:
+        if not self.corpus_dir.is_dir():
+            raise ValueError(f"Corpus directory not found: {self.corpus_dir}")
+
+        files = self._corpus_files()
+        fingerprint = self._compute_fingerprint(files)
+        manifest_path = self.index_dir / "manifest.json"
+        matrix_path = self.index_dir / "embeddings.npy"
+
+        manifest = None
+        if manifest_path.exists() and matrix_path.exists():
+            try:
+                manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Ignoring unreadable index manifest: {e}")
+
+        if not manifest or manifest.get("fingerprint") != fingerprint:
+            logger.info(f"Building local vector index for {self.corpus_dir}")
+            manifest = self._build(files, fingerprint, manifest_path, matrix_path)
+        else:
+            logger.info(f"Loaded local vector index from {self.index_dir}")
+
+        matrix = np.load(matrix_path, mmap_mode="r")
+        return fingerprint, manifest["documents"], manifest["chunks"], matrix
+
+    def _apply(self, index: tuple):
+        # Swap all index state at once, on the caller's thread
+        fingerprint, documents, chunks, matrix = index
+        chunk_keys = []
+        counters: dict[str, int] = {}
+        file_rows: dict[str, tuple[int, int]] = {}
+        for row, chunk in enumerate(chunks):
+            number = counters.get(chunk["file_id"], 0)
+            counters[chunk["file_id"]] = number + 1
+            chunk_keys.append((chunk["file_id"], number))
+            # A file's chunks are stored consecutively
+            start = file_rows.get(chunk["file_id"], (row, row))[0]
+            file_rows[chunk["file_id"]] = (start, row + 1)
+
+        (
+            self.fingerprint,
+            self.documents,
+            self.chunks,
+            self.matrix,
+            self.chunk_keys,
+            self._chunks_by_key,
+            self._file_rows,
+        ) = (
+            fingerprint,
+            documents,
+            chunks,
+            matrix,
+            chunk_keys,
+            dict(zip(chunk_keys, chunks)),
+            file_rows,
+        )
+        logger.info(
+            f"Local index ready: {len(self.documents)} documents, "
+            f"{len(self.chunks)} chunks"
+        )
+
+    def _build(self, files, fingerprint, manifest_path, matrix_path) -> dict:
+        documents = {}
+        chunks = []
+        for path in files:
+            relative = path.relative_to(self.corpus_dir).as_posix()
+            text = path.read_text(encoding="utf-8", errors="replace")
+            file_id = self.file_id_for(relative)
+            documents[file_id] = {"path": relative, "title": path.name}
+            for start, end in chunk_text(text, self.chunk_size, self.chunk_overlap):
+                chunks.append({"file_id": file_id, "text": text[start:end]})
+
+        matrix = self.embedder.embed([chunk["text"] for chunk in chunks])
+        manifest = {
+            "version": INDEX_FORMAT_VERSION,
+            "fingerprint": fingerprint,
+            "dim": self.embedder.dim,
+            "documents": documents,
+            "chunks": chunks,
+        }
+
+        # Write to temporary files first so a crash never leaves a torn index
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        tmp_matrix = matrix_path.with_suffix(".tmp.npy")
+        tmp_manifest = manifest_path.with_suffix(".tmp")
+        np.save(tmp_matrix, matrix)
+        tmp_manifest.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp_matrix, matrix_path)
+        os.replace(tmp_manifest, manifest_path)
+        return manifest
+
+    def _update_lexical(self, index: tuple):
+        """Re-index only the files whose chunks changed since the last update."""
+        if self.lexical is None:
+            return
+
+        texts_by_file: dict[str, list[str]] = {}
+        for chunk in index[2]:
+            texts_by_file.setdefault(chunk["file_id"], []).append(chunk["text"])
+
+        for file_id in set(self._lexical_files) - set(texts_by_file):
+            _, count = self._lexical_files.pop(file_id)
+            for number in range(count):
+                self.lexical.remove((file_id, number))
+
+        updated = 0
+        for file_id, texts in texts_by_file.items():
+            version = hashlib.sha1("\x00".join(texts).encode("utf-8")).hexdigest()
+            previous = self._lexical_files.get(file_id)
+            if previous and previous[0] == version:
+                continue
+            for number in range(len(texts), previous[1] if previous else 0):
+                self.lexical.remove((file_id, number))
+            for number, text in enumerate(texts):
+                self.lexical.add((file_id, number), text)
+            self._lexical_files[file_id] = (version, len(texts))
+            updated += 1
+        logger.info(f"Lexical index updated for {updated} changed files")
+
+    def _read_index_if_changed(self) -> tuple | None:
+        if self._compute_fingerprint(self._corpus_files()) == self.fingerprint:
+            return None
+        logger.info(f"Corpus {self.corpus_dir} changed, reloading local index")
+        index = self._read_index()
+        self._update_lexical(index)
+        return index
+
+    async def store_version(self) -> str | None:
+        self._check_loaded()
+        # Re-stat (and if needed rebuild) off the event loop, then swap in place
+        index = await asyncio.to_thread(self._read_index_if_changed)
+        if index is not None:
+            self._apply(index)
+        return self.fingerprint
+
+    def _check_loaded(self):
+        if self.matrix is None:
+            raise BackendConfigurationError("Local vector index is not loaded")
+
+    def check_ready(self):
+        self._check_loaded()
+
+    def file_url(self, file_id: str) -> str:
+        return (self.corpus_dir / self.documents[file_id]["path"]).as_uri()
+
+    @staticmethod
+    def attributes(document: dict[str, Any]) -> dict[str, Any]:
+        """Attributes a document can be filtered on."""
+        return {"filename": document["title"], "path": document["path"]}
+
+    def matching_files(self, filters: dict[str, Any] | None) -> set[str] | None:
+        """IDs of the documents whose attributes pass filters (None if unfiltered)."""
+        conditions = filter_conditions(filters)
+        if not conditions:
+            return None
+        return {
+            file_id
+            for file_id, document in self.documents.items()
+            if matches(self.attributes(document), conditions)
+        }
+
+    def top_k_chunks(
+        self,
+        query: str,
+        k: int | None = None,
+        files: set[str] | None = None,
+        score_threshold: float | None = None,
+    ) -> list[tuple[tuple[str, int], float]]:
+        """
+        Return ((file ID, chunk number), score) pairs for the best vector matches.
+
+        Args:
+            query: Search query
+            k: Number of matches (defaults to top_k)
+            files: Only rank chunks of these file IDs
+            score_threshold: Minimum cosine similarity
+        """
+        self._check_loaded()
+        # Snapshot the index so a concurrent reload cannot mix old and new rows
+        matrix, chunk_keys, file_rows = self.matrix, self.chunk_keys, self._file_rows
+        k = min(k or self.top_k, len(chunk_keys))
+        if k == 0:
+            return []
+
+        query_vector = self.embedder.embed([query])[0]
+        if files is None:
+            rows = None
+            scores = matrix @ query_vector
+        else:
+            # Score only the rows of matching files
+            ranges = [file_rows[file_id] for file_id in files if file_id in file_rows]
+            if not ranges:
+                return []
+            rows = np.concatenate([np.arange(start, end) for start, end in ranges])
+            scores = matrix[rows] @ query_vector
+            k = min(k, len(rows))
+
+        if k < len(scores):
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(len(scores))
+        ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+        if score_threshold is not None:
+            ranked = ranked[scores[ranked] >= score_threshold]
+        positions = ranked if rows is None else rows[ranked]
+        return [
+            (chunk_keys[row], float(score))
+            for row, score in zip(positions, scores[ranked])
+        ]
+
+    def chunk_similarity(
+        self, query: str, keys: list[tuple[str, int]]
+    ) -> dict[tuple[str, int], float]:
+        """
+        Return the cosine similarity of the query to each of the given chunks.
+
+        Keys that are not in the loaded index are left out.
+        """
+        self._check_loaded()
+        matrix, file_rows = self.matrix, self._file_rows
+        rows, known = [], []
+        for file_id, number in keys:
+            start, end = file_rows.get(file_id, (0, 0))
+            if start + number < end:
+                rows.append(start + number)
+                known.append((file_id, number))
+        if not rows:
+            return {}
+        scores = matrix[rows] @ self.embedder.embed([query])[0]
+        return {key: float(score) for key, score in zip(known, scores)}
+
+    async def _ranked_chunks(
+        self,
+        query: str,
+        top_k: int,
+        files: set[str] | None,
+        score_threshold: float | None,
+    ) -> list[tuple[tuple[str, int], float]]:
+        if self.lexical is None:
+            return self.top_k_chunks(query, top_k, files, score_threshold)
+
+        # Query both indexes in parallel and fuse their rankings. Fusion only
+        # orders the hits: every hit, keyword-only ones included, reports and
+        # is thresholded on its cosine similarity like a vector-only search
+        candidates = top_k * HYBRID_CANDIDATE_FACTOR
+        allowed = None if files is None else (lambda key: key[0] in files)
+        vector, lexical = await asyncio.gather(
+            asyncio.to_thread(self.top_k_chunks, query, candidates, files),
+            asyncio.to_thread(self.lexical.search, query, candidates, allowed),
+        )
+        similarity = dict(vector)
+        keyword_only = [key for key, _ in lexical if key not in similarity]
+        if keyword_only:
+            similarity.update(
+                await asyncio.to_thread(self.chunk_similarity, query, keyword_only)
+            )
+
+        fused = reciprocal_rank_fusion(
+            [[key for key, _ in vector], [key for key, _ in lexical]]
+        )
+        ranked = [
+            (key, similarity[key])
+            for key, _ in fused
+            if key in similarity
+            and (score_threshold is None or similarity[key] >= score_threshold)
+        ]
+        return ranked[:top_k]
+
+    async def search(
+        self,
+        query: str,
+        max_results: int | None = None,
+        filters: dict[str, Any] | None = None,
+        score_threshold: float | None = None,
+    ) -> list[dict[str, Any]]:
+        self._check_loaded()
+        files = self.matching_files(filters)
+        if files is not None and not files:
+            return []
+
+        chunks_by_key = self._chunks_by_key
+        ranked = await self._ranked_chunks(
+            query, max_results or self.top_k, files, score_threshold
+        )
+        hits = []
+        for key, score in ranked:
+            chunk = chunks_by_key.get(key)
+            if chunk is None:
+                # Indexed by a reload that has not been swapped in yet
+                continue
+            file_id = chunk["file_id"]
+            hits.append(
+                {
+                    "id": file_id,
+                    "title": self.documents[file_id]["title"],
+                    "text": chunk["text"],
+                    "score": score,
+                    "url": self.file_url(file_id),
+                }
+            )
+        return hits
+
+    async def fetch(self, file_id: str) -> dict[str, Any]:
+        self._check_loaded()
+        document = self.documents.get(file_id)
+        if not document:
+            raise ValueError(f"Unknown document ID: {file_id}")
+
+        path = self.corpus_dir / document["path"]
+        # Read off the event loop: documents can be large or on slow disks
+        text = await asyncio.to_thread(
+            path.read_text, encoding="utf-8", errors="replace"
+        )
+        return {
+            "id": file_id,
+            "title": document["title"],
+            "text": text,
+            "url": path.as_uri(),
+            "metadata": {"path": document["path"]},
+        }
+
+
+class FederatedVectorStoreBackend(VectorStoreBackend):
+    """
+    Backend that searches several stores concurrently and merges their hits.
+
+    Rankings are merged with reciprocal rank fusion ("rrf") or by per-store
+    min-max normalized scores ("score"); either only orders the hits, which
+    keep the score their own store gave them. Returned IDs name the owning
+    store ("<store_id>/<file_id>"), so fetch goes straight to that store,
+    also for IDs served from a persisted cache after a restart.
+
+    Args:
+        backends: One backend per store
+        fusion: "rrf" or "score"
+        top_k: Number of merged hits returned per search
+    """
+
+    name = "federated"
+
+    # File IDs never contain it, so the last one ends the store ID
+    ID_SEPARATOR = "/"
+
+    def __init__(
+        self,
+        backends: list[VectorStoreBackend],
+        fusion: str = "rrf",
+        top_k: int = DEFAULT_TOP_K,
+    ):
+        if fusion not in ("rrf", "score"):
+            raise ValueError(f"Unknown fusion '{fusion}' (use 'rrf' or 'score')")
+        self.backends = backends
+        self.guard = next((b.guard for b in backends if b.guard is not None), None)
+        self.fusion = fusion
+        self.top_k = top_k
+        self._by_store = {backend.store_id: backend for backend in backends}
+
+    @property
+    def store_id(self) -> str:
+        return "+".join(backend.store_id for backend in self.backends)
+
+    def check_ready(self):
+        for backend in self.backends:
+            backend.check_ready()
+
+    async def store_version(self) -> str | None:
+        versions = await asyncio.gather(
+            *(backend.store_version() for backend in self.backends)
+        )
+        return "|".join(str(version) for version in versions)
+
+    def federated_id(self, backend: VectorStoreBackend, file_id: str) -> str:
+        """Return the ID under which a store's file is exposed."""
+        return f"{backend.store_id}{self.ID_SEPARATOR}{file_id}"
+
+    @staticmethod
+    def _normalized_scores(hits: list[dict[str, Any]]) -> list[float]:
+        scores = [hit.get("score") for hit in hits]
+        if any(score is None for score in scores):
+            # No usable scores: fall back to rank position
+            return [1 - position / len(hits) for position in range(len(hits))]
+        low, high = min(scores), max(scores)
+        if high == low:
+            return [1.0] * len(scores)
+        return [(score - low) / (high - low) for score in scores]
+
+    def _merge(
+        self, results: list[list[dict[str, Any]]], top_k: int
+    ) -> list[dict[str, Any]]:
+        if self.fusion == "rrf":
+            ranked = reciprocal_rank_fusion(
+                [
+                    [(store, position) for position in range(len(hits))]
+                    for store, hits in enumerate(results)
+                ]
+            )
+        else:
+            ranked = sorted(
+                (
+                    ((store, position), fusion_score)
+                    for store, hits in enumerate(results)
+                    if hits
+                    for position, fusion_score in enumerate(
+                        self._normalized_scores(hits)
+                    )
+                ),
+                key=lambda item: -item[1],
+            )
+
+        # The fused score only orders the hits: scores from different stores
+        # are not comparable, but each stays meaningful within its own store
+        return [results[store][position] for (store, position), _ in ranked[:top_k]]
+
+    async def search(
+        self,
+        query: str,
+        max_results: int | None = None,
+        filters: dict[str, Any] | None = None,
+        score_threshold: float | None = None,
+    ) -> list[dict[str, Any]]:
+        # Each store applies the filters and threshold to its own ranking
+        options = search_options(max_results, filters, score_threshold)
+        responses = await asyncio.gather(
+            *(backend.search(query, **options) for backend in self.backends),
+            return_exceptions=True,
+        )
+
+        results = []
+        errors = []
+        for backend, response in zip(self.backends, responses):
+            if isinstance(response, BaseException):
+                if isinstance(response, BackendConfigurationError):
+                    raise response
+                logger.warning(f"Search failed in store {backend.store_id}: {response}")
+                errors.append(response)
+                results.append([])
+                continue
+            results.append(
+                [
+                    {**hit, "id": self.federated_id(backend, hit["id"])}
+                    for hit in response
+                ]
+            )
+
+        if errors and len(errors) == len(self.backends):
+            raise errors[0]
+        return self._merge(results, max_results or self.top_k)
+
+    async def fetch(self, file_id: str) -> dict[str, Any]:
+        store_id, _, own_id = file_id.rpartition(self.ID_SEPARATOR)
+        backend = self._by_store.get(store_id)
+        if backend is None:
+            raise ValueError(
+                f"No file found with id '{file_id}' "
+                f"(federated IDs look like <store_id>{self.ID_SEPARATOR}<file_id>)"
+            )
+        document = await backend.fetch(own_id)
+        return {**document, "id": file_id}
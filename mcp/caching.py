@@ -0,0 +1,610 @@
+#!/usr/bin/env python3
+"""
+Result Caching Utilities
+
+Size-bounded LRU cache with per-entry TTL used by the MCP server to keep hot
+documents and search results in memory. Failures can be cached for a short
+time (negative caching) so a bad ID does not hit the upstream on every retry,
+and identical concurrent misses share a single upstream call.
+
+An optional SQLite tier keeps results across restarts; on startup the
+in-memory tier can be pre-warmed from its most frequently used entries.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a search query for cache lookups.
+
+    Case, punctuation and whitespace differences do not change the key, so
+    "TechCorp revenue?" and "  techcorp   REVENUE" share one cache entry.
+    """
+    return " ".join(re.sub(r"[^\w\s]", " ", query.casefold()).split())
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate the memory cost of a cached value by its JSON payload size."""
+    try:
+        return len(json.dumps(value, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return len(repr(value).encode("utf-8"))
+
+
+def _encode_key(key: Hashable) -> str:
+    return json.dumps(key, default=str)
+
+
+def _decode_key(encoded: str) -> Hashable:
+    key = json.loads(encoded)
+    return tuple(key) if isinstance(key, list) else key
+
+
+class PersistentCacheStore:
+    """
+    SQLite-backed cache tier shared by several caches (one namespace each).
+
+    Entries carry a wall-clock expiry and an access count. Expired entries
+    are purged and the least recently used ones evicted to stay under
+    max_bytes every few writes. The database uses WAL mode so several
+    server processes can share one file.
+
+    Args:
+        path: SQLite database file
+        max_bytes: Upper bound on the summed payload size of all entries
+        ttl: Seconds an entry stays valid on disk
+        max_entry_bytes: Larger payloads are not persisted
+        enforce_every: Writes between size/TTL enforcement passes
+        clock: Wall-clock time source (overridable in tests)
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_bytes: int,
+        ttl: float,
+        max_entry_bytes: int | None = None,
+        enforce_every: int = 64,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes or max_bytes
+        self.enforce_every = enforce_every
+        self.clock = clock
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None, timeout=5
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            );
+            CREATE INDEX IF NOT EXISTS entries_by_hits
+                ON entries (namespace, hits DESC);
+            CREATE TABLE IF NOT EXISTS meta (
+                name TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            """
+        )
+        self.enforce_limits()
+
+    def get(self, namespace: str, key: Hashable) -> Any | None:
+        """Return a live persisted value (counting the access), or None."""
+        now = self.clock()
+        with self._lock:
+            row = self._db.execute(
+                "UPDATE entries SET hits = hits + 1, last_access = ? "
+                "WHERE namespace = ? AND key = ? AND expires_at > ? RETURNING value",
+                (now, namespace, _encode_key(key), now),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, namespace: str, key: Hashable, value: Any):
+        """Persist a value, keeping the access count of an existing entry."""
+        try:
+            payload = json.dumps(value)
+        except (TypeError, ValueError):
+            logger.debug(f"Not persisting {key!r}: value is not JSON serializable")
+            return
+        size = len(payload.encode("utf-8"))
+        if size > self.max_entry_bytes:
+            return
+
+        now = self.clock()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO entries "
+                "(namespace, key, value, size, expires_at, hits, last_access) "
+                "VALUES (?, ?, ?, ?, ?, 1, ?) "
+                "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, "
+                "size = excluded.size, expires_at = excluded.expires_at, "
+                "last_access = excluded.last_access",
+                (namespace, _encode_key(key), payload, size, now + self.ttl, now),
+            )
+            self._writes += 1
+            due = self._writes % self.enforce_every == 0
+        if due:
+            self.enforce_limits()
+
+    def record_hits(self, namespace: str, counts: dict[Hashable, int]):
+        """Add access counts for entries served from the in-memory tier."""
+        now = self.clock()
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.executemany(
+                "UPDATE entries SET hits = hits + ?, last_access = ? "
+                "WHERE namespace = ? AND key = ?",
+                [
+                    (count, now, namespace, _encode_key(key))
+                    for key, count in counts.items()
+                ],
+            )
+            self._db.execute("COMMIT")
+
+    def most_accessed(
+        self, namespace: str, limit: int
+    ) -> list[tuple[Hashable, Any, float]]:
+        """
+        Return the most frequently accessed live entries.
+
+        Returns:
+            list: (key, value, remaining TTL in seconds) tuples, most used first
+        """
+        now = self.clock()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, value, expires_at FROM entries "
+                "WHERE namespace = ? AND expires_at > ? "
+                "ORDER BY hits DESC, last_access DESC LIMIT ?",
+                (namespace, now, limit),
+            ).fetchall()
+        return [
+            (_decode_key(key), json.loads(value), expires_at - now)
+            for key, value, expires_at in rows
+        ]
+
+    def clear(self, namespace: str):
+        with self._lock:
+            self._db.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+
+    def get_meta(self, name: str) -> str | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM meta WHERE name = ?", (name,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, name: str, value: str):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                (name, value),
+            )
+
+    def enforce_limits(self):
+        """Purge expired entries, then evict least recently used ones over max_bytes."""
+        with self._lock:
+            self._db.execute("BEGIN")
+            self._db.execute(
+                "DELETE FROM entries WHERE expires_at <= ?", (self.clock(),)
+            )
+            self._db.execute(
+                "DELETE FROM entries WHERE rowid IN ("
+                "SELECT rowid FROM (SELECT rowid, SUM(size) OVER "
+                "(ORDER BY last_access DESC, rowid DESC) AS running FROM entries) "
+                "WHERE running > ?)",
+                (self.max_bytes,),
+            )
+            self._db.execute("COMMIT")
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    error: Exception | None
+    size: int
+    expires_at: float
+
+
+class TTLCache:
+    """
+    LRU cache bounded by total bytes, with a TTL per entry.
+
+    Loads are single-flight: while a key is being loaded, further callers
+    for the same key await the same load instead of starting their own.
+
+    With a persistent store, misses are looked up on disk before calling
+    the loader, and successful loads are written through to disk. Errors
+    are only cached in memory.
+
+    Args:
+        max_bytes: Upper bound on the summed size of all entries
+        ttl: Seconds a successful result stays valid
+        error_ttl: Seconds a failure stays cached (0 disables negative caching)
+        clock: Monotonic time source (overridable in tests)
+        store: Optional persistent tier shared across restarts
+        namespace: Name of this cache's entries in the persistent store
+    """
+
+    # Seconds between flushes of in-memory access counts to the store
+    HIT_FLUSH_INTERVAL = 10.0
+
+    def __init__(
+        self,
+        max_bytes: int,
+        ttl: float,
+        error_ttl: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+        store: PersistentCacheStore | None = None,
+        namespace: str = "default",
+    ):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.clock = clock
+        self.store = store
+        self.namespace = namespace
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self._loading: dict[Hashable, asyncio.Task] = {}
+        self._pending_hits: Counter = Counter()
+        self._last_hit_flush = clock()
+        self.total_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.coalesced = 0
+        self.disk_hits = 0
+        self.prewarmed = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry.expires_at > self.clock()
+
+    def _remove(self, key: Hashable) -> CacheEntry:
+        entry = self._entries.pop(key)
+        self.total_bytes -= entry.size
+        return entry
+
+    def get(self, key: Hashable) -> CacheEntry | None:
+        """
+        Look up a live entry and mark it as recently used.
+
+        Returns:
+            CacheEntry | None: The entry (value or cached error), or None on a miss
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= self.clock():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        if entry.error is not None:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+            if self.store is not None:
+                self._pending_hits[key] += 1
+        return entry
+
+    def _store(self, key: Hashable, entry: CacheEntry):
+        if key in self._entries:
+            self._remove(key)
+
+        if entry.size > self.max_bytes:
+            logger.debug(f"Not caching {key!r}: {entry.size} bytes exceeds cache size")
+            return
+
+        self._entries[key] = entry
+        self.total_bytes += entry.size
+        while self.total_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        size: int | None = None,
+        ttl: float | None = None,
+    ):
+        """Cache a successful result (for ttl seconds, default self.ttl)."""
+        if size is None:
+            size = estimate_size(value)
+        expires_at = self.clock() + (self.ttl if ttl is None else ttl)
+        self._store(key, CacheEntry(value, None, size, expires_at))
+
+    def set_error(self, key: Hashable, error: Exception):
+        """Cache a failure for error_ttl seconds (unless it is marked transient)."""
+        if self.error_ttl <= 0 or getattr(error, "transient", False):
+            return
+        size = len(str(error).encode("utf-8")) + 64
+        self._store(key, CacheEntry(None, error, size, self.clock() + self.error_ttl))
+
+    def invalidate(self, key: Hashable):
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
+        self._pending_hits.clear()
+        if self.store is not None:
+            self.store.clear(self.namespace)
+
+    def prewarm(self, limit: int) -> int:
+        """
+        Load the most frequently accessed persisted entries into memory.
+
+        Args:
+            limit: Maximum number of entries to load
+
+        Returns:
+            int: Number of entries loaded
+        """
+        if self.store is None or limit <= 0:
+            return 0
+        loaded = 0
+        for key, value, remaining in self.store.most_accessed(self.namespace, limit):
+            self.set(key, value, ttl=min(self.ttl, remaining))
+            loaded += 1
+        self.prewarmed += loaded
+        return loaded
+
+    def _flush_hits_if_due(self):
+        if not self._pending_hits:
+            return
+        if self.clock() - self._last_hit_flush < self.HIT_FLUSH_INTERVAL:
+            return
+        counts = dict(self._pending_hits)
+        self._pending_hits.clear()
+        self._last_hit_flush = self.clock()
+        task = asyncio.ensure_future(
+            asyncio.to_thread(self.store.record_hits, self.namespace, counts)
+        )
+        task.add_done_callback(_log_task_failure)
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]):
+        """
+        Return the cached value for key, calling loader on a miss.
+
+        Cached failures are re-raised without calling the loader; fresh failures
+        are cached for error_ttl seconds and re-raised. Concurrent misses for
+        the same key are coalesced into one loader call, which keeps running
+        for the others if one caller is cancelled.
+        """
+        entry = self.get(key)
+        if entry is not None:
+            if self.store is not None:
+                self._flush_hits_if_due()
+            if entry.error is not None:
+                raise entry.error
+            return entry.value
+
+        if key in self._loading:
+            self.coalesced += 1
+        return await asyncio.shield(self.load(key, loader))
+
+    def loading(self, key: Hashable) -> bool:
+        """Return True while a load for key is in flight."""
+        return key in self._loading
+
+    def load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        """
+        Start loading key in the background, or join the load in flight.
+
+        Unlike get_or_load this is not counted as a lookup, so loads started
+        ahead of demand (prefetches) do not skew the hit ratio.
+
+        Returns:
+            asyncio.Task: The single-flight load task for key
+        """
+        task = self._loading.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, loader))
+            self._loading[key] = task
+            task.add_done_callback(lambda done: self._finish_load(key, done))
+        return task
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]):
+        if self.store is not None:
+            value = await asyncio.to_thread(self.store.get, self.namespace, key)
+            if value is not None:
+                self.disk_hits += 1
+                self.set(key, value)
+                return value
+
+        try:
+            value = await loader()
+        except Exception as e:
+            self.set_error(key, e)
+            raise
+
+        self.set(key, value)
+        if self.store is not None:
+            await asyncio.to_thread(self.store.set, self.namespace, key, value)
+        return value
+
+    def _finish_load(self, key: Hashable, task: asyncio.Task):
+        if self._loading.get(key) is task:
+            del self._loading[key]
+        # Mark the outcome as retrieved even if every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "coalesced": self.coalesced,
+            "disk_hits": self.disk_hits,
+            "prewarmed": self.prewarmed,
+            "hit_ratio": (self.hits + self.negative_hits) / lookups if lookups else 0.0,
+        }
+
+
+def _log_task_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Background cache task failed: {task.exception()}")
+
+
+class StoreVersionWatcher:
+    """
+    Clears caches when the backing store changes.
+
+    Polls the backend's store_version() at most once per interval; when the
+    version differs from the last one seen, every registered cache is cleared.
+    With a persistent store the last seen version is saved there too, so
+    entries persisted before a restart are dropped if the store changed
+    while the server was down; callers await ready() before serving any.
+
+    Args:
+        backend: Retrieval backend exposing an async store_version()
+        caches: Caches to clear on a change
+        interval: Minimum seconds between version checks (0 disables checks)
+        clock: Monotonic time source (overridable in tests)
+        store: Persistent store holding the last seen version
+    """
+
+    def __init__(
+        self,
+        backend,
+        caches: list[TTLCache],
+        interval: float,
+        clock: Callable[[], float] = time.monotonic,
+        store: PersistentCacheStore | None = None,
+    ):
+        self.backend = backend
+        self.caches = caches
+        self.interval = interval
+        self.clock = clock
+        self.store = store
+        self.version = None
+        self.invalidations = 0
+        self._last_check = None
+        self._checking = False
+        self._task = None
+
+    def _due(self) -> bool:
+        if self.interval <= 0 or self._checking:
+            return False
+        return (
+            self._last_check is None or self.clock() - self._last_check >= self.interval
+        )
+
+    def schedule(self):
+        """Start a background version check if one is due, without waiting for it."""
+        if self._due():
+            self._task = asyncio.create_task(self.check())
+
+    async def ready(self):
+        """
+        Wait until the store version has been checked once.
+
+        Runs the first check, or waits for the one already in flight, so that
+        entries persisted before a restart are not served until then.
+        """
+        if self.interval <= 0:
+            return
+        while self._last_check is None:
+            if self._task is None or self._task.done():
+                self._task = asyncio.create_task(self.check())
+            # Shielded: a cancelled caller must not cancel the others' check
+            await asyncio.shield(self._task)
+
+    async def check(self):
+        """Refresh the store version if the check interval has elapsed."""
+        if not self._due():
+            return
+        now = self.clock()
+
+        self._checking = True
+        try:
+            version = await self.backend.store_version()
+        except Exception as e:
+            logger.warning(f"Could not check vector store version: {e}")
+            return
+        finally:
+            self._last_check = now
+            self._checking = False
+
+        previous = self.version
+        meta_name = f"store_version:{self.backend.store_id}"
+        if previous is None and self.store is not None:
+            previous = await asyncio.to_thread(self.store.get_meta, meta_name)
+
+        if previous is not None and version != previous:
+            logger.info(
+                f"Vector store {self.backend.store_id} changed, clearing caches"
+            )
+            for cache in self.caches:
+                cache.clear()
+            self.invalidations += 1
+        self.version = version
+
+        if self.store is not None and version is not None and version != previous:
+            await asyncio.to_thread(self.store.set_meta, meta_name, version)
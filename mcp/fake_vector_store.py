@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+Fake OpenAI Vector Store Upstream
+
+A small Starlette app that mimics the OpenAI vector store REST endpoints used
+by the MCP server (search, file content and file retrieval) and by ingestion
+(file upload, attach and delete) over a local corpus, with simulated network
+latency and failures. Point an OpenAI client at it with base_url to benchmark
+or test the server without an OpenAI account.
+
+Run it standalone to load-test a server started separately:
+    python mcp/fake_vector_store.py --corpus files --latency 0.08 --jitter 0.5
+"""
+
+import argparse
+import asyncio
+import itertools
+import math
+import random
+import re
+import threading
+import time
+from pathlib import Path
+
+import uvicorn
+from filters import compare
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+DEFAULT_VECTOR_STORE_ID = "vs_fake"
+
+
+def _tokens(text: str) -> set[str]:
+    return set(re.findall(r"\w+", text.lower()))
+
+
+def _filter_matches(search_filter: dict | None, attributes: dict) -> bool:
+    """Evaluate an OpenAI comparison or compound filter against file attributes."""
+    if not search_filter:
+        return True
+    if search_filter["type"] in ("and", "or"):
+        results = (_filter_matches(f, attributes) for f in search_filter["filters"])
+        return all(results) if search_filter["type"] == "and" else any(results)
+    return compare(
+        attributes.get(search_filter["key"]),
+        search_filter["type"],
+        search_filter["value"],
+    )
+
+
+class FakeCorpus:
+    """In-memory documents split into fixed-size chunks for the fake upstream."""
+
+    def __init__(self, documents: dict[str, str], chunk_size: int = 800):
+        self.chunk_size = chunk_size
+        self.documents = documents
+        self.filenames = {}
+        self.texts = {}
+        self.attributes = {}
+        self.chunks = []
+        for index, (filename, text) in enumerate(sorted(documents.items())):
+            self.add(f"file-fake{index:06d}", filename, text)
+
+    def add(self, file_id: str, filename: str, text: str, attributes=None):
+        """Add a document to the store (what attaching an uploaded file does)."""
+        self.filenames[file_id] = filename
+        self.texts[file_id] = text
+        self.attributes[file_id] = {"filename": filename, **(attributes or {})}
+        for start in range(0, max(len(text), 1), self.chunk_size):
+            chunk = text[start : start + self.chunk_size]
+            self.chunks.append((file_id, chunk, _tokens(chunk)))
+
+    def remove(self, file_id: str) -> bool:
+        """Remove a document from the store; returns False if it was not there."""
+        if file_id not in self.texts:
+            return False
+        del self.filenames[file_id], self.texts[file_id], self.attributes[file_id]
+        self.chunks = [chunk for chunk in self.chunks if chunk[0] != file_id]
+        return True
+
+    @classmethod
+    def from_directory(cls, directory: str | Path, **kwargs) -> "FakeCorpus":
+        directory = Path(directory)
+        documents = {
+            path.name: path.read_text(encoding="utf-8", errors="replace")
+            for path in sorted(directory.iterdir())
+            if path.is_file()
+        }
+        return cls(documents, **kwargs)
+
+    def search(
+        self, query: str, limit: int = 10, allowed=None
+    ) -> list[tuple[str, str, float]]:
+        query_tokens = _tokens(query)
+        if not query_tokens:
+            return []
+        scored = []
+        for file_id, chunk, tokens in self.chunks:
+            if allowed is not None and not allowed(file_id):
+                continue
+            overlap = len(query_tokens & tokens)
+            if overlap:
+                scored.append((file_id, chunk, overlap / len(query_tokens)))
+        scored.sort(key=lambda item: -item[2])
+        return scored[:limit]
+
+
+class UpstreamBehavior:
+    """
+    Latency and failure distribution of the fake upstream.
+
+    Latency is log-normal around the median with an optional share of slow
+    outliers, so percentiles look like a real network service rather than a
+    constant sleep.
+
+    Args:
+        latency: Median seconds added to every request
+        jitter: Log-normal sigma of the latency (0 gives a fixed latency)
+        tail_rate: Fraction of requests that take tail_latency instead
+        tail_latency: Seconds taken by slow outliers
+        error_rate: Fraction of requests answered with a 500
+        rate_limit_rate: Fraction of requests answered with a 429
+        retry_after: Seconds sent as retry-after-ms on 429 responses
+        seed: Random seed for reproducible runs
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        tail_rate: float = 0.0,
+        tail_latency: float = 1.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 0.1,
+        seed: int | None = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.tail_rate = tail_rate
+        self.tail_latency = tail_latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+
+    def delay(self) -> float:
+        """Draw the latency of one request in seconds."""
+        if self.tail_rate and self.rng.random() < self.tail_rate:
+            return self.tail_latency
+        if self.jitter <= 0 or self.latency <= 0:
+            return self.latency
+        return self.latency * math.exp(self.rng.gauss(0, self.jitter))
+
+    def failure(self) -> JSONResponse | None:
+        """Draw whether one request fails, returning the error response if so."""
+        draw = self.rng.random()
+        if draw < self.rate_limit_rate:
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "requests"}},
+                status_code=429,
+                headers={"retry-after-ms": str(int(self.retry_after * 1000))},
+            )
+        if draw < self.rate_limit_rate + self.error_rate:
+            return JSONResponse(
+                {
+                    "error": {
+                        "message": "The server had an error",
+                        "type": "server_error",
+                    }
+                },
+                status_code=500,
+            )
+        return None
+
+
+def create_fake_upstream_app(
+    corpus: FakeCorpus,
+    latency: float = 0.05,
+    vector_store_id: str = DEFAULT_VECTOR_STORE_ID,
+    behavior: UpstreamBehavior | None = None,
+) -> Starlette:
+    """
+    Build an ASGI app serving the OpenAI vector store routes under /v1.
+
+    Args:
+        corpus: Documents to serve
+        latency: Seconds of simulated upstream latency added to every request
+        vector_store_id: Vector store ID accepted by the routes
+        behavior: Latency and failure distribution (overrides latency)
+
+    Returns:
+        Starlette: App exposing request counters on app.state.calls
+    """
+    behavior = behavior or UpstreamBehavior(latency=latency)
+    calls = {
+        "search": 0,
+        "content": 0,
+        "retrieve": 0,
+        "upload": 0,
+        "attach": 0,
+        "detach": 0,
+        "delete": 0,
+        "errors": 0,
+        "rate_limited": 0,
+    }
+    # Files uploaded through /v1/files, searchable once attached to the store
+    uploads: dict[str, tuple[str, str]] = {}
+    upload_ids = itertools.count(1)
+
+    async def _simulate(operation: str):
+        calls[operation] += 1
+        await asyncio.sleep(behavior.delay())
+        failure = behavior.failure()
+        if failure is not None:
+            calls["rate_limited" if failure.status_code == 429 else "errors"] += 1
+        return failure
+
+    def _unknown_store(store_id: str):
+        if store_id != vector_store_id:
+            return JSONResponse(
+                {"error": {"message": f"No vector store found with id '{store_id}'."}},
+                status_code=404,
+            )
+        return None
+
+    def _unknown_file(file_id: str):
+        return JSONResponse(
+            {"error": {"message": f"No file found with id '{file_id}'."}},
+            status_code=404,
+        )
+
+    async def search(request: Request):
+        if failure := await _simulate("search"):
+            return failure
+        store_id = request.path_params["vector_store_id"]
+        if error := _unknown_store(store_id):
+            return error
+        body = await request.json()
+        limit = body.get("max_num_results") or 10
+        threshold = (body.get("ranking_options") or {}).get("score_threshold") or 0
+        search_filter = body.get("filters")
+        data = [
+            {
+                "file_id": file_id,
+                "filename": corpus.filenames[file_id],
+                "score": score,
+                "attributes": {},
+                "content": [{"type": "text", "text": chunk}],
+            }
+            for file_id, chunk, score in corpus.search(
+                body.get("query", ""),
+                limit,
+                lambda file_id: _filter_matches(
+                    search_filter, corpus.attributes[file_id]
+                ),
+            )
+            if score >= threshold
+        ]
+        return JSONResponse(
+            {
+                "object": "vector_store.search_results.page",
+                "search_query": [body.get("query", "")],
+                "data": data,
+                "has_more": False,
+                "next_page": None,
+            }
+        )
+
+    async def content(request: Request):
+        if failure := await _simulate("content"):
+            return failure
+        store_id = request.path_params["vector_store_id"]
+        file_id = request.path_params["file_id"]
+        if error := _unknown_store(store_id):
+            return error
+        if file_id not in corpus.texts:
+            return _unknown_file(file_id)
+        return JSONResponse(
+            {
+                "object": "vector_store.file_content.page",
+                "data": [{"type": "text", "text": corpus.texts[file_id]}],
+                "has_more": False,
+                "next_page": None,
+            }
+        )
+
+    async def retrieve(request: Request):
+        if failure := await _simulate("retrieve"):
+            return failure
+        store_id = request.path_params["vector_store_id"]
+        file_id = request.path_params["file_id"]
+        if error := _unknown_store(store_id):
+            return error
+        if file_id not in corpus.texts:
+            return _unknown_file(file_id)
+        return JSONResponse(
+            {
+                "id": file_id,
+                "object": "vector_store.file",
+                "created_at": 0,
+                "usage_bytes": len(corpus.texts[file_id]),
+                "vector_store_id": store_id,
+                "status": "completed",
+                "last_error": None,
+                "attributes": corpus.attributes[file_id],
+            }
+        )
+
+    async def upload_file(request: Request):
+        if failure := await _simulate("upload"):
+            return failure
+        form = await request.form()
+        upload = form["file"]
+        text = (await upload.read()).decode("utf-8")
+        file_id = f"file-upload{next(upload_ids):08d}"
+        uploads[file_id] = (upload.filename, text)
+        return JSONResponse(
+            {
+                "id": file_id,
+                "object": "file",
+                "bytes": len(uploads[file_id][1]),
+                "created_at": 0,
+                "filename": upload.filename,
+                "purpose": form.get("purpose", "assistants"),
+                "status": "processed",
+            }
+        )
+
+    async def attach_file(request: Request):
+        if failure := await _simulate("attach"):
+            return failure
+        store_id = request.path_params["vector_store_id"]
+        if error := _unknown_store(store_id):
+            return error
+        body = await request.json()
+        file_id = body["file_id"]
+        if file_id not in uploads:
+            return _unknown_file(file_id)
+        filename, text = uploads[file_id]
+        corpus.add(file_id, filename, text, body.get("attributes"))
+        return JSONResponse(
+            {
+                "id": file_id,
+                "object": "vector_store.file",
+                "created_at": 0,
+                "usage_bytes": len(text),
+                "vector_store_id": store_id,
+                "status": "completed",
+                "last_error": None,
+                "attributes": corpus.attributes[file_id],
+            }
+        )
+
+    async def detach_file(request: Request):
+        if failure := await _simulate("detach"):
+            return failure
+        store_id = request.path_params["vector_store_id"]
+        file_id = request.path_params["file_id"]
+        if error := _unknown_store(store_id):
+            return error
+        if not corpus.remove(file_id):
+            return _unknown_file(file_id)
+        return JSONResponse(
+            {"id": file_id, "object": "vector_store.file.deleted", "deleted": True}
+        )
+
+    async def delete_file(request: Request):
+        if failure := await _simulate("delete"):
+            return failure
+        file_id = request.path_params["file_id"]
+        if uploads.pop(file_id, None) is None:
+            return _unknown_file(file_id)
+        return JSONResponse({"id": file_id, "object": "file", "deleted": True})
+
+    async def retrieve_store(request: Request):
+        store_id = request.path_params["vector_store_id"]
+        if error := _unknown_store(store_id):
+            return error
+        total = len(corpus.texts)
+        return JSONResponse(
+            {
+                "id": store_id,
+                "object": "vector_store",
+                "created_at": 0,
+                "name": "fake",
+                "usage_bytes": sum(len(text) for text in corpus.texts.values()),
+                "file_counts": {
+                    "in_progress": 0,
+                    "completed": total,
+                    "failed": 0,
+                    "cancelled": 0,
+                    "total": total,
+                },
+                "status": "completed",
+                "last_active_at": None,
+                "metadata": None,
+            }
+        )
+
+    app = Starlette(
+        routes=[
+            Route(
+                "/v1/vector_stores/{vector_store_id}", retrieve_store, methods=["GET"]
+            ),
+            Route(
+                "/v1/vector_stores/{vector_store_id}/search", search, methods=["POST"]
+            ),
+            Route(
+                "/v1/vector_stores/{vector_store_id}/files/{file_id}/content",
+                content,
+                methods=["GET"],
+            ),
+            Route(
+                "/v1/vector_stores/{vector_store_id}/files/{file_id}",
+                retrieve,
+                methods=["GET"],
+            ),
+            Route(
+                "/v1/vector_stores/{vector_store_id}/files/{file_id}",
+                detach_file,
+                methods=["DELETE"],
+            ),
+            Route(
+                "/v1/vector_stores/{vector_store_id}/files",
+                attach_file,
+                methods=["POST"],
+            ),
+            Route("/v1/files", upload_file, methods=["POST"]),
+            Route("/v1/files/{file_id}", delete_file, methods=["DELETE"]),
+        ]
+    )
+    app.state.calls = calls
+    app.state.uploads = uploads
+    app.state.behavior = behavior
+    return app
+
+
+class FakeUpstreamServer:
+    """Runs an ASGI app with uvicorn on a background thread for tests and benchmarks."""
+
+    def __init__(self, app, host: str = "127.0.0.1", port: int = 0):
+        config = uvicorn.Config(app, host=host, port=port, log_level="warning")
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        sock = self.server.servers[0].sockets[0]
+        host, port = sock.getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.url}/v1"
+
+    def __enter__(self) -> "FakeUpstreamServer":
+        self.thread.start()
+        deadline = time.monotonic() + 10
+        while not self.server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Fake upstream server failed to start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI vector store upstream")
+    parser.add_argument("--corpus", default="files", help="Directory of documents")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--tail-rate", type=float, default=0.0)
+    parser.add_argument("--tail-latency", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    behavior = UpstreamBehavior(
+        latency=args.latency,
+        jitter=args.jitter,
+        tail_rate=args.tail_rate,
+        tail_latency=args.tail_latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )
+    app = create_fake_upstream_app(
+        FakeCorpus.from_directory(args.corpus), behavior=behavior
+    )
+    print(
+        f"🧪 Fake vector store '{DEFAULT_VECTOR_STORE_ID}' on http://{args.host}:{args.port}/v1"
+    )
+    print(
+        f"   OPENAI_BASE_URL=http://{args.host}:{args.port}/v1 "
+        f"VECTOR_STORE_ID={DEFAULT_VECTOR_STORE_ID} OPENAI_API_KEY=test"
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
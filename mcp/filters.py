@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Attribute Filters for Search
+
+Callers of the search tools describe attribute filters as a plain mapping:
+
+    {"filename": "report.md"}                 equality
+    {"team": ["sales", "research"]}           any of (in)
+    {"year": {"gte": 2023, "lt": 2025}}       comparisons (eq, ne, gt, gte, lt,
+                                              lte, in, nin)
+
+All conditions must hold. The mapping is translated into the OpenAI vector
+store filter format for the hosted backend, or evaluated against document
+attributes by the local backend, so filtering happens in the index rather
+than after results are transferred.
+"""
+
+import json
+from typing import Any
+
+OPERATORS = ("eq", "ne", "gt", "gte", "lt", "lte", "in", "nin")
+
+
+def filter_conditions(filters: dict[str, Any] | None) -> list[tuple[str, str, Any]]:
+    """
+    Validate filters and flatten them into (key, operator, value) conditions.
+
+    Raises:
+        ValueError: If an operator is unknown or a value has the wrong shape
+    """
+    if not filters:
+        return []
+    if not isinstance(filters, dict):
+        raise ValueError("filters must be an object mapping attribute names to values")
+
+    conditions = []
+    for key, spec in filters.items():
+        if isinstance(spec, dict):
+            if not spec:
+                raise ValueError(f"Filter for '{key}' has no operators")
+            for operator, value in spec.items():
+                if operator not in OPERATORS:
+                    raise ValueError(
+                        f"Unknown filter operator '{operator}' for '{key}' "
+                        f"(use one of {', '.join(OPERATORS)})"
+                    )
+                if operator in ("in", "nin") and not isinstance(value, list):
+                    raise ValueError(f"'{operator}' filter for '{key}' needs a list")
+                conditions.append((key, operator, value))
+        elif isinstance(spec, list):
+            conditions.append((key, "in", spec))
+        else:
+            conditions.append((key, "eq", spec))
+    return conditions
+
+
+def to_openai_filter(filters: dict[str, Any] | None) -> dict[str, Any] | None:
+    """Translate filters into an OpenAI comparison or compound ("and") filter."""
+    comparisons = [
+        {"key": key, "type": operator, "value": value}
+        for key, operator, value in filter_conditions(filters)
+    ]
+    if not comparisons:
+        return None
+    if len(comparisons) == 1:
+        return comparisons[0]
+    return {"type": "and", "filters": comparisons}
+
+
+def compare(actual: Any, operator: str, value: Any) -> bool:
+    if operator == "in":
+        return actual in value
+    if operator == "nin":
+        return actual not in value
+    if actual is None:
+        return operator == "ne"
+    if operator == "eq":
+        return actual == value
+    if operator == "ne":
+        return actual != value
+    try:
+        if operator == "gt":
+            return actual > value
+        if operator == "gte":
+            return actual >= value
+        if operator == "lt":
+            return actual < value
+        return actual <= value
+    except TypeError:
+        return False
+
+
+def matches(attributes: dict[str, Any], conditions: list[tuple[str, str, Any]]) -> bool:
+    """Return True if attributes satisfy every (key, operator, value) condition."""
+    return all(
+        compare(attributes.get(key), operator, value)
+        for key, operator, value in conditions
+    )
+
+
+def filters_key(filters: dict[str, Any] | None) -> str:
+    """Canonical string form of filters, for cache keys."""
+    return json.dumps(filters or {}, sort_keys=True, separators=(",", ":"))
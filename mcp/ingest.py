@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Incremental Vector Store Ingestion
+
+Syncs a corpus directory (files/ by default) into an OpenAI vector store.
+Every file is identified by its SHA-256; only new or changed files are
+uploaded, files removed from the corpus are deleted from the store, and the
+result is recorded in a local manifest. Files whose size and mtime match the
+manifest are not even read, so a re-sync costs one directory walk plus the
+work for the files that actually changed.
+
+Usage:
+    python mcp/ingest.py [--corpus files] [--vector-store-id vs_...] [--dry-run]
+    python mcp/ingest.py --create "Research files"   # new store for the corpus
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import openai
+from backends import SUPPORTED_EXTENSIONS
+from vector_utils import detect_vector_store_id
+
+logger = logging.getLogger(__name__)
+
+project_root = Path(__file__).resolve().parent.parent
+
+# Uploads and deletions in flight at once
+INGEST_CONCURRENCY = int(os.getenv("MCP_INGEST_CONCURRENCY", "8"))
+
+# Threads hashing new or modified files
+INGEST_HASH_WORKERS = int(os.getenv("MCP_INGEST_HASH_WORKERS", "4"))
+
+# One manifest per vector store is kept here
+INGEST_MANIFEST_DIR = os.getenv(
+    "MCP_INGEST_MANIFEST_DIR", str(project_root / ".mcp_index" / "ingest")
+)
+
+# The manifest is checkpointed after this many completed operations, so an
+# interrupted sync does not upload the same files again
+MANIFEST_CHECKPOINT_EVERY = 100
+
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class SyncPlan:
+    """Changes needed to bring the vector store in line with the corpus."""
+
+    upload: dict[str, str] = field(default_factory=dict)  # path -> sha256
+    delete: list[str] = field(default_factory=list)
+    rehashed: dict[str, dict[str, Any]] = field(default_factory=dict)
+    unchanged: int = 0
+
+
+def scan_corpus(corpus_dir: str | Path) -> dict[str, os.stat_result]:
+    """
+    List the supported files under corpus_dir with their stat results.
+
+    Hidden files and directories are skipped.
+
+    Returns:
+        dict[str, os.stat_result]: Stats keyed by POSIX path relative to corpus_dir
+    """
+    corpus_dir = Path(corpus_dir)
+    files = {}
+    pending = [corpus_dir]
+    while pending:
+        directory = pending.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in SUPPORTED_EXTENSIONS:
+                    relative = Path(entry.path).relative_to(corpus_dir).as_posix()
+                    files[relative] = entry.stat()
+    return files
+
+
+def file_sha256(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def plan_sync(
+    corpus_dir: str | Path,
+    manifest_files: dict[str, dict[str, Any]],
+    stats: dict[str, os.stat_result],
+    hash_workers: int = INGEST_HASH_WORKERS,
+) -> SyncPlan:
+    """
+    Compare the corpus against the manifest.
+
+    Files whose size and mtime match their manifest entry are unchanged
+    without being read. The others are hashed: a new hash means an upload,
+    the same hash (e.g. a touched file) only refreshes the manifest entry.
+
+    Args:
+        corpus_dir: Corpus root
+        manifest_files: Manifest entries keyed by relative path
+        stats: Result of scan_corpus
+        hash_workers: Threads used for hashing
+
+    Returns:
+        SyncPlan: Files to upload, delete and re-record
+    """
+    plan = SyncPlan()
+    candidates = []
+    for relative, stat in stats.items():
+        entry = manifest_files.get(relative)
+        if (
+            entry
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+        ):
+            plan.unchanged += 1
+        else:
+            candidates.append(relative)
+
+    with ThreadPoolExecutor(max_workers=max(hash_workers, 1)) as pool:
+        digests = pool.map(
+            lambda relative: file_sha256(Path(corpus_dir) / relative), candidates
+        )
+        for relative, digest in zip(candidates, digests):
+            entry = manifest_files.get(relative)
+            if entry and entry["sha256"] == digest:
+                plan.rehashed[relative] = {
+                    **entry,
+                    "size": stats[relative].st_size,
+                    "mtime_ns": stats[relative].st_mtime_ns,
+                }
+            else:
+                plan.upload[relative] = digest
+
+    plan.delete = sorted(set(manifest_files) - set(stats))
+    return plan
+
+
+class VectorStoreSync:
+    """
+    Uploads, replaces and deletes vector store files to match a corpus.
+
+    Args:
+        client: AsyncOpenAI client
+        vector_store_id: Target vector store
+        corpus_dir: Directory to ingest
+        manifest_path: Manifest file (defaults to one per store in
+            MCP_INGEST_MANIFEST_DIR)
+        concurrency: Upstream operations in flight at once
+        guard: Optional UpstreamGuard for rate limiting and retries
+    """
+
+    def __init__(
+        self,
+        client,
+        vector_store_id: str,
+        corpus_dir: str | Path,
+        manifest_path: str | Path | None = None,
+        concurrency: int = INGEST_CONCURRENCY,
+        guard=None,
+    ):
+        self.client = client
+        self.vector_store_id = vector_store_id
+        self.corpus_dir = Path(corpus_dir).resolve()
+        self.manifest_path = Path(
+            manifest_path or Path(INGEST_MANIFEST_DIR) / f"{vector_store_id}.json"
+        )
+        self.concurrency = max(concurrency, 1)
+        self.guard = guard
+        self.files: dict[str, dict[str, Any]] = {}
+        self._completed = 0
+
+    async def _request(self, operation: str, request):
+        if self.guard is None:
+            return await request()
+        return await self.guard.call(operation, request)
+
+    def load_manifest(self) -> dict[str, dict[str, Any]]:
+        """Read the manifest, ignoring it if it belongs to another store or corpus."""
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if (
+            manifest.get("version") != MANIFEST_VERSION
+            or manifest.get("vector_store_id") != self.vector_store_id
+            or manifest.get("corpus_dir") != str(self.corpus_dir)
+        ):
+            logger.warning(
+                f"Ignoring ingest manifest {self.manifest_path} (different store or corpus)"
+            )
+            return {}
+        return manifest.get("files", {})
+
+    def save_manifest(self):
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "vector_store_id": self.vector_store_id,
+            "corpus_dir": str(self.corpus_dir),
+            "files": self.files,
+        }
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(manifest), encoding="utf-8")
+        os.replace(tmp_path, self.manifest_path)
+
+    def _checkpoint(self):
+        self._completed += 1
+        if self._completed % MANIFEST_CHECKPOINT_EVERY == 0:
+            self.save_manifest()
+
+    async def _remove(self, file_id: str):
+        """Detach a file from the store and delete it; already gone is fine."""
+        for operation, request in (
+            (
+                "file detach",
+                lambda: self.client.vector_stores.files.delete(
+                    file_id, vector_store_id=self.vector_store_id
+                ),
+            ),
+            ("file delete", lambda: self.client.files.delete(file_id)),
+        ):
+            try:
+                await self._request(operation, request)
+            except openai.NotFoundError:
+                pass
+
+    async def _upload(self, relative: str, digest: str, stat: os.stat_result):
+        data = await asyncio.to_thread((self.corpus_dir / relative).read_bytes)
+        uploaded = await self._request(
+            "file upload",
+            lambda: self.client.files.create(
+                file=(Path(relative).name, data), purpose="assistants"
+            ),
+        )
+        try:
+            await self._request(
+                "file attach",
+                lambda: self.client.vector_stores.files.create(
+                    self.vector_store_id,
+                    file_id=uploaded.id,
+                    attributes={
+                        "filename": Path(relative).name,
+                        "path": relative,
+                        "sha256": digest,
+                    },
+                ),
+            )
+        except Exception:
+            await self._remove_quietly(uploaded.id)
+            raise
+
+        # Replace the previous version only once the new one is in the store
+        previous = self.files.get(relative)
+        self.files[relative] = {
+            "file_id": uploaded.id,
+            "sha256": digest,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+        if previous:
+            await self._remove_quietly(previous["file_id"])
+
+    async def _remove_quietly(self, file_id: str):
+        try:
+            await self._remove(file_id)
+        except Exception as e:
+            logger.warning(
+                f"Could not delete file {file_id} from the vector store: {e}"
+            )
+
+    async def _delete(self, relative: str):
+        await self._remove(self.files[relative]["file_id"])
+        del self.files[relative]
+
+    async def run(self, dry_run: bool = False) -> dict[str, Any]:
+        """
+        Sync the corpus into the vector store.
+
+        Failed files keep their previous manifest entry (or none), so the
+        next run retries them.
+
+        Args:
+            dry_run: Only compute and report the plan
+
+        Returns:
+            dict: Counts of uploaded, deleted, unchanged and failed files,
+            plus timings in seconds
+        """
+        start = time.perf_counter()
+        self.files = self.load_manifest()
+        stats = await asyncio.to_thread(scan_corpus, self.corpus_dir)
+        plan = await asyncio.to_thread(plan_sync, self.corpus_dir, self.files, stats)
+        plan_seconds = time.perf_counter() - start
+
+        summary = {
+            "files": len(stats),
+            "unchanged": plan.unchanged + len(plan.rehashed),
+            "upload": len(plan.upload),
+            "delete": len(plan.delete),
+            "failed": [],
+            "plan_seconds": plan_seconds,
+        }
+        if dry_run:
+            return summary
+
+        self.files.update(plan.rehashed)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(relative: str, operation):
+            async with semaphore:
+                try:
+                    await operation
+                except Exception as e:
+                    logger.error(f"Failed to sync {relative}: {e}")
+                    summary["failed"].append(relative)
+                else:
+                    self._checkpoint()
+
+        await asyncio.gather(
+            *(
+                bounded(relative, self._upload(relative, digest, stats[relative]))
+                for relative, digest in plan.upload.items()
+            ),
+            *(bounded(relative, self._delete(relative)) for relative in plan.delete),
+        )
+        if plan.upload or plan.delete or plan.rehashed:
+            self.save_manifest()
+
+        summary["seconds"] = time.perf_counter() - start
+        return summary
+
+
+async def create_vector_store(client, name: str) -> str:
+    store = await client.vector_stores.create(name=name)
+    return store.id
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Incrementally sync a corpus directory into a vector store"
+    )
+    parser.add_argument("--corpus", default=str(project_root / "files"))
+    parser.add_argument(
+        "--vector-store-id", help="Target store (defaults to the detected store)"
+    )
+    parser.add_argument("--create", metavar="NAME", help="Create a new store first")
+    parser.add_argument("--concurrency", type=int, default=INGEST_CONCURRENCY)
+    parser.add_argument("--manifest", help="Manifest file path")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only show the plan (no API calls)"
+    )
+    args = parser.parse_args()
+    if args.dry_run and args.create:
+        # A dry run makes no API calls, and a new store has no plan to show:
+        # every file would be uploaded
+        parser.error("--create cannot be combined with --dry-run")
+
+    if not args.dry_run and not os.getenv("OPENAI_API_KEY"):
+        print("❌ OPENAI_API_KEY is not set")
+        sys.exit(1)
+    vector_store_id = args.vector_store_id
+    if not vector_store_id and not args.create:
+        try:
+            vector_store_id = detect_vector_store_id()
+        except ValueError as e:
+            print(f"❌ {e}; pass --vector-store-id or --create NAME")
+            sys.exit(1)
+    client = guard = None
+    if not args.dry_run:
+        # Only a real sync needs the API client (and the server's settings)
+        from server import create_openai_client, create_upstream_guard
+
+        client = create_openai_client()
+        guard = create_upstream_guard()
+
+    async def run() -> dict[str, Any]:
+        # One event loop for both steps: the client's connection pool is bound to it
+        store_id = vector_store_id
+        if args.create:
+            store_id = await create_vector_store(client, args.create)
+            print(f"🆕 Created vector store {store_id}")
+
+        sync = VectorStoreSync(
+            client,
+            store_id,
+            args.corpus,
+            manifest_path=args.manifest,
+            concurrency=args.concurrency,
+            guard=guard,
+        )
+        print(f"📁 Syncing {sync.corpus_dir} into {store_id}")
+        return await sync.run(dry_run=args.dry_run)
+
+    summary = asyncio.run(run())
+
+    print(
+        f"🔍 {summary['files']} files: {summary['unchanged']} unchanged, "
+        f"{summary['upload']} to upload, {summary['delete']} to delete "
+        f"(planned in {summary['plan_seconds']:.2f}s)"
+    )
+    if args.dry_run:
+        return
+    if summary["failed"]:
+        print(f"❌ {len(summary['failed'])} files failed; re-run to retry them")
+        sys.exit(1)
+    print(f"✅ Sync finished in {summary['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
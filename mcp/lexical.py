@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Lexical Retrieval Utilities
+
+In-process BM25 inverted index for exact-term matching (product codes, names)
+and reciprocal rank fusion for combining it with vector search rankings.
+"""
+
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Callable, Hashable, Iterable
+
+import numpy as np
+
+
+def tokenize(text: str) -> list[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+class BM25Index:
+    """
+    Inverted index with Okapi BM25 scoring that supports incremental updates.
+
+    Documents can be added and removed at any time. Posting lists are kept as
+    dicts for cheap updates and converted lazily to NumPy arrays per term, so
+    scoring a query is a handful of vectorized operations. Searches and
+    updates are serialized with a lock so the index can be queried from
+    worker threads.
+
+    Args:
+        k1: Term frequency saturation
+        b: Document length normalization
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, dict[int, int]] = defaultdict(dict)
+        self._arrays: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self._doc_terms: dict[Hashable, Counter] = {}
+        self._slots: dict[Hashable, int] = {}
+        self._slot_ids: list[Hashable | None] = []
+        self._free_slots: list[int] = []
+        self._lengths = np.zeros(1024, dtype=np.float32)
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._doc_terms
+
+    def _allocate_slot(self, doc_id: Hashable) -> int:
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._slot_ids[slot] = doc_id
+        else:
+            slot = len(self._slot_ids)
+            self._slot_ids.append(doc_id)
+            if slot >= len(self._lengths):
+                grown = np.zeros(len(self._lengths) * 2, dtype=np.float32)
+                grown[: len(self._lengths)] = self._lengths
+                self._lengths = grown
+        self._slots[doc_id] = slot
+        return slot
+
+    def add(self, doc_id: Hashable, text: str):
+        """Index a document, replacing any previous version with the same ID."""
+        terms = Counter(tokenize(text))
+        length = sum(terms.values())
+        with self._lock:
+            if doc_id in self._doc_terms:
+                self._remove_locked(doc_id)
+            slot = self._allocate_slot(doc_id)
+            self._doc_terms[doc_id] = terms
+            self._lengths[slot] = length
+            self._total_length += length
+            for term, frequency in terms.items():
+                self._postings[term][slot] = frequency
+                self._arrays.pop(term, None)
+
+    def remove(self, doc_id: Hashable):
+        """Remove a document from the index (no-op if it is not indexed)."""
+        with self._lock:
+            if doc_id in self._doc_terms:
+                self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id: Hashable):
+        terms = self._doc_terms.pop(doc_id)
+        slot = self._slots.pop(doc_id)
+        self._total_length -= int(self._lengths[slot])
+        self._lengths[slot] = 0
+        self._slot_ids[slot] = None
+        self._free_slots.append(slot)
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(slot, None)
+            self._arrays.pop(term, None)
+            if not postings:
+                del self._postings[term]
+
+    def _term_arrays(self, term: str) -> tuple[np.ndarray, np.ndarray] | None:
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            postings = self._postings.get(term)
+            if not postings:
+                return None
+            arrays = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float32, count=len(postings)),
+            )
+            self._arrays[term] = arrays
+        return arrays
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        allowed: Callable[[Hashable], bool] | None = None,
+    ) -> list[tuple[Hashable, float]]:
+        """
+        Score documents against a query.
+
+        Args:
+            query: Search query
+            k: Number of results to return
+            allowed: Only rank documents whose ID passes this predicate
+
+        Returns:
+            list: (doc_id, score) pairs, best first
+        """
+        with self._lock:
+            count = len(self._doc_terms)
+            if count == 0:
+                return []
+            k1 = self.k1
+            base = k1 * (1 - self.b)
+            slope = k1 * self.b / (self._total_length / count)
+            scores = np.zeros(len(self._slot_ids), dtype=np.float32)
+
+            for term in set(tokenize(query)):
+                arrays = self._term_arrays(term)
+                if arrays is None:
+                    continue
+                slots, tf = arrays
+                df = len(slots)
+                idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                scores[slots] += (
+                    idf * tf * (k1 + 1) / (tf + base + slope * self._lengths[slots])
+                )
+
+            matched = np.flatnonzero(scores)
+            if allowed is not None and len(matched):
+                slot_ids = self._slot_ids
+                keep = np.fromiter(
+                    (allowed(slot_ids[i]) for i in matched), bool, len(matched)
+                )
+                matched = matched[keep]
+            if len(matched) > k:
+                matched = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+            ranked = matched[np.argsort(-scores[matched], kind="stable")]
+            return [(self._slot_ids[i], float(scores[i])) for i in ranked]
+
+
+def reciprocal_rank_fusion(
+    rankings: Iterable[list[Hashable]], k: int = 60
+) -> list[tuple[Hashable, float]]:
+    """
+    Merge several rankings with reciprocal rank fusion.
+
+    Each item scores sum(1 / (k + rank)) over the rankings it appears in, which
+    rewards items that rank well in any list without comparing raw scores.
+
+    Args:
+        rankings: Ranked lists of item IDs, best first
+        k: Rank smoothing constant (60 is the value from the original paper)
+
+    Returns:
+        list: (item ID, fused score) pairs, best first
+    """
+    fused: dict[Hashable, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            fused[item] += 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: -item[1])
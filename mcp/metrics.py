@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Server Metrics
+
+Prometheus metrics for the MCP server: tool latency, upstream latency, error
+counts, in-flight requests, cache effectiveness and prefetch hit rates. Each
+server gets its own registry so several servers (e.g. in tests) never share
+counters.
+
+When PROMETHEUS_MULTIPROC_DIR is set (multi-worker serving), request metrics
+are aggregated across worker processes; cache, prefetch, limiter and breaker
+metrics describe the worker that answered the scrape.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Latency buckets in seconds, from cache hits to slow upstream calls
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class CacheCollector:
+    """Exposes TTLCache.stats() for each named cache at scrape time."""
+
+    def __init__(self, caches: dict):
+        self.caches = caches
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        counters = {
+            name: CounterMetricFamily(
+                f"mcp_cache_{name}", f"Cache {name} since start", labels=["cache"]
+            )
+            for name in (
+                "hits",
+                "negative_hits",
+                "misses",
+                "evictions",
+                "coalesced",
+                "disk_hits",
+            )
+        }
+        entries = GaugeMetricFamily(
+            "mcp_cache_entries", "Entries currently cached", labels=["cache"]
+        )
+        size = GaugeMetricFamily(
+            "mcp_cache_bytes", "Approximate bytes currently cached", labels=["cache"]
+        )
+        hit_ratio = GaugeMetricFamily(
+            "mcp_cache_hit_ratio",
+            "Share of lookups served from the cache",
+            labels=["cache"],
+        )
+
+        for cache_name, cache in self.caches.items():
+            stats = cache.stats()
+            for name, family in counters.items():
+                family.add_metric([cache_name], stats[name])
+            entries.add_metric([cache_name], stats["entries"])
+            size.add_metric([cache_name], stats["bytes"])
+            hit_ratio.add_metric([cache_name], stats["hit_ratio"])
+
+        yield from counters.values()
+        yield entries
+        yield size
+        yield hit_ratio
+
+
+class UpstreamGuardCollector:
+    """Exposes rate limiter and circuit breaker state at scrape time."""
+
+    def __init__(self, guard):
+        self.guard = guard
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        guard = self.guard
+        yield GaugeMetricFamily(
+            "mcp_upstream_limiter_tokens",
+            "Tokens currently available in the upstream rate limiter",
+            value=guard.limiter.available(),
+        )
+        yield CounterMetricFamily(
+            "mcp_upstream_limiter_waits",
+            "Upstream requests that waited for a rate limiter token",
+            value=guard.limiter.waits,
+        )
+        yield CounterMetricFamily(
+            "mcp_upstream_limiter_wait_seconds",
+            "Time spent waiting for rate limiter tokens",
+            value=guard.limiter.wait_seconds,
+        )
+        yield CounterMetricFamily(
+            "mcp_upstream_retries",
+            "Upstream requests retried after a retryable error",
+            value=guard.retries,
+        )
+        yield CounterMetricFamily(
+            "mcp_upstream_rate_limited",
+            "Upstream responses with HTTP 429",
+            value=guard.rate_limited,
+        )
+        yield GaugeMetricFamily(
+            "mcp_upstream_breaker_state",
+            "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+            value=guard.breaker.state,
+        )
+        yield CounterMetricFamily(
+            "mcp_upstream_breaker_opens",
+            "Times the circuit breaker opened",
+            value=guard.breaker.opens,
+        )
+        yield CounterMetricFamily(
+            "mcp_upstream_breaker_rejections",
+            "Calls rejected without reaching the upstream",
+            value=guard.breaker.rejections,
+        )
+
+
+class PrefetchCollector:
+    """Exposes Prefetcher.stats() at scrape time."""
+
+    def __init__(self, prefetcher):
+        self.prefetcher = prefetcher
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        stats = self.prefetcher.stats()
+        for name, description in (
+            ("scheduled", "Prefetches started after a search"),
+            ("skipped", "Prefetches skipped because the document was cached"),
+            ("shed", "Prefetches dropped or cancelled under load"),
+            ("completed", "Prefetches that loaded a document"),
+            ("failed", "Prefetches that failed to load"),
+            ("hits", "Prefetched documents later requested by a fetch"),
+            ("wasted", "Prefetched documents evicted or expired without a fetch"),
+        ):
+            yield CounterMetricFamily(
+                f"mcp_prefetch_{name}", description, value=stats[name]
+            )
+        yield GaugeMetricFamily(
+            "mcp_prefetch_hit_rate",
+            "Share of completed prefetches later requested by a fetch",
+            value=stats["hit_rate"],
+        )
+        yield GaugeMetricFamily(
+            "mcp_prefetch_wasted_rate",
+            "Share of completed prefetches dropped from the cache unused",
+            value=stats["wasted_rate"],
+        )
+
+
+class ServerMetrics:
+    """
+    Metrics for one MCP server instance.
+
+    Args:
+        caches: Caches to report, keyed by the label used in the metrics
+        guard: Upstream admission control whose state is reported
+        prefetcher: Document prefetcher whose effectiveness is reported
+    """
+
+    def __init__(self, caches: dict | None = None, guard=None, prefetcher=None):
+        self.registry = CollectorRegistry()
+        # Tool calls in flight in this process (the gauge may be multiprocess)
+        self.active_tools = 0
+
+        self.tool_latency = Histogram(
+            "mcp_tool_duration_seconds",
+            "Time spent handling a tool call",
+            ["tool"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry,
+        )
+        self.tool_errors = Counter(
+            "mcp_tool_errors",
+            "Tool calls that failed or returned an error result",
+            ["tool"],
+            registry=self.registry,
+        )
+        self.in_flight = Gauge(
+            "mcp_tool_in_flight",
+            "Tool calls currently being handled",
+            ["tool"],
+            multiprocess_mode="livesum",
+            registry=self.registry,
+        )
+        self.upstream_latency = Histogram(
+            "mcp_upstream_duration_seconds",
+            "Time spent in vector store calls (cache misses only)",
+            ["operation"],
+            buckets=LATENCY_BUCKETS,
+            registry=self.registry,
+        )
+        self.upstream_errors = Counter(
+            "mcp_upstream_errors",
+            "Vector store calls that raised an error",
+            ["operation"],
+            registry=self.registry,
+        )
+
+        # Collectors reading this process's state at scrape time
+        self.state_collectors = []
+        if caches:
+            self.state_collectors.append(CacheCollector(caches))
+        if guard is not None:
+            self.state_collectors.append(UpstreamGuardCollector(guard))
+        if prefetcher is not None:
+            self.state_collectors.append(PrefetchCollector(prefetcher))
+        for collector in self.state_collectors:
+            self.registry.register(collector)
+
+    def render(self) -> bytes:
+        """Serialize the metrics in the Prometheus text format."""
+        if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+            return generate_latest(self.registry)
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        for collector in self.state_collectors:
+            registry.register(collector)
+        return generate_latest(registry)
+
+    @contextmanager
+    def track_tool(self, tool: str):
+        """Time a tool call, counting it as in flight and recording failures."""
+        self.in_flight.labels(tool).inc()
+        self.active_tools += 1
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.tool_errors.labels(tool).inc()
+            raise
+        finally:
+            self.tool_latency.labels(tool).observe(time.perf_counter() - start)
+            self.in_flight.labels(tool).dec()
+            self.active_tools -= 1
+
+    @contextmanager
+    def track_upstream(self, operation: str):
+        """Time an upstream call and count it if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.upstream_errors.labels(operation).inc()
+            raise
+        finally:
+            self.upstream_latency.labels(operation).observe(time.perf_counter() - start)
+
+    def record_tool_error(self, tool: str):
+        """Count a failure that the tool reported in its result instead of raising."""
+        self.tool_errors.labels(tool).inc()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Document Paging Utilities
+
+Bounds the size of fetch responses: documents can be returned one page of
+characters at a time, or reduced to the passages that best match a query.
+"""
+
+from typing import Any
+
+import numpy as np
+from backends import HashingEmbedder, chunk_text
+
+# Passage size used when selecting query-focused excerpts
+PASSAGE_SIZE = 600
+PASSAGE_OVERLAP = 0
+
+_embedder = HashingEmbedder()
+
+
+def page_document(
+    document: dict[str, Any], offset: int = 0, max_chars: int | None = None
+) -> dict[str, Any]:
+    """
+    Return a copy of a fetched document limited to one page of text.
+
+    Args:
+        document: Fetch result with a "text" field
+        offset: Character offset where the page starts
+        max_chars: Page length in characters (None or 0 for the rest of the text)
+
+    Returns:
+        dict: Document with the page as "text" plus offset, total_chars and
+        next_offset (None when the page reaches the end)
+
+    Raises:
+        ValueError: offset or max_chars is negative
+    """
+    if offset < 0 or (max_chars is not None and max_chars < 0):
+        raise ValueError("offset and max_chars must not be negative")
+    text = document.get("text") or ""
+    total = len(text)
+    offset = min(offset, total)
+    end = min(offset + max_chars, total) if max_chars else total
+
+    return {
+        **document,
+        "text": text[offset:end],
+        "offset": offset,
+        "total_chars": total,
+        "next_offset": end if end < total else None,
+    }
+
+
+def select_passages(
+    document: dict[str, Any], query: str, max_chars: int
+) -> dict[str, Any]:
+    """
+    Return a copy of a fetched document reduced to its best passages for a query.
+
+    The text is split into passages, scored against the query with the local
+    hashing embedder, and the highest-scoring passages that fit in max_chars
+    are returned in document order.
+
+    Args:
+        document: Fetch result with a "text" field
+        query: What the caller is looking for in the document
+        max_chars: Budget for the combined passage text
+
+    Returns:
+        dict: Document whose "text" holds the selected passages joined by
+        "\n...\n", with a "passages" list of {offset, length, score} (where
+        each passage sits in the document) and total_chars
+    """
+    text = document.get("text") or ""
+    spans = chunk_text(text, PASSAGE_SIZE, PASSAGE_OVERLAP)
+    if not spans:
+        return {**document, "passages": [], "total_chars": len(text)}
+
+    passages = [text[start:end] for start, end in spans]
+    scores = _embedder.embed(passages) @ _embedder.embed([query])[0]
+
+    selected = []
+    used = 0
+    for index in np.argsort(-scores, kind="stable"):
+        length = len(passages[index])
+        if selected and used + length > max_chars:
+            continue
+        selected.append(int(index))
+        used += length
+        if used >= max_chars:
+            break
+    selected.sort()
+
+    # The passage text is only sent once, in "text"; "passages" locates it
+    texts = [passages[i][:max_chars] for i in selected]
+    return {
+        **document,
+        "text": "\n...\n".join(texts),
+        "passages": [
+            {
+                "offset": spans[i][0],
+                "length": len(passage),
+                "score": round(float(scores[i]), 4),
+            }
+            for i, passage in zip(selected, texts)
+        ],
+        "total_chars": len(text),
+    }
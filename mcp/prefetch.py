@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Speculative Document Prefetch
+
+After a search the deep-research model almost always fetches one or more of
+the top results. The prefetcher starts loading those documents into the
+document cache in the background as soon as the search returns, so the
+fetch that follows is served from memory.
+
+Prefetches are strictly best effort: a few run at a time, they are skipped
+while the server is busy and cancelled as soon as foreground traffic needs
+the upstream capacity. Whether they paid off is tracked per document: a
+prefetch is a hit when a fetch finds it (or joins it while still loading),
+and wasted when it leaves the cache unused.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+from caching import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """
+    Loads the top search hits into a cache ahead of demand.
+
+    Args:
+        cache: Cache the documents are loaded into
+        top_k: Hits prefetched per search (0 disables prefetching)
+        concurrency: Prefetches loading at the same time
+        max_pending: Prefetches queued or running before new ones are dropped
+        busy: Returns True while foreground load leaves no room for prefetching
+        max_tracked: Unused prefetched keys remembered for hit accounting; the
+            oldest beyond this are counted as wasted
+    """
+
+    def __init__(
+        self,
+        cache: TTLCache,
+        top_k: int,
+        concurrency: int = 2,
+        max_pending: int = 32,
+        busy: Callable[[], bool] = lambda: False,
+        max_tracked: int = 1024,
+    ):
+        self.cache = cache
+        self.top_k = top_k
+        self.concurrency = max(concurrency, 1)
+        self.max_pending = max_pending
+        self.busy = busy
+        self.max_tracked = max_tracked
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        # Prefetch tasks that may still be cancelled, keys loading and the
+        # loading keys a fetch has already asked for
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+        self._loading: set[Hashable] = set()
+        self._claimed: set[Hashable] = set()
+        # Completed prefetches no fetch has asked for yet
+        self._unused: OrderedDict[Hashable, None] = OrderedDict()
+
+        self.scheduled = 0
+        self.skipped = 0
+        self.shed = 0
+        self.completed = 0
+        self.failed = 0
+        self.hits = 0
+        self.wasted = 0
+
+    def schedule(self, items: list[tuple[Hashable, Callable[[], Awaitable[Any]]]]):
+        """
+        Start background loads for the first top_k (key, loader) pairs.
+
+        Keys already cached or loading are skipped; nothing is started while
+        the server is busy or max_pending prefetches are outstanding.
+        """
+        if self.top_k <= 0 or not items:
+            return
+        if self.busy():
+            self.shed_all()
+            self.shed += len(items[: self.top_k])
+            return
+
+        for key, loader in items[: self.top_k]:
+            if key in self.cache or self.cache.loading(key) or key in self._tasks:
+                self.skipped += 1
+                continue
+            if len(self._tasks) >= self.max_pending:
+                self.shed += 1
+                continue
+            self.scheduled += 1
+            task = asyncio.create_task(self._run(key, loader))
+            self._tasks[key] = task
+            task.add_done_callback(lambda done, key=key: self._finish(key, done))
+
+    async def _run(self, key: Hashable, loader: Callable[[], Awaitable[Any]]):
+        async with self._semaphore:
+            if self.busy():
+                self.shed += 1
+                return
+            if key in self.cache or self.cache.loading(key):
+                self.skipped += 1
+                return
+
+            self._loading.add(key)
+            try:
+                # Not shielded: cancelling an unclaimed prefetch stops its load
+                await self.cache.load(key, loader)
+            except Exception as e:
+                self.failed += 1
+                logger.debug(f"Prefetch of {key!r} failed: {e}")
+                return
+            finally:
+                self._loading.discard(key)
+                claimed = key in self._claimed
+                self._claimed.discard(key)
+
+            self.completed += 1
+            if claimed:
+                # A fetch joined the load while it was in flight
+                self.hits += 1
+            else:
+                self._unused[key] = None
+                while len(self._unused) > self.max_tracked:
+                    self._unused.popitem(last=False)
+                    self.wasted += 1
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+
+    def claim(self, key: Hashable):
+        """
+        Record that a fetch asked for key.
+
+        Call this before looking key up in the cache. A prefetch still loading
+        is handed over to the fetch and no longer cancelled under load.
+        """
+        if key in self._loading:
+            self._claimed.add(key)
+            self._tasks.pop(key, None)
+        elif key in self._unused:
+            del self._unused[key]
+            if key in self.cache:
+                self.hits += 1
+            else:
+                self.wasted += 1
+
+    def shed_all(self):
+        """Cancel every prefetch that is queued or loading and not yet claimed."""
+        for task in list(self._tasks.values()):
+            if task.cancel():
+                self.shed += 1
+        self._tasks.clear()
+
+    def shed_if_busy(self):
+        """Cancel outstanding prefetches if foreground load needs the capacity."""
+        if self._tasks and self.busy():
+            self.shed_all()
+
+    def _sweep(self):
+        # Prefetched entries evicted or expired before any fetch are wasted
+        for key in [key for key in self._unused if key not in self.cache]:
+            del self._unused[key]
+            self.wasted += 1
+
+    def stats(self) -> dict[str, Any]:
+        self._sweep()
+        return {
+            "top_k": self.top_k,
+            "scheduled": self.scheduled,
+            "skipped": self.skipped,
+            "shed": self.shed,
+            "completed": self.completed,
+            "failed": self.failed,
+            "in_flight": len(self._tasks),
+            "unused": len(self._unused),
+            "hits": self.hits,
+            "wasted": self.wasted,
+            "hit_rate": self.hits / self.completed if self.completed else 0.0,
+            "wasted_rate": self.wasted / self.completed if self.completed else 0.0,
+        }
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Research Report Archive
+
+Every finished research report is stored with its query, timestamp and
+citations in a local SQLite database with an FTS5 full-text index, so agents
+can look up what was already researched before starting a new multi-minute
+deep-research run. The demo writes reports here next to the PDF; the MCP
+server exposes the archive through its search_reports and get_report tools.
+
+Usage:
+    python mcp/report_archive.py "electric vehicles market" [--archive reports/archive.db]
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+# Shared by the demo (writer) and the MCP server (reader)
+DEFAULT_ARCHIVE_PATH = Path(__file__).resolve().parent.parent / "reports" / "archive.db"
+
+MARKDOWN_LINK = re.compile(r"\[([^\]]*)\]\(([^)\s]+)\)")
+BARE_URL = re.compile(r'(?<![\[(])\b(?:https?://|www\.)[^\s<>"\[\]()]+')
+
+
+def extract_citations(markdown: str) -> list[dict[str, str]]:
+    """
+    Collect the URLs a report cites, in order of first appearance.
+
+    Markdown links keep their text as the title; bare URLs have no title.
+    Internal anchors ("#section") are ignored.
+    """
+    citations = {}
+    for title, url in MARKDOWN_LINK.findall(markdown):
+        if not url.startswith("#") and url not in citations:
+            citations[url] = title.strip()
+    for url in BARE_URL.findall(MARKDOWN_LINK.sub(" ", markdown)):
+        url = url.rstrip(".,;:!?")
+        citations.setdefault(url, "")
+    return [{"title": title, "url": url} for url, title in citations.items()]
+
+
+# Words too common to narrow a search; dropped unless nothing else is left
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or that the this to "
+    "was what when where which who why with".split()
+)
+
+
+def fts_query(text: str, all_words: bool = True) -> str:
+    """
+    Turn free text into an FTS5 query.
+
+    Words are quoted so FTS5 operators and punctuation in the text cannot
+    cause syntax errors. Stopwords are dropped unless the text has no other
+    words.
+
+    Args:
+        text: Free-text query
+        all_words: Match reports containing every word (otherwise any word)
+    """
+    words = list(dict.fromkeys(re.findall(r"\w+", text.casefold())))
+    words = [word for word in words if word not in STOPWORDS] or words
+    return (" " if all_words else " OR ").join(f'"{word}"' for word in words)
+
+
+def _timestamp(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).isoformat(timespec="seconds")
+
+
+class ReportArchive:
+    """
+    SQLite FTS5 archive of research reports.
+
+    The reports table holds the markdown, query, creation time, citations and
+    PDF path; an external-content FTS5 table indexes the query (weighted
+    highest), the markdown and the citation titles and URLs. The database
+    uses WAL mode so the demo can write while the MCP server reads.
+
+    Args:
+        path: SQLite database file (created with its directory if missing)
+        clock: Wall-clock time source (overridable in tests)
+    """
+
+    # bm25 column weights: query, markdown, citations
+    RANK_WEIGHTS = (5.0, 1.0, 0.5)
+
+    def __init__(self, path: str | Path, clock: Callable[[], float] = time.time):
+        self.path = Path(path)
+        self.clock = clock
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(
+            self.path, check_same_thread=False, isolation_level=None, timeout=5
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS reports (
+                id INTEGER PRIMARY KEY,
+                query TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                markdown TEXT NOT NULL,
+                citations TEXT NOT NULL,
+                pdf_path TEXT
+            );
+            CREATE INDEX IF NOT EXISTS reports_by_time ON reports (created_at);
+            CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5(
+                query, markdown, citations,
+                content='reports', content_rowid='id',
+                tokenize='porter unicode61'
+            );
+            """
+        )
+
+    def add_many(self, reports: list[dict[str, Any]]) -> list[int]:
+        """
+        Archive several reports in one transaction.
+
+        Args:
+            reports: Dicts with markdown and query, and optionally citations
+                (extracted from the markdown if missing), pdf_path and
+                created_at (Unix seconds, default now)
+
+        Returns:
+            list[int]: IDs of the new reports, in input order
+        """
+        ids = []
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                for report in reports:
+                    markdown = report["markdown"]
+                    citations = report.get("citations")
+                    if citations is None:
+                        citations = extract_citations(markdown)
+                    citations = json.dumps(citations)
+                    report_id = self._db.execute(
+                        "INSERT INTO reports "
+                        "(query, created_at, markdown, citations, pdf_path) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (
+                            report["query"],
+                            report.get("created_at") or self.clock(),
+                            markdown,
+                            citations,
+                            report.get("pdf_path"),
+                        ),
+                    ).lastrowid
+                    self._db.execute(
+                        "INSERT INTO reports_fts (rowid, query, markdown, citations) "
+                        "VALUES (?, ?, ?, ?)",
+                        (
+                            report_id,
+                            report["query"],
+                            markdown,
+                            citations,
+                        ),
+                    )
+                    ids.append(report_id)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+        return ids
+
+    def add(
+        self,
+        markdown: str,
+        query: str,
+        citations: list[dict[str, str]] | None = None,
+        pdf_path: str | None = None,
+    ) -> int:
+        """Archive one report and return its ID."""
+        report = {
+            "markdown": markdown,
+            "query": query,
+            "citations": citations,
+            "pdf_path": pdf_path,
+        }
+        return self.add_many([report])[0]
+
+    def _top(
+        self, match: str, limit: int, since: float | None, exclude: list[int]
+    ) -> list[tuple[int, float]]:
+        sql = (
+            "SELECT rowid, bm25(reports_fts, ?, ?, ?) AS rank FROM reports_fts "
+            "WHERE reports_fts MATCH ?"
+        )
+        params: list[Any] = [*self.RANK_WEIGHTS, match]
+        if since is not None:
+            sql += " AND rowid IN (SELECT id FROM reports WHERE created_at >= ?)"
+            params.append(since)
+        if exclude:
+            sql += f" AND rowid NOT IN ({', '.join('?' * len(exclude))})"
+            params.extend(exclude)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        return self._db.execute(sql, params).fetchall()
+
+    def search(
+        self, text: str, limit: int = 5, since: float | None = None
+    ) -> list[dict[str, Any]]:
+        """
+        Find archived reports matching text, best first.
+
+        Reports containing every word rank first; if there are fewer than
+        limit of them, reports containing any of the words fill the rest.
+        Ranking happens in the index and only the returned reports are read
+        and snippeted, so latency depends on how many reports match, not on
+        their size.
+
+        Args:
+            text: Free-text query
+            limit: Maximum number of reports returned
+            since: Only reports created at or after this Unix time
+
+        Returns:
+            list: Report summaries with id, query, created_at, a highlighted
+            snippet, citations and score (higher is better)
+        """
+        match_all, match_any = fts_query(text), fts_query(text, all_words=False)
+        if not match_all or limit <= 0:
+            return []
+
+        with self._lock:
+            ranked = self._top(match_all, limit, since, [])
+            if len(ranked) < limit and match_any != match_all:
+                found = [report_id for report_id, _ in ranked]
+                ranked += self._top(match_any, limit - len(ranked), since, found)
+            if not ranked:
+                return []
+
+            placeholders = ", ".join("?" * len(ranked))
+            ids = [report_id for report_id, _ in ranked]
+            snippets = dict(
+                self._db.execute(
+                    "SELECT rowid, snippet(reports_fts, 1, '**', '**', ' ... ', 32) "
+                    "FROM reports_fts WHERE reports_fts MATCH ? "
+                    f"AND rowid IN ({placeholders})",
+                    [match_any, *ids],
+                ).fetchall()
+            )
+            rows = {
+                row[0]: row
+                for row in self._db.execute(
+                    "SELECT id, query, created_at, citations, pdf_path FROM reports "
+                    f"WHERE id IN ({placeholders})",
+                    ids,
+                ).fetchall()
+            }
+
+        results = []
+        for report_id, rank in ranked:
+            _, query, created_at, citations, pdf_path = rows[report_id]
+            results.append(
+                {
+                    "id": report_id,
+                    "query": query,
+                    "created_at": _timestamp(created_at),
+                    "snippet": snippets.get(report_id, ""),
+                    "citations": json.loads(citations),
+                    "pdf_path": pdf_path,
+                    "score": -rank,
+                }
+            )
+        return results
+
+    def get(self, report_id: int) -> dict[str, Any] | None:
+        """Return the full archived report, or None if the ID is unknown."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, query, created_at, markdown, citations, pdf_path "
+                "FROM reports WHERE id = ?",
+                (report_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        report_id, query, created_at, markdown, citations, pdf_path = row
+        return {
+            "id": report_id,
+            "query": query,
+            "created_at": _timestamp(created_at),
+            "markdown": markdown,
+            "citations": json.loads(citations),
+            "pdf_path": pdf_path,
+        }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    def optimize(self):
+        """Merge the full-text index segments (worth running after bulk loads)."""
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO reports_fts (reports_fts) VALUES ('optimize')"
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search archived research reports")
+    parser.add_argument("query", help="Words to look for")
+    parser.add_argument("--archive", default=str(DEFAULT_ARCHIVE_PATH))
+    parser.add_argument("--limit", type=int, default=5)
+    args = parser.parse_args()
+
+    archive = ReportArchive(args.archive)
+    for report in archive.search(args.query, limit=args.limit):
+        print(f"#{report['id']} [{report['created_at']}] {report['query']}")
+        print(f"    {report['snippet']}")
+    archive.close()
+
+
+if __name__ == "__main__":
+    main()
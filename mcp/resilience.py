@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+Upstream Admission Control
+
+Protects the vector store API from bursts and the MCP tools from a failing
+upstream: a token bucket paces requests, throttled or failed calls are
+retried with jittered exponential backoff that honors rate-limit headers,
+and a circuit breaker fails fast while the upstream is down.
+
+The limiter, breaker and retry loop are shared with the Qloo tool, whose
+agents/qloo_limits.py subclasses them for the Qloo API. The limiter and
+breaker are plain thread-safe state rather than asyncio primitives, so they
+can be shared across event loops.
+"""
+
+import asyncio
+import email.utils
+import logging
+import math
+import random
+import re
+import threading
+import time
+from typing import Any, Awaitable, Callable
+
+import openai
+
+logger = logging.getLogger(__name__)
+
+# Circuit breaker states, also used as the metric value
+CLOSED = 0
+HALF_OPEN = 1
+OPEN = 2
+STATE_NAMES = {CLOSED: "closed", HALF_OPEN: "half_open", OPEN: "open"}
+
+
+class UpstreamUnavailableError(RuntimeError):
+    """
+    Raised when the upstream is throttling or failing and retries are exhausted.
+
+    Transient by nature, so it is never cached as a failed result.
+
+    Args:
+        message: Description of the failure
+        retry_after: Suggested seconds to wait before retrying, if known
+    """
+
+    transient = True
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(UpstreamUnavailableError):
+    """Raised without calling the upstream while the circuit breaker is open."""
+
+
+def _parse_duration(value: str) -> float | None:
+    """Parse rate-limit reset durations such as "1s", "250ms" or "6m0s"."""
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|s|m|h)", value)
+    if not parts or "".join(number + unit for number, unit in parts) != value:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+def retry_after_seconds(headers) -> float | None:
+    """
+    Read the server-requested delay from rate-limit response headers.
+
+    Checks retry-after-ms, retry-after (seconds or HTTP date) and then
+    x-ratelimit-reset-requests / x-ratelimit-reset-tokens.
+
+    Returns:
+        float | None: Seconds to wait, or None if no header says
+    """
+    if headers is None:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return max(float(value) / 1000, 0.0)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if value is not None:
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            parsed = email.utils.parsedate_tz(value)
+            if parsed is not None:
+                return max(email.utils.mktime_tz(parsed) - time.time(), 0.0)
+
+    resets = [
+        _parse_duration(headers.get(name, ""))
+        for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+    ]
+    resets = [reset for reset in resets if reset is not None]
+    return max(resets) if resets else None
+
+
+def classify_status(status_code: int | None) -> str | None:
+    """
+    Decide whether a failed HTTP request is worth retrying.
+
+    Args:
+        status_code: Response status, or None for timeouts and network errors
+
+    Returns:
+        str | None: "rate_limited" for 429s, "unavailable" for timeouts,
+        network errors, conflicts and 5xx responses, None for errors a retry
+        cannot fix
+    """
+    if status_code == 429:
+        return "rate_limited"
+    if status_code is None or status_code >= 500 or status_code in (408, 409):
+        return "unavailable"
+    return None
+
+
+def classify_error(error: Exception) -> str | None:
+    """Decide whether an OpenAI API error is worth retrying (see classify_status)."""
+    if isinstance(error, openai.APIConnectionError):
+        return "unavailable"
+    if isinstance(error, openai.APIStatusError):
+        return classify_status(error.status_code)
+    return None
+
+
+class TokenBucket:
+    """
+    Token bucket limiter for upstream requests.
+
+    Callers reserve a slot and sleep until it comes up, so waiting callers
+    are served in arrival order without holding a lock across the wait.
+
+    Args:
+        rate: Tokens added per second (0 disables limiting)
+        burst: Bucket capacity, i.e. requests allowed back to back
+        clock: Monotonic time source (overridable in tests)
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.clock = clock
+        self.tokens = self.burst
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def _refill(self, now: float):
+        # _updated is in the future while paused: nothing accrues until then
+        if now > self._updated:
+            self.tokens = min(
+                self.burst, self.tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token and return the seconds to wait before using it."""
+        with self._lock:
+            now = self.clock()
+            if self.rate <= 0:
+                return max(self._paused_until - now, 0.0)
+            self._refill(now)
+            self.tokens -= 1
+            return max(self._updated - now, 0.0) + max(-self.tokens, 0.0) / self.rate
+
+    def pause(self, seconds: float):
+        """Hold every caller for seconds (e.g. when the upstream asks us to back off)."""
+        with self._lock:
+            now = self.clock()
+            until = now + seconds
+            if until <= self._paused_until:
+                return
+            self._paused_until = until
+            if self.rate > 0:
+                self._refill(now)
+                self.tokens = min(self.tokens, 0.0)
+                self._updated = max(self._updated, until)
+
+    async def acquire(self):
+        """Wait until a request may be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            self.waits += 1
+            self.wait_seconds += wait
+            await asyncio.sleep(wait)
+
+    def available(self) -> float:
+        if self.rate <= 0:
+            return float(self.burst)
+        with self._lock:
+            self._refill(self.clock())
+            return max(self.tokens, 0.0)
+
+
+class CircuitBreaker:
+    """
+    Fails fast after repeated upstream failures.
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    are rejected for reset_timeout seconds. Then a single trial call is let
+    through (half-open): success closes the circuit, failure re-opens it.
+
+    Subclasses set name (used in messages) and open_error (raised while open).
+
+    Args:
+        failure_threshold: Consecutive failures that open the circuit (0 disables)
+        reset_timeout: Seconds the circuit stays open before a trial call
+        clock: Monotonic time source (overridable in tests)
+    """
+
+    name = "Vector store"
+    open_error: type[Exception] = CircuitOpenError
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self.rejections = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Raise open_error unless a call may go upstream now."""
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self.opened_at + self.reset_timeout - self.clock()
+                if remaining > 0:
+                    self.rejections += 1
+                    raise self.open_error(
+                        f"{self.name} is unavailable after {self.failures} "
+                        f"consecutive failures; try again in {remaining:.0f}s",
+                        retry_after=remaining,
+                    )
+                self.state = HALF_OPEN
+
+            if self.state == HALF_OPEN:
+                if self._trial_in_flight:
+                    self.rejections += 1
+                    raise self.open_error(
+                        f"{self.name} is recovering and a trial request is in "
+                        "flight; try again shortly",
+                        retry_after=1.0,
+                    )
+                self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                logger.info(f"{self.name} circuit closed")
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.failure_threshold <= 0:
+                return
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    logger.warning(
+                        f"{self.name} circuit opened after {self.failures} failures"
+                    )
+                    self.opens += 1
+                self.state = OPEN
+                self.opened_at = self.clock()
+
+    def record_neutral(self):
+        """End a call that says nothing about upstream health (e.g. a 404)."""
+        with self._lock:
+            self._trial_in_flight = False
+            if self.state == HALF_OPEN:
+                self.state = CLOSED
+                self.failures = 0
+
+    def release(self):
+        """End a call that never finished (e.g. cancelled); the state is unchanged."""
+        # A half-open circuit stays half-open, so the next call is the trial
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class UpstreamGuard:
+    """
+    Admission control around upstream calls: limiter, retries and breaker.
+
+    Subclasses adapt it to another upstream by overriding name, classify,
+    server_delay and give_up.
+
+    Args:
+        limiter: Token bucket paced before every attempt
+        breaker: Circuit breaker shared by all calls
+        max_retries: Retries after the first attempt for retryable errors
+        base_delay: Backoff base in seconds (doubles per retry, full jitter)
+        max_delay: Longest wait between attempts; a server asking for longer
+            fails the call immediately
+        sleep: Async sleep function (overridable in tests)
+        rng: Random source for jitter (overridable in tests)
+    """
+
+    name = "Vector store"
+
+    def __init__(
+        self,
+        limiter: TokenBucket,
+        breaker: CircuitBreaker,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 20.0,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        rng: random.Random | None = None,
+    ):
+        self.limiter = limiter
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self.calls = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failures = 0
+
+    def classify(self, error: Exception) -> str | None:
+        """Retry class of an error: "rate_limited", "unavailable" or None."""
+        return classify_error(error)
+
+    def server_delay(self, error: Exception) -> float | None:
+        """Seconds the upstream asked us to wait before retrying, if any."""
+        return retry_after_seconds(
+            getattr(getattr(error, "response", None), "headers", None)
+        )
+
+    def give_up(
+        self, operation: str, error: Exception, attempts: int, delay: float
+    ) -> Exception:
+        """Error raised when retrying a retryable failure stops."""
+        return UpstreamUnavailableError(
+            f"{self.name} {operation} failed after {attempts} attempt(s): {error}",
+            retry_after=None if math.isinf(delay) else delay,
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry number (0-based)."""
+        ceiling = min(self.max_delay, self.base_delay * 2**attempt)
+        return self.rng.uniform(0, ceiling)
+
+    async def call(self, operation: str, request: Callable[[], Awaitable[Any]]):
+        """
+        Send an upstream request under admission control.
+
+        Args:
+            operation: Name used in log and error messages
+            request: Zero-argument coroutine function performing the call
+
+        Returns:
+            The request's result
+
+        Raises:
+            CircuitOpenError: The breaker is open (the upstream was not called)
+            Exception: The give_up error once retryable failures persist;
+                non-retryable errors from the request, unchanged
+        """
+        self.calls += 1
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                await self.limiter.acquire()
+                result = await request()
+            except Exception as e:
+                kind = self.classify(e)
+                if kind is None:
+                    self.breaker.record_neutral()
+                    raise
+
+                server_delay = self.server_delay(e)
+                if kind == "rate_limited":
+                    # Throttling means the upstream is up but we are too fast
+                    self.rate_limited += 1
+                    self.breaker.record_neutral()
+                    if server_delay:
+                        self.limiter.pause(min(server_delay, self.max_delay))
+                else:
+                    self.breaker.record_failure()
+
+                delay = (
+                    server_delay + self.rng.uniform(0, self.base_delay)
+                    if server_delay is not None
+                    else self.backoff(attempt)
+                )
+                # A retry after the breaker opened would be rejected anyway
+                if (
+                    attempt >= self.max_retries
+                    or delay > self.max_delay
+                    or self.breaker.state == OPEN
+                ):
+                    self.failures += 1
+                    raise self.give_up(operation, e, attempt + 1, delay) from e
+
+                logger.warning(
+                    f"{self.name} {operation} {kind} ({e}); "
+                    f"retry {attempt + 1}/{self.max_retries} in {delay:.2f}s"
+                )
+                self.retries += 1
+                attempt += 1
+                await self.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled while waiting or in flight: free a half-open trial
+                # slot, or every later call is rejected as "trial in flight"
+                self.breaker.release()
+                raise
+
+            self.breaker.record_success()
+            return result
+
+    def saturated(self) -> bool:
+        """Return True while new calls would wait for tokens or be rejected."""
+        return self.breaker.state != CLOSED or self.limiter.available() < 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "failures": self.failures,
+            "limiter_tokens": self.limiter.available(),
+            "limiter_waits": self.limiter.waits,
+            "limiter_wait_seconds": self.limiter.wait_seconds,
+            "breaker_state": STATE_NAMES[self.breaker.state],
+            "breaker_failures": self.breaker.failures,
+            "breaker_opens": self.breaker.opens,
+            "breaker_rejections": self.breaker.rejections,
+        }
@@ -6,13 +6,49 @@ This server implements the Model Context Protocol (MCP) with search and fetch
 capabilities designed to work with ChatGPT's deep research feature.
 """
 
+import asyncio
 import logging
+import os
+import tempfile
+from functools import partial
+from pathlib import Path
 from typing import Any
 
+import httpx
+from backends import (
+    BackendConfigurationError,
+    FederatedVectorStoreBackend,
+    LocalVectorIndexBackend,
+    OpenAIVectorStoreBackend,
+    VectorStoreBackend,
+    search_options,
+)
+from caching import (
+    PersistentCacheStore,
+    StoreVersionWatcher,
+    TTLCache,
+    normalize_query,
+)
 from dotenv import load_dotenv
 from fastmcp import FastMCP
-from openai import OpenAI
-from vector_utils import detect_vector_store_id
+from fastmcp.server.http import create_base_app
+from filters import filter_conditions, filters_key
+from metrics import ServerMetrics
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, Timeout
+from paging import page_document, select_passages
+from prefetch import Prefetcher
+from prometheus_client import CONTENT_TYPE_LATEST
+from report_archive import DEFAULT_ARCHIVE_PATH, ReportArchive
+from resilience import (
+    CircuitBreaker,
+    TokenBucket,
+    UpstreamGuard,
+    UpstreamUnavailableError,
+)
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from vector_utils import detect_vector_store_id, detect_vector_store_ids
 
 # Load environment variables from .env file
 load_dotenv(override=True)
@@ -21,166 +57,659 @@ load_dotenv(override=True)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize OpenAI client
-openai_client = OpenAI()
+# Upstream HTTP connection pool, shared by every concurrent tool call
+HTTP_MAX_CONNECTIONS = int(os.getenv("MCP_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("MCP_HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("MCP_HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_TIMEOUT = float(os.getenv("MCP_HTTP_TIMEOUT", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("MCP_HTTP_CONNECT_TIMEOUT", "5"))
+
+# Upstream admission control: token bucket (requests per second and burst,
+# rate 0 disables), jittered exponential retries and a circuit breaker
+UPSTREAM_RATE = float(os.getenv("MCP_UPSTREAM_RATE", "50"))
+UPSTREAM_BURST = float(os.getenv("MCP_UPSTREAM_BURST", "100"))
+UPSTREAM_MAX_RETRIES = int(os.getenv("MCP_UPSTREAM_MAX_RETRIES", "3"))
+UPSTREAM_RETRY_BASE_DELAY = float(os.getenv("MCP_UPSTREAM_RETRY_BASE_DELAY", "0.5"))
+UPSTREAM_RETRY_MAX_DELAY = float(os.getenv("MCP_UPSTREAM_RETRY_MAX_DELAY", "20"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("MCP_BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("MCP_BREAKER_RESET_TIMEOUT", "30"))
+
+
+def create_openai_client(**kwargs) -> AsyncOpenAI:
+    """
+    Create an AsyncOpenAI client backed by a pooled, keep-alive HTTP client.
+
+    Pool size and timeouts come from the MCP_HTTP_* environment variables so
+    upstream calls never block the event loop and reuse warm connections.
+    The client's own retries are off; UpstreamGuard retries instead.
+
+    Args:
+        **kwargs: Extra AsyncOpenAI arguments (e.g. api_key, base_url)
+
+    Returns:
+        AsyncOpenAI: Configured client
+    """
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+    )
+    kwargs.setdefault("max_retries", 0)
+    return AsyncOpenAI(http_client=http_client, **kwargs)
+
+
+def create_upstream_guard() -> UpstreamGuard:
+    """Create upstream admission control from the MCP_UPSTREAM_* / MCP_BREAKER_* settings."""
+    return UpstreamGuard(
+        limiter=TokenBucket(UPSTREAM_RATE, UPSTREAM_BURST),
+        breaker=CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT),
+        max_retries=UPSTREAM_MAX_RETRIES,
+        base_delay=UPSTREAM_RETRY_BASE_DELAY,
+        max_delay=UPSTREAM_RETRY_MAX_DELAY,
+    )
+
+
+# Initialize OpenAI client (None when no API key is configured)
+openai_client = create_openai_client() if os.getenv("OPENAI_API_KEY") else None
 
 # Vector store ID (detected at runtime)
 VECTOR_STORE_ID = None
 
+# Every vector store searched; more than one enables federated search. Set
+# VECTOR_STORE_IDS (comma-separated) or MCP_FEDERATE_STORES=1 to search all
+# discovered files_vs_* stores; results are merged by MCP_FEDERATION_FUSION
+# ("rrf" for reciprocal rank fusion, "score" for normalized scores)
+VECTOR_STORE_IDS: list[str] = []
+FEDERATE_STORES = os.getenv("MCP_FEDERATE_STORES", "0").lower() in ("1", "true", "yes")
+FEDERATION_FUSION = os.getenv("MCP_FEDERATION_FUSION", "rrf").lower()
+
+# Retrieval backend: "openai" (hosted vector store) or "local" (offline index)
+MCP_BACKEND = os.getenv("MCP_BACKEND", "openai").lower()
+
+# Corpus indexed by the local backend
+DEFAULT_CORPUS_DIR = Path(__file__).resolve().parent.parent / "files"
+CORPUS_DIR = os.getenv("MCP_CORPUS_DIR", str(DEFAULT_CORPUS_DIR))
+INDEX_DIR = os.getenv("MCP_INDEX_DIR") or None
+
+# Fuse BM25 lexical matches with vector matches in the local backend
+LOCAL_HYBRID = os.getenv("MCP_LOCAL_HYBRID", "1").lower() not in ("0", "false", "no")
+
+# In-memory cache of assembled fetch results, keyed by (store ID, file ID)
+DOCUMENT_CACHE_MAX_BYTES = int(
+    os.getenv("MCP_DOCUMENT_CACHE_MAX_BYTES", str(64 * 1024 * 1024))
+)
+DOCUMENT_CACHE_TTL = float(os.getenv("MCP_DOCUMENT_CACHE_TTL", "600"))
+DOCUMENT_CACHE_ERROR_TTL = float(os.getenv("MCP_DOCUMENT_CACHE_ERROR_TTL", "30"))
+
+# In-memory cache of search results, keyed by (store ID, normalized query)
+SEARCH_CACHE_MAX_BYTES = int(
+    os.getenv("MCP_SEARCH_CACHE_MAX_BYTES", str(16 * 1024 * 1024))
+)
+SEARCH_CACHE_TTL = float(os.getenv("MCP_SEARCH_CACHE_TTL", "300"))
+
+# Optional SQLite tier behind both caches that survives restarts (disabled
+# unless a path is set), and how many hot entries to pre-warm on startup
+PERSISTENT_CACHE_PATH = os.getenv("MCP_PERSISTENT_CACHE_PATH", "")
+PERSISTENT_CACHE_MAX_BYTES = int(
+    os.getenv("MCP_PERSISTENT_CACHE_MAX_BYTES", str(512 * 1024 * 1024))
+)
+PERSISTENT_CACHE_MAX_ENTRY_BYTES = int(
+    os.getenv("MCP_PERSISTENT_CACHE_MAX_ENTRY_BYTES", str(8 * 1024 * 1024))
+)
+PERSISTENT_CACHE_TTL = float(os.getenv("MCP_PERSISTENT_CACHE_TTL", "86400"))
+CACHE_PREWARM_ENTRIES = int(os.getenv("MCP_CACHE_PREWARM_ENTRIES", "200"))
+
+# Seconds between checks for vector store changes that invalidate the caches
+STORE_VERSION_CHECK_INTERVAL = float(
+    os.getenv("MCP_STORE_VERSION_CHECK_INTERVAL", "60")
+)
+
+# Largest max_results a search may ask for (the OpenAI API limit). Results
+# are documents: the backend is asked for SEARCH_SNIPPETS_PER_RESULT chunks per
+# requested document, up to this limit, and the grouped results are capped
+SEARCH_MAX_RESULTS = int(os.getenv("MCP_SEARCH_MAX_RESULTS", "50"))
+
+# Search results are one per file: the snippets of its best chunks (up to
+# SEARCH_SNIPPETS_PER_RESULT, each cut to SEARCH_SNIPPET_CHARS) are merged
+SEARCH_SNIPPETS_PER_RESULT = int(os.getenv("MCP_SEARCH_SNIPPETS_PER_RESULT", "3"))
+SEARCH_SNIPPET_CHARS = int(os.getenv("MCP_SEARCH_SNIPPET_CHARS", "200"))
+
+# Speculative prefetch of the top search hits into the document cache:
+# documents per search (0 disables), concurrent prefetches, and the number of
+# tool calls in flight at which prefetching stops and queued prefetches are
+# cancelled (they are also shed while the upstream limiter or breaker is busy)
+PREFETCH_TOP_K = int(os.getenv("MCP_PREFETCH_TOP_K", "0"))
+PREFETCH_CONCURRENCY = int(os.getenv("MCP_PREFETCH_CONCURRENCY", "2"))
+PREFETCH_MAX_LOAD = int(os.getenv("MCP_PREFETCH_MAX_LOAD", "8"))
+
+# Batch tools: maximum items per call and concurrent upstream requests per call
+BATCH_MAX_ITEMS = int(os.getenv("MCP_BATCH_MAX_ITEMS", "20"))
+BATCH_CONCURRENCY = int(os.getenv("MCP_BATCH_CONCURRENCY", "8"))
+
+# Default fetch page size in characters (0 returns whole documents) and the
+# default budget for query-focused passages
+FETCH_MAX_CHARS = int(os.getenv("MCP_FETCH_MAX_CHARS", "0"))
+FETCH_QUERY_MAX_CHARS = int(os.getenv("MCP_FETCH_QUERY_MAX_CHARS", "4000"))
+
+# Archive of finished research reports (written by the demo) that the
+# search_reports and get_report tools query; results per search are capped
+REPORT_ARCHIVE_PATH = os.getenv("REPORT_ARCHIVE_PATH", str(DEFAULT_ARCHIVE_PATH))
+REPORT_SEARCH_MAX_RESULTS = int(os.getenv("MCP_REPORT_SEARCH_MAX_RESULTS", "20"))
+
+# Serving: bind address, transports ("sse", "streamable-http" or "both") and
+# worker processes. SSE sessions live in the worker that opened them, so
+# multiple workers require the stateless streamable-HTTP transport.
+SERVER_HOST = os.getenv("MCP_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("MCP_PORT", "8001"))
+SERVER_TRANSPORT = os.getenv("MCP_TRANSPORT", "both").lower()
+STREAMABLE_HTTP_PATH = os.getenv("MCP_STREAMABLE_HTTP_PATH", "/mcp")
+SERVER_WORKERS = int(os.getenv("MCP_WORKERS", "1"))
+GRACEFUL_SHUTDOWN_TIMEOUT = int(os.getenv("MCP_GRACEFUL_SHUTDOWN_TIMEOUT", "10"))
+
+
+def create_persistent_store() -> PersistentCacheStore | None:
+    """Open the on-disk cache tier if MCP_PERSISTENT_CACHE_PATH is set."""
+    if not PERSISTENT_CACHE_PATH:
+        return None
+    return PersistentCacheStore(
+        PERSISTENT_CACHE_PATH,
+        max_bytes=PERSISTENT_CACHE_MAX_BYTES,
+        ttl=PERSISTENT_CACHE_TTL,
+        max_entry_bytes=PERSISTENT_CACHE_MAX_ENTRY_BYTES,
+    )
+
+
+def aggregate_hits(
+    hits: list[dict[str, Any]],
+    max_snippets: int | None = None,
+    snippet_chars: int | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Collapse chunk hits into one search result per file.
+
+    Hits arrive best first, so each file keeps its best score and its
+    position. The snippets of its best chunks are merged and the number of
+    matching chunks is reported.
+
+    Args:
+        hits: Chunk hits from a backend search, best first
+        max_snippets: Snippets merged per file (SEARCH_SNIPPETS_PER_RESULT)
+        snippet_chars: Characters kept per snippet (SEARCH_SNIPPET_CHARS)
+
+    Returns:
+        list: Results with id, title, text, url, score and chunks
+    """
+    max_snippets = max_snippets or SEARCH_SNIPPETS_PER_RESULT
+    snippet_chars = snippet_chars or SEARCH_SNIPPET_CHARS
+
+    results: dict[str, dict[str, Any]] = {}
+    snippets: dict[str, list[str]] = {}
+    for hit in hits:
+        text_content = " ".join((hit["text"] or "").split())
+        text_snippet = (
+            text_content[:snippet_chars] + "..."
+            if len(text_content) > snippet_chars
+            else text_content
+        )
+
+        result = results.get(hit["id"])
+        if result is None:
+            results[hit["id"]] = {
+                "id": hit["id"],
+                "title": hit["title"],
+                "url": hit["url"],
+                "score": hit.get("score"),
+                "chunks": 1,
+            }
+            snippets[hit["id"]] = [text_snippet] if text_snippet else []
+            continue
+
+        result["chunks"] += 1
+        file_snippets = snippets[hit["id"]]
+        if (
+            text_snippet
+            and len(file_snippets) < max_snippets
+            and text_snippet not in file_snippets
+        ):
+            file_snippets.append(text_snippet)
+
+    for file_id, result in results.items():
+        result["text"] = " [...] ".join(snippets[file_id]) or "No content available"
+    return list(results.values())
+
+
+def create_document_cache(store: PersistentCacheStore | None = None) -> TTLCache:
+    """Create the fetch result cache from the MCP_DOCUMENT_CACHE_* settings."""
+    return TTLCache(
+        max_bytes=DOCUMENT_CACHE_MAX_BYTES,
+        ttl=DOCUMENT_CACHE_TTL,
+        error_ttl=DOCUMENT_CACHE_ERROR_TTL,
+        store=store,
+        namespace="document",
+    )
+
+
+def create_search_cache(store: PersistentCacheStore | None = None) -> TTLCache:
+    """Create the search result cache from the MCP_SEARCH_CACHE_* settings."""
+    return TTLCache(
+        max_bytes=SEARCH_CACHE_MAX_BYTES,
+        ttl=SEARCH_CACHE_TTL,
+        store=store,
+        namespace="search",
+    )
+
 
-def create_server():
+def create_backend() -> VectorStoreBackend:
+    """Create the retrieval backend selected by MCP_BACKEND."""
+    if MCP_BACKEND == "local":
+        return LocalVectorIndexBackend(
+            CORPUS_DIR, index_dir=INDEX_DIR, hybrid=LOCAL_HYBRID
+        ).load()
+    if MCP_BACKEND != "openai":
+        raise ValueError(
+            f"Unknown MCP_BACKEND '{MCP_BACKEND}' (use 'openai' or 'local')"
+        )
+    # One guard for all stores: they share the API key's rate limits
+    guard = create_upstream_guard()
+    if len(VECTOR_STORE_IDS) > 1:
+        return FederatedVectorStoreBackend(
+            [
+                OpenAIVectorStoreBackend(openai_client, store_id, guard=guard)
+                for store_id in VECTOR_STORE_IDS
+            ],
+            fusion=FEDERATION_FUSION,
+        )
+    return OpenAIVectorStoreBackend(openai_client, VECTOR_STORE_ID, guard=guard)
+
+
+def create_server(
+    backend: VectorStoreBackend | None = None,
+    document_cache: TTLCache | None = None,
+    search_cache: TTLCache | None = None,
+    metrics: ServerMetrics | None = None,
+    prefetch_top_k: int | None = None,
+    report_archive: ReportArchive | None = None,
+):
     """Create MCP server with search and fetch tools."""
+    if backend is None:
+        backend = create_backend()
+    if document_cache is None or search_cache is None:
+        persistent_store = create_persistent_store()
+        if document_cache is None:
+            document_cache = create_document_cache(persistent_store)
+        if search_cache is None:
+            search_cache = create_search_cache(persistent_store)
+    persistent_store = document_cache.store or search_cache.store
+
+    store_watcher = StoreVersionWatcher(
+        backend,
+        [search_cache, document_cache],
+        STORE_VERSION_CHECK_INTERVAL,
+        store=persistent_store,
+    )
+
+    prewarmed = False
+
+    async def _check_store():
+        # Persisted entries may predate a change to the store: check its
+        # version once before serving or pre-warming any of them
+        nonlocal prewarmed
+        await store_watcher.ready()
+        if not prewarmed:
+            prewarmed = True
+            # Start warm: load the most used persisted results into memory
+            for cache in (search_cache, document_cache):
+                loaded = cache.prewarm(CACHE_PREWARM_ENTRIES)
+                if loaded:
+                    logger.info(f"Pre-warmed {loaded} {cache.namespace} cache entries")
+        store_watcher.schedule()
+
+    def _busy() -> bool:
+        if metrics.active_tools >= PREFETCH_MAX_LOAD:
+            return True
+        return backend.guard is not None and backend.guard.saturated()
+
+    prefetcher = Prefetcher(
+        document_cache,
+        PREFETCH_TOP_K if prefetch_top_k is None else prefetch_top_k,
+        concurrency=PREFETCH_CONCURRENCY,
+        busy=_busy,
+    )
+    if metrics is None:
+        metrics = ServerMetrics(
+            caches={"search": search_cache, "document": document_cache},
+            guard=backend.guard,
+            prefetcher=prefetcher,
+        )
+
     mcp = FastMCP(
         name="Sample Deep Research MCP Server",
         instructions="""
         This MCP server provides search and document retrieval capabilities for deep research.
         Use the search tool to find relevant documents based on keywords, then use the fetch
-        tool to retrieve complete document content with citations.
+        tool to retrieve complete document content with citations. When you need several
+        searches or documents at once, use search_many and fetch_many to save round trips.
+        Before starting new research, use search_reports to check whether an earlier
+        research report already answers the question, and get_report to read it.
         """,
     )
 
-    @mcp.tool()
-    async def search(query: str) -> dict[str, list[dict[str, Any]]]:
-        """Search vector store for relevant documents. Returns list with id, title, text snippet."""
-        if not query or not query.strip():
-            return {"results": []}
+    def _archive() -> ReportArchive | None:
+        # Opened on first use, once the demo has written a report
+        nonlocal report_archive
+        if report_archive is None and Path(REPORT_ARCHIVE_PATH).exists():
+            report_archive = ReportArchive(REPORT_ARCHIVE_PATH)
+        return report_archive
+
+    def _search_options(
+        max_results: int | None,
+        filters: dict[str, Any] | None,
+        score_threshold: float | None,
+    ) -> dict[str, Any]:
+        if max_results is not None and not 1 <= max_results <= SEARCH_MAX_RESULTS:
+            raise ValueError(f"max_results must be between 1 and {SEARCH_MAX_RESULTS}")
+        if score_threshold is not None and not 0 <= score_threshold <= 1:
+            raise ValueError("score_threshold must be between 0 and 1")
+        filter_conditions(filters)
+        return search_options(max_results, filters, score_threshold)
+
+    async def _search_backend(
+        query: str, options: dict[str, Any]
+    ) -> list[dict[str, Any]]:
+        # max_results counts documents, and a document can fill several chunk hits
+        max_results = options.get("max_results")
+        if max_results:
+            options = {
+                **options,
+                "max_results": min(
+                    max_results * SEARCH_SNIPPETS_PER_RESULT, SEARCH_MAX_RESULTS
+                ),
+            }
+        with metrics.track_upstream("search"):
+            hits = await backend.search(query, **options)
+
+        return aggregate_hits(hits)[:max_results]
+
+    async def _search(query: str, options: dict[str, Any]) -> list[dict[str, Any]]:
+        await _check_store()
+        prefetcher.shed_if_busy()
+        key = (backend.store_id, normalize_query(query))
+        if options:
+            key += (
+                options.get("max_results"),
+                filters_key(options.get("filters")),
+                options.get("score_threshold"),
+            )
+        results = await search_cache.get_or_load(
+            key, lambda: _search_backend(query, options)
+        )
 
-        if not openai_client:
-            logger.error("OpenAI client not initialized - API key missing")
-            raise ValueError("OpenAI API key is required for vector store search")
+        # The top hits are likely to be fetched next: start loading them now
+        prefetcher.schedule(
+            [
+                (
+                    (backend.store_id, result["id"]),
+                    partial(_fetch_backend, result["id"], "prefetch"),
+                )
+                for result in results
+            ]
+        )
+        return results
 
-        if not VECTOR_STORE_ID:
-            logger.error("Vector store ID not configured")
-            raise ValueError("Vector store ID is required for search")
+    async def _fetch_backend(id: str, operation: str = "fetch") -> dict[str, Any]:
+        with metrics.track_upstream(operation):
+            return await backend.fetch(id)
 
-        try:
-            # Search the vector store using OpenAI API
-            logger.info(
-                f"Searching vector store {VECTOR_STORE_ID} for query: '{query}'"
-            )
+    async def _fetch(id: str) -> dict[str, Any]:
+        await _check_store()
+        key = (backend.store_id, id)
+        prefetcher.shed_if_busy()
+        prefetcher.claim(key)
+        return await document_cache.get_or_load(key, lambda: _fetch_backend(id))
 
-            response = openai_client.vector_stores.search(
-                vector_store_id=VECTOR_STORE_ID, query=query
+    async def _run_batch(items: list[str], worker) -> list[dict[str, Any]]:
+        if len(items) > BATCH_MAX_ITEMS:
+            raise ValueError(
+                f"Batch of {len(items)} items exceeds the limit of {BATCH_MAX_ITEMS}"
             )
 
-            results = []
-
-            # Process search results
-            if hasattr(response, "data") and response.data:
-                for i, item in enumerate(response.data):
-                    item_id = getattr(item, "file_id", f"vs_{i}")
-                    item_filename = getattr(item, "filename", f"Document {i + 1}")
-
-                    # Extract text content
-                    content_list = getattr(item, "content", [])
-                    text_content = ""
-                    if content_list and len(content_list) > 0:
-                        first_content = content_list[0]
-                        if hasattr(first_content, "text"):
-                            text_content = first_content.text
-                        elif isinstance(first_content, dict):
-                            text_content = first_content.get("text", "")
-
-                    if not text_content:
-                        text_content = "No content available"
-
-                    text_snippet = (
-                        text_content[:200] + "..."
-                        if len(text_content) > 200
-                        else text_content
-                    )
-
-                    result = {
-                        "id": item_id,
-                        "title": item_filename,
-                        "text": text_snippet,
-                        "url": f"https://platform.openai.com/storage/files/{item_id}",
-                    }
-
-                    results.append(result)
-
-            logger.info(f"Vector store search returned {len(results)} results")
-            return {"results": results}
-
-        except Exception as e:
-            logger.error(f"Error during vector store search: {e}")
-            # Return empty results instead of raising to prevent server crash
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+        async def run(item: str) -> dict[str, Any]:
+            async with semaphore:
+                return await worker(item)
+
+        # gather keeps results in input order
+        return list(await asyncio.gather(*(run(item) for item in items)))
+
+    @mcp.tool()
+    async def search(
+        query: str,
+        max_results: int | None = None,
+        filters: dict[str, Any] | None = None,
+        score_threshold: float | None = None,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Search vector store for relevant documents. Returns one result per document with id, title, text (snippets of its best matching chunks), score and chunks (number of matching chunks). Optional: max_results (1-50, default 10); filters on file attributes, e.g. {"filename": "report.md"}, a list to match any value, or {"gte": 2023}-style comparisons (eq, ne, gt, gte, lt, lte, in, nin); score_threshold (0-1) to drop weak matches."""
+        options = _search_options(max_results, filters, score_threshold)
+        if not query or not query.strip():
             return {"results": []}
 
+        with metrics.track_tool("search"):
+            try:
+                # Search the configured backend (or serve a cached result)
+                logger.info(
+                    f"Searching {backend.name} store {backend.store_id} for query: '{query}'"
+                )
+
+                results = await _search(query, options)
+
+                logger.info(f"Vector store search returned {len(results)} results")
+                return {"results": results}
+
+            except BackendConfigurationError:
+                raise
+            except UpstreamUnavailableError as e:
+                # Surface throttling/outages so the agent does not mistake
+                # them for "no internal documents" and re-query in a loop
+                logger.error(f"Vector store unavailable for search: {e}")
+                raise
+            except Exception as e:
+                logger.error(f"Error during vector store search: {e}")
+                metrics.record_tool_error("search")
+                # Return empty results instead of raising to prevent server crash
+                return {"results": []}
+
+    def _check_page(offset: int, max_chars: int | None):
+        if offset < 0:
+            raise ValueError("offset must be 0 or greater")
+        if max_chars is not None and max_chars <= 0:
+            raise ValueError("max_chars must be greater than 0")
+
+    async def _limit(
+        document: dict[str, Any], offset: int, max_chars: int | None, query: str | None
+    ) -> dict[str, Any]:
+        if query and query.strip():
+            # Embeds the passages: keep it off the event loop
+            return await asyncio.to_thread(
+                select_passages, document, query, max_chars or FETCH_QUERY_MAX_CHARS
+            )
+        return page_document(document, offset, max_chars or FETCH_MAX_CHARS)
+
     @mcp.tool()
-    async def fetch(id: str) -> dict[str, Any]:
-        """Retrieve complete document content by ID for analysis and citation."""
+    async def fetch(
+        id: str,
+        offset: int = 0,
+        max_chars: int | None = None,
+        query: str | None = None,
+    ) -> dict[str, Any]:
+        """Retrieve document content by ID for analysis and citation. Use offset/max_chars to page through large documents (follow next_offset), or pass query to get only the most relevant passages."""
         if not id:
             raise ValueError("Document ID is required")
+        _check_page(offset, max_chars)
+
+        with metrics.track_tool("fetch"):
+            try:
+                logger.info(
+                    f"Fetching content from {backend.name} store for file ID: {id}"
+                )
+
+                result = await _limit(await _fetch(id), offset, max_chars, query)
+
+                logger.info(f"Successfully fetched vector store file: {id}")
+                return result
+
+            except BackendConfigurationError:
+                raise
+            except Exception as e:
+                logger.error(f"Error fetching vector store file {id}: {e}")
+                metrics.record_tool_error("fetch")
+                # Return error result instead of raising to prevent server crash
+                return {
+                    "id": id,
+                    "title": f"Error retrieving document {id}",
+                    "text": f"Error: {str(e)}",
+                    "url": f"https://platform.openai.com/storage/files/{id}",
+                    "metadata": None,
+                }
 
-        if not openai_client:
-            logger.error("OpenAI client not initialized - API key missing")
-            raise ValueError(
-                "OpenAI API key is required for vector store file retrieval"
-            )
-
-        if not VECTOR_STORE_ID:
-            logger.error("Vector store ID not configured")
-            raise ValueError("Vector store ID is required for file retrieval")
+    @mcp.tool()
+    async def search_many(
+        queries: list[str],
+        max_results: int | None = None,
+        filters: dict[str, Any] | None = None,
+        score_threshold: float | None = None,
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Run several searches in one call. Returns one entry per query, in order, with results or an error. max_results, filters and score_threshold apply to every query as in search."""
+        options = _search_options(max_results, filters, score_threshold)
+
+        async def search_one(query: str) -> dict[str, Any]:
+            if not query or not query.strip():
+                return {"query": query, "results": [], "error": None}
+            try:
+                results = await _search(query, options)
+                return {"query": query, "results": results, "error": None}
+            except BackendConfigurationError:
+                raise
+            except Exception as e:
+                logger.error(f"Error during batch search for '{query}': {e}")
+                metrics.record_tool_error("search_many")
+                return {"query": query, "results": [], "error": str(e)}
+
+        logger.info(f"Batch search for {len(queries)} queries")
+        with metrics.track_tool("search_many"):
+            return {"results": await _run_batch(queries, search_one)}
 
-        try:
-            logger.info(f"Fetching content from vector store for file ID: {id}")
+    @mcp.tool()
+    async def fetch_many(
+        ids: list[str], max_chars: int | None = None, query: str | None = None
+    ) -> dict[str, list[dict[str, Any]]]:
+        """Retrieve several documents in one call. Returns one entry per ID, in order, with the document or an error. max_chars and query limit each document as in fetch."""
+        _check_page(0, max_chars)
+
+        async def fetch_one(id: str) -> dict[str, Any]:
+            try:
+                if not id:
+                    raise ValueError("Document ID is required")
+                document = await _limit(await _fetch(id), 0, max_chars, query)
+                return {**document, "error": None}
+            except BackendConfigurationError:
+                raise
+            except Exception as e:
+                logger.error(f"Error during batch fetch of {id}: {e}")
+                metrics.record_tool_error("fetch_many")
+                return {"id": id, "error": str(e)}
+
+        logger.info(f"Batch fetch for {len(ids)} documents")
+        with metrics.track_tool("fetch_many"):
+            return {"documents": await _run_batch(ids, fetch_one)}
 
-            # Fetch file content from vector store
-            content_response = openai_client.vector_stores.files.content(
-                vector_store_id=VECTOR_STORE_ID, file_id=id
+    @mcp.tool()
+    async def search_reports(query: str, max_results: int = 5) -> dict[str, Any]:
+        """Search previously generated research reports. Returns the best matches with id, original query, created_at, a snippet (matches in **bold**) and citations. Use get_report(id) to read a full report."""
+        if not 1 <= max_results <= REPORT_SEARCH_MAX_RESULTS:
+            raise ValueError(
+                f"max_results must be between 1 and {REPORT_SEARCH_MAX_RESULTS}"
             )
+        archive = _archive()
+        if archive is None or not query or not query.strip():
+            return {"results": []}
 
-            # Get file metadata
-            file_info = openai_client.vector_stores.files.retrieve(
-                vector_store_id=VECTOR_STORE_ID, file_id=id
-            )
+        with metrics.track_tool("search_reports"):
+            try:
+                logger.info(f"Searching report archive for query: '{query}'")
+                results = await asyncio.to_thread(archive.search, query, max_results)
+                logger.info(f"Report archive search returned {len(results)} results")
+                return {"results": results}
+            except Exception as e:
+                logger.error(f"Error during report archive search: {e}")
+                metrics.record_tool_error("search_reports")
+                return {"results": []}
 
-            # Extract content
-            file_content = ""
-            if hasattr(content_response, "data") and content_response.data:
-                content_parts = []
-                for content_item in content_response.data:
-                    if hasattr(content_item, "text"):
-                        content_parts.append(content_item.text)
-                file_content = "\n".join(content_parts)
-            else:
-                file_content = "No content available"
-
-            filename = getattr(file_info, "filename", f"Document {id}")
-
-            result = {
-                "id": id,
-                "title": filename,
-                "text": file_content,
-                "url": f"https://platform.openai.com/storage/files/{id}",
-                "metadata": None,
+    @mcp.tool()
+    async def get_report(id: int) -> dict[str, Any]:
+        """Retrieve an archived research report by ID: its markdown, original query, created_at and citations."""
+        archive = _archive()
+        with metrics.track_tool("get_report"):
+            report = await asyncio.to_thread(archive.get, id) if archive else None
+            if report is None:
+                raise ValueError(f"No archived report with ID {id}")
+            return report
+
+    @mcp.custom_route("/stats", methods=["GET"])
+    async def stats(request: Request) -> JSONResponse:
+        """Report cache statistics (share of searches and fetches served locally)."""
+        return JSONResponse(
+            {
+                "backend": backend.name,
+                "store_id": backend.store_id,
+                "search_cache": search_cache.stats(),
+                "document_cache": document_cache.stats(),
+                "prefetch": prefetcher.stats(),
+                "store_invalidations": store_watcher.invalidations,
+                "upstream": backend.guard.stats() if backend.guard else None,
+                "persistent_cache": (
+                    persistent_store.stats() if persistent_store else None
+                ),
             }
+        )
 
-            # Add metadata if available from file info
-            if hasattr(file_info, "attributes") and file_info.attributes:
-                result["metadata"] = file_info.attributes
-
-            logger.info(f"Successfully fetched vector store file: {id}")
-            return result
-
-        except Exception as e:
-            logger.error(f"Error fetching vector store file {id}: {e}")
-            # Return error result instead of raising to prevent server crash
-            return {
-                "id": id,
-                "title": f"Error retrieving document {id}",
-                "text": f"Error: {str(e)}",
-                "url": f"https://platform.openai.com/storage/files/{id}",
-                "metadata": None,
-            }
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def prometheus_metrics(request: Request) -> Response:
+        """Expose Prometheus metrics for scraping."""
+        return Response(metrics.render(), media_type=CONTENT_TYPE_LATEST)
+
+    @mcp.custom_route("/healthz", methods=["GET"])
+    async def healthz(request: Request) -> JSONResponse:
+        """Liveness probe: the process is up and serving requests."""
+        return JSONResponse({"status": "ok"})
+
+    @mcp.custom_route("/readyz", methods=["GET"])
+    async def readyz(request: Request) -> JSONResponse:
+        """Readiness probe: the client is initialized and the vector store is known."""
+        try:
+            backend.check_ready()
+        except BackendConfigurationError as e:
+            return JSONResponse(
+                {"status": "not ready", "reason": str(e)}, status_code=503
+            )
+        return JSONResponse(
+            {"status": "ready", "backend": backend.name, "store_id": backend.store_id}
+        )
 
     return mcp
 
 
-def main():
-    """Main function to start the MCP server."""
-    global VECTOR_STORE_ID
+def configure_backend():
+    """Check the backend configuration and detect the vector store ID if needed."""
+    global VECTOR_STORE_ID, VECTOR_STORE_IDS
+
+    if MCP_BACKEND == "local":
+        # The local backend needs neither an API key nor a hosted vector store
+        logger.info(f"Using local vector index for corpus: {CORPUS_DIR}")
+        return
 
     # Verify OpenAI client is initialized
     if not openai_client:
@@ -191,24 +720,116 @@ def main():
 
     # Detect vector store ID with proper error handling
     try:
-        VECTOR_STORE_ID = detect_vector_store_id()
-        logger.info(f"Using vector store: {VECTOR_STORE_ID}")
+        if FEDERATE_STORES or os.getenv("VECTOR_STORE_IDS"):
+            VECTOR_STORE_IDS = detect_vector_store_ids()
+            VECTOR_STORE_ID = VECTOR_STORE_IDS[0]
+        else:
+            VECTOR_STORE_ID = detect_vector_store_id()
+            VECTOR_STORE_IDS = [VECTOR_STORE_ID]
+        logger.info(f"Using vector store(s): {', '.join(VECTOR_STORE_IDS)}")
     except ValueError as e:
         logger.error(f"Vector store detection failed: {e}")
         raise
 
-    # Create the MCP server
-    server = create_server()
+
+def create_app(
+    server: FastMCP | None = None, transport: str | None = None
+) -> Starlette:
+    """
+    Build the ASGI app serving the MCP server over the configured transports.
+
+    Streamable HTTP is served statelessly (every request is self-contained),
+    so any worker process can answer any request.
+
+    Args:
+        server: MCP server (defaults to create_server())
+        transport: "sse", "streamable-http" or "both" (defaults to MCP_TRANSPORT)
+
+    Returns:
+        Starlette: App with the transport endpoints plus /stats, /metrics,
+        /healthz and /readyz
+    """
+    if server is None:
+        server = create_server()
+    transport = transport or SERVER_TRANSPORT
+
+    if transport == "sse":
+        return server.http_app(transport="sse")
+
+    streamable_app = server.http_app(path=STREAMABLE_HTTP_PATH, stateless_http=True)
+    if transport == "streamable-http":
+        return streamable_app
+    if transport != "both":
+        raise ValueError(
+            f"Unknown MCP_TRANSPORT '{transport}' "
+            "(use 'sse', 'streamable-http' or 'both')"
+        )
+
+    # Serve /sse next to the streamable endpoint; custom routes appear in both
+    sse_app = server.http_app(transport="sse")
+    routes = list(streamable_app.routes)
+    routes += [route for route in sse_app.routes if route not in routes]
+    return create_base_app(
+        routes=routes, middleware=[], lifespan=streamable_app.lifespan
+    )
+
+
+def create_worker_app() -> Starlette:
+    """App factory run by each uvicorn worker process."""
+    # Workers start from a fresh interpreter; the parent exported
+    # VECTOR_STORE_ID(S), so detection here is a plain environment lookup
+    configure_backend()
+    return create_app()
+
+
+def main():
+    """Main function to start the MCP server."""
+    configure_backend()
+
+    if SERVER_WORKERS > 1 and SERVER_TRANSPORT != "streamable-http":
+        raise ValueError(
+            "SSE sessions are bound to the worker that opened them; "
+            "set MCP_TRANSPORT=streamable-http to run multiple workers"
+        )
 
     # Start server
-    logger.info("Starting MCP server...")
+    logger.info(
+        f"Starting MCP server on {SERVER_HOST}:{SERVER_PORT} "
+        f"({SERVER_TRANSPORT}, {SERVER_WORKERS} worker(s))..."
+    )
 
     try:
-        # Use direct SSE app method for FastMCP 2.2.0 compatibility on port 8001
         import uvicorn
 
-        app = server.sse_app()
-        uvicorn.run(app, host="127.0.0.1", port=8001)
+        if SERVER_WORKERS > 1:
+            # Hand the detected store and a shared metrics directory to the
+            # workers, and build the local index once so they only read it
+            if VECTOR_STORE_ID:
+                os.environ["VECTOR_STORE_ID"] = VECTOR_STORE_ID
+            if len(VECTOR_STORE_IDS) > 1:
+                os.environ["VECTOR_STORE_IDS"] = ",".join(VECTOR_STORE_IDS)
+            os.environ.setdefault(
+                "PROMETHEUS_MULTIPROC_DIR", tempfile.mkdtemp(prefix="mcp-metrics-")
+            )
+            if MCP_BACKEND == "local":
+                create_backend()
+
+            uvicorn.run(
+                "server:create_worker_app",
+                factory=True,
+                app_dir=str(Path(__file__).resolve().parent),
+                host=SERVER_HOST,
+                port=SERVER_PORT,
+                workers=SERVER_WORKERS,
+                timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_TIMEOUT,
+            )
+        else:
+            uvicorn.run(
+                create_app(),
+                host=SERVER_HOST,
+                port=SERVER_PORT,
+                timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_TIMEOUT,
+            )
     except KeyboardInterrupt:
         logger.info("Server stopped by user")
     except Exception as e:
@@ -4,22 +4,60 @@ Vector Store ID Detection Utilities
 
 Handles automatic detection of OpenAI vector store IDs from Agency Swarm
 created files_vs_* folders or environment variables.
+
+Folder discovery is a depth-bounded walk that skips dependency, VCS and
+output directories, and its result is cached in a manifest that is reused
+until the discovered folders or any directory the walk searched change.
 """
 
-import glob
+import json
 import logging
 import os
 import re
+from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Directories searched in order for files_vs_* folders: the working directory
+# (project root) and, if it has none, its parent (covers running from mcp/)
+DISCOVERY_ROOTS = (".", "..")
+
+# Directories more than this many levels below a root are not searched
+DISCOVERY_MAX_DEPTH = int(os.getenv("VECTOR_STORE_DISCOVERY_MAX_DEPTH", "4"))
+
+# Directory names never descended into (hidden directories are skipped too)
+DISCOVERY_SKIP_DIRS = frozenset(
+    {
+        "node_modules",
+        "reports",
+        "__pycache__",
+        "venv",
+        "env",
+        "site-packages",
+        "dist",
+        "build",
+        *filter(None, os.getenv("VECTOR_STORE_DISCOVERY_SKIP", "").split(",")),
+    }
+)
 
-def detect_vector_store_id():
+# Cached discovery result (empty string disables the manifest)
+DEFAULT_MANIFEST_PATH = (
+    Path(__file__).resolve().parent.parent / ".mcp_index" / "vector_store.json"
+)
+MANIFEST_PATH = os.getenv("VECTOR_STORE_MANIFEST", str(DEFAULT_MANIFEST_PATH))
+
+
+def detect_vector_store_id(manifest_path: str | Path | None = None):
     """
     Detect vector store ID using priority order:
     1. VECTOR_STORE_ID environment variable (highest priority)
-    2. Auto-detect from files_vs_* folders in agency directories
-    3. Error if none found
+    2. Cached manifest from a previous discovery, if still valid
+    3. Auto-detect from files_vs_* folders in agency directories
+    4. Error if none found
+
+    Args:
+        manifest_path: Manifest file (defaults to VECTOR_STORE_MANIFEST;
+            empty to disable caching)
 
     Returns:
         str: Vector store ID (e.g., "vs_123abc456def")
@@ -33,46 +71,192 @@ def detect_vector_store_id():
         logger.info(f"Using vector store ID from environment: {env_vector_store_id}")
         return env_vector_store_id
 
-    # Priority 2: Auto-detect from files_vs_* folders
-    vs_folders = _find_vector_store_folders()
+    vector_store_ids = _discover_vector_store_ids(manifest_path)
+    if len(vector_store_ids) > 1:
+        logger.warning(f"Multiple vector stores found: {vector_store_ids}")
+        logger.info(f"Using most recently modified: {vector_store_ids[0]}")
+    return vector_store_ids[0]
+
+
+def detect_vector_store_ids(manifest_path: str | Path | None = None) -> list[str]:
+    """
+    Detect every vector store to search, for federated search.
+
+    Uses the comma-separated VECTOR_STORE_IDS environment variable, then
+    VECTOR_STORE_ID, then all discovered files_vs_* folders.
+
+    Args:
+        manifest_path: Manifest file (defaults to VECTOR_STORE_MANIFEST;
+            empty to disable caching)
+
+    Returns:
+        list: Vector store IDs, most recently modified first when discovered
+
+    Raises:
+        ValueError: If no vector store configuration is found
+    """
+    env_vector_store_ids = [
+        store_id.strip()
+        for store_id in os.getenv("VECTOR_STORE_IDS", "").split(",")
+        if store_id.strip()
+    ]
+    if env_vector_store_ids:
+        logger.info(f"Using vector store IDs from environment: {env_vector_store_ids}")
+        return env_vector_store_ids
+
+    env_vector_store_id = os.getenv("VECTOR_STORE_ID", "")
+    if env_vector_store_id:
+        logger.info(f"Using vector store ID from environment: {env_vector_store_id}")
+        return [env_vector_store_id]
+
+    vector_store_ids = _discover_vector_store_ids(manifest_path)
+    logger.info(f"Using vector stores: {vector_store_ids}")
+    return vector_store_ids
+
+
+def _discover_vector_store_ids(manifest_path: str | Path | None) -> list[str]:
+    """Find store IDs from the manifest or files_vs_* folders, newest first."""
+    if manifest_path is None:
+        manifest_path = MANIFEST_PATH
+    roots = [os.path.realpath(root) for root in DISCOVERY_ROOTS]
+
+    # Manifest from a previous discovery
+    cached_ids = _read_manifest(manifest_path, roots) if manifest_path else None
+    if cached_ids:
+        logger.info(f"Using vector store IDs from discovery manifest: {cached_ids}")
+        return cached_ids
+
+    # Auto-detect from files_vs_* folders, searching the parent only when
+    # the working directory has none (e.g. running from mcp/)
+    vs_folders = []
+    walked = set()
+    for root in roots:
+        vs_folders = _find_vector_store_folders([root], walked=walked)
+        if vs_folders:
+            break
 
     if not vs_folders:
         _raise_no_vector_store_error()
 
-    # Handle multiple vector stores
-    if len(vs_folders) > 1:
-        logger.warning(f"Multiple vector stores found: {vs_folders}")
-        # Use the most recently modified one
-        latest_folder = max(vs_folders, key=lambda x: os.path.getmtime(x))
-        logger.info(f"Using most recently modified: {latest_folder}")
-        vs_folder = latest_folder
-    else:
-        vs_folder = vs_folders[0]
-        logger.info(f"Found vector store folder: {vs_folder}")
+    if len(vs_folders) == 1:
+        logger.info(f"Found vector store folder: {vs_folders[0]}")
 
-    # Extract vector store ID from folder name
-    return _extract_vector_store_id_from_folder(vs_folder)
+    # Extract vector store IDs from folder names, most recently modified first
+    vector_store_ids = []
+    for vs_folder in sorted(vs_folders, key=os.path.getmtime, reverse=True):
+        vector_store_id = _extract_vector_store_id_from_folder(vs_folder)
+        if vector_store_id not in vector_store_ids:
+            vector_store_ids.append(vector_store_id)
+    if manifest_path:
+        _write_manifest(manifest_path, roots, walked, vs_folders, vector_store_ids)
+    return vector_store_ids
 
 
-def _find_vector_store_folders():
+def _find_vector_store_folders(
+    roots=DISCOVERY_ROOTS,
+    max_depth: int = DISCOVERY_MAX_DEPTH,
+    skip_dirs=DISCOVERY_SKIP_DIRS,
+    walked: set[str] | None = None,
+):
     """
     Search for files_vs_* folders in project directories.
 
+    Walks each root down to max_depth levels, without following
+    symlinks, skipping hidden directories and any name in skip_dirs.
+    Directories reachable from several roots are only walked once.
+
+    Args:
+        roots: Directories to search
+        max_depth: Maximum directory depth below each root
+        skip_dirs: Directory names that are never descended into
+        walked: Collects the real path of every directory searched, if given
+
     Returns:
-        list: List of found vector store folder paths
+        list: Sorted real paths of the vector store folders found
     """
-    # Search for files_vs_* folders from project root (handles both direct and mcp/ execution)
-    search_patterns = [
-        "**/files_vs_*",  # Current directory and subdirectories
-        "../**/files_vs_*",  # Parent directory and subdirectories (for mcp/ execution)
-    ]
+    found = set()
+    visited = set()
+    for root in roots:
+        stack = [(root, 0)]
+        while stack:
+            directory, depth = stack.pop()
+            real_directory = os.path.realpath(directory)
+            if real_directory in visited:
+                continue
+            visited.add(real_directory)
+
+            try:
+                with os.scandir(directory) as entries:
+                    subdirectories = [
+                        entry
+                        for entry in entries
+                        if entry.is_dir(follow_symlinks=False)
+                    ]
+            except OSError:
+                continue
+            if walked is not None:
+                walked.add(real_directory)
+
+            for entry in subdirectories:
+                if entry.name.startswith("files_vs_"):
+                    found.add(os.path.realpath(entry.path))
+                elif (
+                    depth < max_depth
+                    and not entry.name.startswith(".")
+                    and entry.name not in skip_dirs
+                ):
+                    stack.append((entry.path, depth + 1))
+
+    return sorted(found)
+
+
+def _watched_directories(walked, vs_folders) -> list[str]:
+    # A new or renamed folder changes its parent's mtime, anywhere in the
+    # walk, and a store folder's own mtime decides its place in the order
+    return sorted({*walked, *vs_folders})
+
+
+def _read_manifest(manifest_path, roots) -> list[str] | None:
+    """
+    Return the cached vector store IDs if the manifest is still valid.
+
+    The manifest is valid for the same search roots while every recorded
+    folder still exists and no directory the walk searched, nor any store
+    folder it found, has a changed mtime.
+    """
+    try:
+        manifest = json.loads(Path(manifest_path).read_text(encoding="utf-8"))
+        if manifest["roots"] != roots:
+            return None
+        if not all(os.path.isdir(folder) for folder in manifest["folders"]):
+            return None
+        for directory, mtime in manifest["mtimes"].items():
+            if os.path.getmtime(directory) != mtime:
+                return None
+        return manifest["vector_store_ids"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
 
-    vs_folders = []
-    for pattern in search_patterns:
-        vs_folders.extend(glob.glob(pattern, recursive=True))
 
-    # Remove duplicates (can happen with overlapping patterns)
-    return list(set(vs_folders))
+def _write_manifest(manifest_path, roots, walked, vs_folders, vector_store_ids):
+    manifest_path = Path(manifest_path)
+    try:
+        # Create the directory first: it may sit in a watched directory
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            "vector_store_ids": vector_store_ids,
+            "roots": roots,
+            "folders": vs_folders,
+            "mtimes": {
+                directory: os.path.getmtime(directory)
+                for directory in _watched_directories(walked, vs_folders)
+            },
+        }
+        tmp_path = manifest_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        os.replace(tmp_path, manifest_path)
+    except OSError as e:
+        logger.warning(f"Could not write vector store manifest {manifest_path}: {e}")
 
 
 def _extract_vector_store_id_from_folder(vs_folder):
@@ -3,6 +3,9 @@
 Test Qloo API Integration
 
 Quick test to verify the QlooInsightsTool is working correctly.
+
+Run with --mock to test the tool offline against the local fake Qloo API
+(agents/fake_qloo.py) instead of the real API; the agency test is skipped.
 """
 
 import asyncio
@@ -10,8 +13,10 @@ import os
 import sys
 from pathlib import Path
 
-# Add project root to Python path
+# Add project root and the agents directory (the tool's modules import each
+# other by name) to Python path
 sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent / "agents"))
 
 from dotenv import load_dotenv
 
@@ -41,7 +46,7 @@ async def test_qloo_tool():
         print(f"🏷️ Tags: {tool.tags}")
         print("-" * 50)
 
-        result = tool.run()
+        result = await tool.run()
         print("🤖 Qloo API Response:")
         print(result)
         print("=" * 50)
@@ -103,7 +108,7 @@ async def test_agency_with_qloo():
         return False
 
 
-async def main():
+async def main(mock: bool = False):
     """Run all Qloo integration tests"""
     print("🚀 Testing Qloo API Integration for Deep Research Agency")
     print("🎯 Preparing for Qloo LLM Hackathon submission")
@@ -116,6 +121,12 @@ async def main():
         print("   QLOO_API_KEY=your_qloo_api_key_here")
         return
 
+    if mock:
+        print("🧪 Using the local fake Qloo API (--mock)")
+        tool_success = await test_qloo_tool()
+        print(f"\n✅ Qloo Tool (mock): {'PASS' if tool_success else 'FAIL'}")
+        return
+
     try:
         # Test 1: Direct tool test
         tool_success = await test_qloo_tool()
@@ -145,4 +156,13 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    if "--mock" in sys.argv:
+        from fake_qloo import FakeQlooServer, QlooBehavior, create_fake_qloo_app
+
+        app = create_fake_qloo_app(behavior=QlooBehavior(latency=0.05, jitter=0.3))
+        with FakeQlooServer(app) as server:
+            os.environ["QLOO_API_URL"] = server.base_url
+            os.environ["QLOO_API_KEY"] = "test"
+            asyncio.run(main(mock=True))
+    else:
+        asyncio.run(main())
\ No newline at end of file
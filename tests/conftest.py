@@ -0,0 +1,30 @@
+"""
+Shared test setup.
+
+Modules in mcp/ and agents/ import their neighbours by module name, as they
+do when the server and the agencies run, so both directories go on the path.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+project_root = Path(__file__).parent.parent
+for directory in ("agents", "mcp"):
+    sys.path.insert(0, str(project_root / directory))
+
+
+class FakeClock:
+    """Time source that only moves when a test sets or advances now."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
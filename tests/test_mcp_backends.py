@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Tests for the MCP server retrieval backends.
+
+Runs fully offline against the local vector index backend.
+"""
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from backends import (
+    FederatedVectorStoreBackend,
+    HashingEmbedder,
+    LocalVectorIndexBackend,
+    OpenAIVectorStoreBackend,
+    VectorStoreBackend,
+    chunk_text,
+)
+from caching import TTLCache
+from fake_vector_store import (
+    DEFAULT_VECTOR_STORE_ID,
+    FakeCorpus,
+    FakeUpstreamServer,
+    create_fake_upstream_app,
+)
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+from filters import to_openai_filter
+from server import aggregate_hits, create_openai_client, create_server
+
+
+def _write_corpus(directory: Path):
+    directory.mkdir()
+    (directory / "company.txt").write_text(
+        "TechCorp Solutions reported revenue of $50M and sells the Nimbus platform."
+    )
+    (directory / "market.md").write_text(
+        "# Market\nThe AI industry size reached $190B in 2024 with strong growth."
+    )
+    (directory / "image.png").write_bytes(b"\x89PNG")
+
+
+def test_chunk_text_covers_document():
+    text = " ".join(f"word{i}" for i in range(500))
+    spans = chunk_text(text, chunk_size=200, overlap=50)
+    assert spans[0][0] == 0
+    assert spans[-1][1] == len(text)
+    assert all(end - start <= 200 for start, end in spans)
+
+
+def test_hashing_embedder_is_normalized():
+    matrix = HashingEmbedder(dim=64).embed(["hello world", ""])
+    assert matrix.shape == (2, 64)
+    assert abs(float((matrix[0] ** 2).sum()) - 1.0) < 1e-5
+    assert float(abs(matrix[1]).sum()) == 0.0
+
+
+def test_local_backend_search_and_fetch(tmp_path):
+    corpus = tmp_path / "files"
+    _write_corpus(corpus)
+    backend = LocalVectorIndexBackend(corpus, index_dir=tmp_path / "index").load()
+
+    assert len(backend.documents) == 2
+    hits = asyncio.run(backend.search("TechCorp revenue"))
+    assert hits[0]["title"] == "company.txt"
+    assert hits[0]["score"] >= hits[-1]["score"]
+
+    document = asyncio.run(backend.fetch(hits[0]["id"]))
+    assert "Nimbus" in document["text"]
+    assert document["metadata"] == {"path": "company.txt"}
+
+
+def test_local_index_is_reused_until_corpus_changes(tmp_path):
+    corpus = tmp_path / "files"
+    _write_corpus(corpus)
+    index_dir = tmp_path / "index"
+    first = LocalVectorIndexBackend(corpus, index_dir=index_dir).load()
+    manifest_mtime = (index_dir / "manifest.json").stat().st_mtime_ns
+
+    second = LocalVectorIndexBackend(corpus, index_dir=index_dir).load()
+    assert second.fingerprint == first.fingerprint
+    assert (index_dir / "manifest.json").stat().st_mtime_ns == manifest_mtime
+
+    (corpus / "new.txt").write_text("Quarterly forecast for the Nimbus platform.")
+    third = LocalVectorIndexBackend(corpus, index_dir=index_dir).load()
+    assert third.fingerprint != first.fingerprint
+    assert len(third.documents) == 3
+
+
+def test_server_tools_with_local_backend(tmp_path):
+    corpus = tmp_path / "files"
+    _write_corpus(corpus)
+    backend = LocalVectorIndexBackend(corpus, index_dir=tmp_path / "index").load()
+    server = create_server(backend)
+
+    async def run():
+        async with Client(server) as client:
+            search = await client.call_tool("search", {"query": "AI industry size"})
+            results = json.loads(search[0].text)["results"]
+            fetch = await client.call_tool("fetch", {"id": results[0]["id"]})
+            missing = await client.call_tool("fetch", {"id": "local-missing"})
+            return results, json.loads(fetch[0].text), json.loads(missing[0].text)
+
+    results, document, missing = asyncio.run(run())
+    assert results[0]["title"] == "market.md"
+    assert "$190B" in document["text"]
+    assert missing["title"].startswith("Error retrieving document")
+
+
+def test_filters_translate_to_openai_format():
+    assert to_openai_filter(None) is None
+    assert to_openai_filter({"filename": "a.md"}) == {
+        "key": "filename",
+        "type": "eq",
+        "value": "a.md",
+    }
+    assert to_openai_filter({"team": ["x", "y"], "year": {"gte": 2023}}) == {
+        "type": "and",
+        "filters": [
+            {"key": "team", "type": "in", "value": ["x", "y"]},
+            {"key": "year", "type": "gte", "value": 2023},
+        ],
+    }
+    with pytest.raises(ValueError, match="Unknown filter operator"):
+        to_openai_filter({"year": {"after": 2023}})
+
+
+def test_local_search_applies_limits_filters_and_threshold_in_the_index(tmp_path):
+    corpus = tmp_path / "files"
+    _write_corpus(corpus)
+    (corpus / "reports").mkdir()
+    (corpus / "reports" / "q3.txt").write_text("TechCorp revenue grew in Q3.")
+    backend = LocalVectorIndexBackend(corpus, index_dir=tmp_path / "index").load()
+
+    def titles(**options):
+        return [
+            hit["title"]
+            for hit in asyncio.run(backend.search("TechCorp revenue", **options))
+        ]
+
+    assert len(titles()) == 3
+    assert len(titles(max_results=1)) == 1
+    assert titles(filters={"filename": "q3.txt"}) == ["q3.txt"]
+    assert set(titles(filters={"path": {"nin": ["reports/q3.txt"]}})) == {
+        "company.txt",
+        "market.md",
+    }
+    assert titles(filters={"filename": "missing.txt"}) == []
+
+    vector_only = LocalVectorIndexBackend(
+        corpus, index_dir=tmp_path / "index", hybrid=False
+    ).load()
+    scores = [
+        hit["score"] for hit in asyncio.run(vector_only.search("TechCorp revenue"))
+    ]
+    strong = asyncio.run(
+        vector_only.search("TechCorp revenue", score_threshold=scores[1])
+    )
+    assert [hit["score"] for hit in strong] == scores[:2]
+
+
+def test_search_options_are_pushed_to_the_upstream():
+    corpus = FakeCorpus(
+        {
+            f"{team}_{i}.txt": f"TechCorp revenue report {i} for the {team} team"
+            for team in ("sales", "research")
+            for i in range(8)
+        }
+    )
+    for file_id, filename in corpus.filenames.items():
+        corpus.attributes[file_id]["team"] = filename.split("_")[0]
+    app = create_fake_upstream_app(corpus, latency=0)
+
+    async def run(base_url: str):
+        client = create_openai_client(api_key="test", base_url=base_url)
+        server = create_server(
+            OpenAIVectorStoreBackend(client, DEFAULT_VECTOR_STORE_ID)
+        )
+        async with Client(server) as mcp_client:
+            everything = await mcp_client.call_tool(
+                "search", {"query": "TechCorp revenue"}
+            )
+            filtered = await mcp_client.call_tool(
+                "search",
+                {
+                    "query": "TechCorp revenue",
+                    "max_results": 3,
+                    "filters": {"team": "research"},
+                    "score_threshold": 0.5,
+                },
+            )
+            with pytest.raises(ToolError, match="max_results"):
+                await mcp_client.call_tool("search", {"query": "x", "max_results": 500})
+            return (
+                json.loads(everything[0].text)["results"],
+                json.loads(filtered[0].text)["results"],
+            )
+
+    with FakeUpstreamServer(app) as upstream:
+        everything, filtered = asyncio.run(run(upstream.base_url))
+
+    assert len(everything) == 10
+    assert len(filtered) == 3
+    assert all(hit["title"].startswith("research_") for hit in filtered)
+
+
+def test_search_results_are_one_per_file():
+    hits = [
+        {"id": "f1", "title": "a", "text": "best chunk", "score": 0.9, "url": "u1"},
+        {"id": "f2", "title": "b", "text": "other file", "score": 0.8, "url": "u2"},
+        {"id": "f1", "title": "a", "text": "second  chunk", "score": 0.7, "url": "u1"},
+        {"id": "f1", "title": "a", "text": "third chunk", "score": 0.6, "url": "u1"},
+    ]
+    results = aggregate_hits(hits, max_snippets=2, snippet_chars=200)
+
+    assert [(r["id"], r["score"], r["chunks"]) for r in results] == [
+        ("f1", 0.9, 3),
+        ("f2", 0.8, 1),
+    ]
+    assert results[0]["text"] == "best chunk [...] second chunk"
+
+
+def test_aggregated_search_saves_downstream_fetches():
+    # Three long files, each with several chunks that match the query
+    corpus = FakeCorpus(
+        {
+            f"report_{i}.txt": "TechCorp revenue analysis. " * 40
+            + "Unrelated appendix. " * 200
+            for i in range(3)
+        },
+        chunk_size=300,
+    )
+    app = create_fake_upstream_app(corpus, latency=0)
+
+    async def run(base_url: str) -> tuple[int, int]:
+        client = create_openai_client(api_key="test", base_url=base_url)
+        backend = OpenAIVectorStoreBackend(client, DEFAULT_VECTOR_STORE_ID)
+        chunk_hits = await backend.search("TechCorp revenue")
+        server = create_server(
+            backend,
+            document_cache=TTLCache(max_bytes=0, ttl=60),
+            search_cache=TTLCache(max_bytes=0, ttl=60),
+        )
+        async with Client(server) as mcp_client:
+            response = await mcp_client.call_tool(
+                "search", {"query": "TechCorp revenue"}
+            )
+            results = json.loads(response[0].text)["results"]
+            # An agent reads every search result it gets back
+            for result in results:
+                await mcp_client.call_tool("fetch", {"id": result["id"]})
+        return len(chunk_hits), results
+
+    with FakeUpstreamServer(app) as upstream:
+        chunk_count, results = asyncio.run(run(upstream.base_url))
+
+    assert chunk_count == 10
+    assert len(results) == len({r["id"] for r in results}) == 3
+    assert sum(r["chunks"] for r in results) == 10
+    # One fetch per document instead of one per chunk hit
+    assert app.state.calls["content"] == 3 < chunk_count
+
+
+def test_max_results_counts_documents_not_chunks():
+    corpus = FakeCorpus(
+        {
+            f"report_{i}.txt": "TechCorp revenue analysis. " * 40
+            + "Unrelated appendix. " * 200
+            for i in range(5)
+        },
+        chunk_size=300,
+    )
+    app = create_fake_upstream_app(corpus, latency=0)
+
+    async def run(base_url: str) -> list[list[dict]]:
+        client = create_openai_client(api_key="test", base_url=base_url)
+        server = create_server(
+            OpenAIVectorStoreBackend(client, DEFAULT_VECTOR_STORE_ID)
+        )
+        async with Client(server) as mcp_client:
+            single = await mcp_client.call_tool(
+                "search", {"query": "TechCorp revenue", "max_results": 3}
+            )
+            batch = await mcp_client.call_tool(
+                "search_many", {"queries": ["TechCorp revenue"], "max_results": 3}
+            )
+        return [
+            json.loads(single[0].text)["results"],
+            json.loads(batch[0].text)["results"][0]["results"],
+        ]
+
+    with FakeUpstreamServer(app) as upstream:
+        for results in asyncio.run(run(upstream.base_url)):
+            # Every file has several matching chunks, yet three files come back
+            assert len({result["id"] for result in results}) == len(results) == 3
+
+
+class StaticStore(VectorStoreBackend):
+    """Fake store returning fixed hits and counting fetches."""
+
+    def __init__(self, store_id: str, scores: dict[str, float], fail: bool = False):
+        self._store_id = store_id
+        self.scores = scores
+        self.fail = fail
+        self.fetches = []
+
+    @property
+    def store_id(self) -> str:
+        return self._store_id
+
+    async def search(self, query: str) -> list[dict]:
+        if self.fail:
+            raise RuntimeError("store unavailable")
+        return [
+            {"id": file_id, "title": file_id, "text": "", "score": score, "url": ""}
+            for file_id, score in self.scores.items()
+        ]
+
+    async def fetch(self, file_id: str) -> dict:
+        self.fetches.append(file_id)
+        if file_id not in self.scores:
+            raise ValueError(f"No file found with id '{file_id}'")
+        return {"id": file_id, "title": file_id, "text": self.store_id, "url": ""}
+
+
+def test_federated_search_merges_stores_and_routes_fetches():
+    sales = StaticStore("vs_sales", {"file-s1": 0.9, "file-s2": 0.5})
+    research = StaticStore("vs_research", {"file-r1": 0.4, "file-r2": 0.3})
+    backend = FederatedVectorStoreBackend([sales, research])
+
+    hits = asyncio.run(backend.search("revenue"))
+    assert [hit["id"] for hit in hits] == [
+        "vs_sales/file-s1",
+        "vs_research/file-r1",
+        "vs_sales/file-s2",
+        "vs_research/file-r2",
+    ]
+    assert [hit["score"] for hit in hits] == [0.9, 0.4, 0.5, 0.3]
+
+    # The ID names its store, so a new process routes it without a search
+    restarted = FederatedVectorStoreBackend([sales, research])
+    document = asyncio.run(restarted.fetch("vs_research/file-r2"))
+    assert document["text"] == "vs_research"
+    assert document["id"] == "vs_research/file-r2"
+    assert sales.fetches == [] and research.fetches == ["file-r2"]
+
+    with pytest.raises(ValueError, match="federated IDs look like"):
+        asyncio.run(restarted.fetch("file-r2"))
+    assert sales.fetches == [] and research.fetches == ["file-r2"]
+
+
+def test_federated_score_fusion_normalizes_each_store():
+    # Raw scores differ in scale; after min-max normalization both tops tie
+    low = StaticStore("vs_low", {"file-l1": 0.2, "file-l2": 0.1})
+    high = StaticStore("vs_high", {"file-h1": 0.9, "file-h2": 0.8, "file-h3": 0.85})
+    backend = FederatedVectorStoreBackend([low, high], fusion="score")
+
+    hits = asyncio.run(backend.search("query"))
+    assert [hit["id"] for hit in hits[:3]] == [
+        "vs_low/file-l1",
+        "vs_high/file-h1",
+        "vs_high/file-h3",
+    ]
+    # Each hit keeps the score its store gave it
+    assert [hit["score"] for hit in hits[:3]] == [0.2, 0.9, 0.85]
+
+
+def test_federated_search_tolerates_a_failing_store():
+    healthy = StaticStore("vs_ok", {"file-1": 0.5})
+    backend = FederatedVectorStoreBackend(
+        [StaticStore("vs_down", {}, fail=True), healthy]
+    )
+    assert [hit["id"] for hit in asyncio.run(backend.search("q"))] == ["vs_ok/file-1"]
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(
+            FederatedVectorStoreBackend([StaticStore("vs_down", {}, fail=True)]).search(
+                "q"
+            )
+        )
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Tests for the MCP server's result caches.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+import server
+from backends import OpenAIVectorStoreBackend, VectorStoreBackend
+from caching import (
+    PersistentCacheStore,
+    StoreVersionWatcher,
+    TTLCache,
+    normalize_query,
+)
+from fake_vector_store import (
+    DEFAULT_VECTOR_STORE_ID,
+    FakeCorpus,
+    FakeUpstreamServer,
+    create_fake_upstream_app,
+)
+from fastmcp import Client
+from starlette.testclient import TestClient
+
+UPSTREAM_LATENCY = 0.2
+BACKEND_LATENCY = 1.0
+
+
+def test_cache_evicts_least_recently_used_by_bytes():
+    cache = TTLCache(max_bytes=100, ttl=60)
+    cache.set("a", "x", size=40)
+    cache.set("b", "y", size=40)
+    assert cache.get("a").value == "x"  # "a" becomes most recently used
+
+    cache.set("c", "z", size=40)
+
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert cache.total_bytes == 80
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_skips_values_larger_than_capacity():
+    cache = TTLCache(max_bytes=10, ttl=60)
+    cache.set("big", "x" * 100)
+    assert len(cache) == 0
+
+
+def test_cache_entries_and_errors_expire(clock):
+    cache = TTLCache(max_bytes=1000, ttl=10, error_ttl=2, clock=clock)
+    cache.set("doc", {"text": "hello"})
+    cache.set_error("bad", ValueError("not found"))
+
+    assert cache.get("bad").error is not None
+    clock.now = 3
+    assert cache.get("bad") is None
+    assert cache.get("doc").value == {"text": "hello"}
+    clock.now = 11
+    assert cache.get("doc") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["negative_hits"], stats["expirations"]) == (1, 1, 2)
+
+
+def test_get_or_load_caches_failures():
+    cache = TTLCache(max_bytes=1000, ttl=10, error_ttl=10)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        raise ValueError("No file found")
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            asyncio.run(cache.get_or_load("bad", loader))
+    assert len(calls) == 1
+
+
+class CountingBackend(VectorStoreBackend):
+    """Fake backend that records how often it is called."""
+
+    name = "counting"
+    store_id = "counting"
+
+    def __init__(self, version: str | None = None):
+        self.calls = {"search": 0, "fetch": 0}
+        self.version = version
+
+    async def store_version(self) -> str | None:
+        return self.version
+
+    async def search(self, query: str) -> list[dict]:
+        self.calls["search"] += 1
+        await asyncio.sleep(BACKEND_LATENCY)
+        return [{"id": "doc-1", "title": "doc", "text": query, "url": "u"}]
+
+    async def fetch(self, file_id: str) -> dict:
+        self.calls["fetch"] += 1
+        await asyncio.sleep(BACKEND_LATENCY)
+        return {"id": file_id, "title": "doc", "text": "body", "url": "u"}
+
+
+def test_identical_concurrent_calls_are_coalesced():
+    backend = CountingBackend()
+    # Caching disabled: only single-flight can deduplicate these calls
+    search_cache = TTLCache(max_bytes=0, ttl=60)
+    document_cache = TTLCache(max_bytes=0, ttl=60)
+    mcp = server.create_server(
+        backend, document_cache=document_cache, search_cache=search_cache
+    )
+
+    async def run():
+        async with Client(mcp) as client:
+            return await asyncio.gather(
+                *(
+                    client.call_tool("search", {"query": "TechCorp"})
+                    for _ in range(100)
+                ),
+                *(client.call_tool("fetch", {"id": "doc-1"}) for _ in range(100)),
+            )
+
+    responses = asyncio.run(run())
+
+    assert len({response[0].text for response in responses[:100]}) == 1
+    assert backend.calls == {"search": 1, "fetch": 1}
+    assert search_cache.stats()["coalesced"] == 99
+    assert document_cache.stats()["coalesced"] == 99
+
+
+def test_coalesced_load_survives_cancelled_caller():
+    cache = TTLCache(max_bytes=1000, ttl=10)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "value"
+
+    async def run():
+        first = asyncio.create_task(cache.get_or_load("key", loader))
+        second = asyncio.create_task(cache.get_or_load("key", loader))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "value"
+    assert len(calls) == 1
+
+
+@pytest.fixture
+def upstream():
+    corpus = FakeCorpus({"company.txt": "TechCorp Solutions revenue and products"})
+    app = create_fake_upstream_app(corpus, latency=UPSTREAM_LATENCY)
+    with FakeUpstreamServer(app) as running:
+        yield running, app.state.calls
+
+
+def test_fetch_is_parallel_and_cached(upstream):
+    running, calls = upstream
+    client = server.create_openai_client(api_key="test", base_url=running.base_url)
+    mcp = server.create_server(
+        OpenAIVectorStoreBackend(client, DEFAULT_VECTOR_STORE_ID)
+    )
+
+    async def run():
+        async with Client(mcp) as mcp_client:
+            start = time.perf_counter()
+            first = await mcp_client.call_tool("fetch", {"id": "file-fake000000"})
+            first_elapsed = time.perf_counter() - start
+            for _ in range(5):
+                await mcp_client.call_tool("fetch", {"id": "file-fake000000"})
+            for _ in range(5):
+                await mcp_client.call_tool("fetch", {"id": "file-missing"})
+            return json.loads(first[0].text), first_elapsed
+
+    document, first_elapsed = asyncio.run(run())
+
+    assert "TechCorp" in document["text"]
+    # Content and metadata requests overlap instead of taking two latencies
+    assert first_elapsed < 1.8 * UPSTREAM_LATENCY
+    # One upstream round for the good ID and one for the bad ID
+    assert calls["content"] == 2
+    assert calls["retrieve"] == 2
+
+
+def test_normalize_query_ignores_case_whitespace_and_punctuation():
+    assert normalize_query("  TechCorp   REVENUE? ") == "techcorp revenue"
+    assert normalize_query("techcorp, revenue!") == "techcorp revenue"
+    assert normalize_query("AI market") != normalize_query("AI markets")
+
+
+class VersionedBackend:
+    name = "versioned"
+    store_id = "vs_versioned"
+
+    def __init__(self):
+        self.version = "v1"
+
+    async def store_version(self):
+        return self.version
+
+
+def test_store_version_watcher_clears_caches_on_change(clock):
+    cache = TTLCache(max_bytes=1000, ttl=600)
+    backend = VersionedBackend()
+    watcher = StoreVersionWatcher(backend, [cache], interval=60, clock=clock)
+
+    asyncio.run(watcher.check())
+    cache.set("query", ["result"])
+    backend.version = "v2"
+    asyncio.run(watcher.check())  # Within the interval: not checked yet
+    assert "query" in cache
+
+    clock.now = 61
+    asyncio.run(watcher.check())
+    assert "query" not in cache
+    assert watcher.invalidations == 1
+
+
+def test_persistent_store_expires_and_evicts_least_recently_used(tmp_path, clock):
+    store = PersistentCacheStore(
+        tmp_path / "cache.db", max_bytes=100, ttl=60, enforce_every=1, clock=clock
+    )
+    store.set("search", ("vs", "a"), "x" * 38)  # 40 bytes as JSON
+    clock.now = 1
+    store.set("search", ("vs", "b"), "y" * 38)
+    clock.now = 2
+    assert store.get("search", ("vs", "a")) == "x" * 38  # "a" is now most recent
+    store.set("search", ("vs", "c"), "z" * 38)
+
+    assert store.get("search", ("vs", "b")) is None
+    assert store.stats()["bytes"] == 80
+
+    clock.now = 100
+    assert store.get("search", ("vs", "a")) is None
+    store.enforce_limits()
+    assert store.stats()["entries"] == 0
+
+
+def test_restarted_server_is_prewarmed_from_disk(tmp_path):
+    path = tmp_path / "cache.db"
+
+    def start(backend):
+        store = PersistentCacheStore(path, max_bytes=1_000_000, ttl=3600)
+        document_cache = TTLCache(1_000_000, 600, store=store, namespace="document")
+        search_cache = TTLCache(1_000_000, 300, store=store, namespace="search")
+        mcp = server.create_server(
+            backend, document_cache=document_cache, search_cache=search_cache
+        )
+        return mcp, document_cache
+
+    async def research(mcp):
+        async with Client(mcp) as client:
+            await client.call_tool("search", {"query": "TechCorp"})
+            response = await client.call_tool("fetch", {"id": "doc-1"})
+            return json.loads(response[0].text)
+
+    first_backend = CountingBackend("v1")
+    first = asyncio.run(research(start(first_backend)[0]))
+    assert first_backend.calls == {"search": 1, "fetch": 1}
+
+    # A new process: empty memory, same database file
+    restarted_backend = CountingBackend("v1")
+    mcp, document_cache = start(restarted_backend)
+    assert asyncio.run(research(mcp)) == first
+    assert document_cache.stats()["prewarmed"] == 1
+    assert restarted_backend.calls == {"search": 0, "fetch": 0}
+
+    # The store changed while the server was down: nothing stale is served
+    changed_backend = CountingBackend("v2")
+    mcp, document_cache = start(changed_backend)
+    asyncio.run(research(mcp))
+    assert document_cache.stats()["prewarmed"] == 0
+    assert changed_backend.calls == {"search": 1, "fetch": 1}
+
+
+def test_persisted_entries_are_dropped_if_store_changed_while_down(tmp_path):
+    store = PersistentCacheStore(tmp_path / "cache.db", max_bytes=1000, ttl=600)
+    cache = TTLCache(max_bytes=1000, ttl=600, store=store, namespace="search")
+    backend = VersionedBackend()
+    asyncio.run(StoreVersionWatcher(backend, [cache], 60, store=store).check())
+    store.set("search", "query", ["result"])
+
+    backend.version = "v2"
+    watcher = StoreVersionWatcher(backend, [cache], 60, store=store)
+    asyncio.run(watcher.check())
+
+    assert store.get("search", "query") is None
+    assert watcher.invalidations == 1
+
+
+def test_equivalent_searches_are_served_from_cache(upstream):
+    running, calls = upstream
+    client = server.create_openai_client(api_key="test", base_url=running.base_url)
+    mcp = server.create_server(
+        OpenAIVectorStoreBackend(client, DEFAULT_VECTOR_STORE_ID)
+    )
+
+    async def run():
+        async with Client(mcp) as mcp_client:
+            responses = []
+            for query in [
+                "TechCorp revenue",
+                "techcorp   REVENUE?",
+                "TechCorp, revenue",
+            ]:
+                response = await mcp_client.call_tool("search", {"query": query})
+                responses.append(json.loads(response[0].text)["results"])
+            return responses
+
+    responses = asyncio.run(run())
+
+    assert responses[0] and responses[0] == responses[1] == responses[2]
+    assert calls["search"] == 1
+
+    stats = TestClient(mcp.http_app()).get("/stats").json()
+    assert stats["search_cache"]["hits"] == 2
+    assert stats["search_cache"]["misses"] == 1
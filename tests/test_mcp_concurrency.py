@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Concurrency tests for the MCP server's upstream calls.
+
+Drives the search tool against a local fake OpenAI upstream to check that
+parallel tool calls overlap on the event loop instead of serializing.
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+import server
+from backends import OpenAIVectorStoreBackend
+from fake_vector_store import (
+    DEFAULT_VECTOR_STORE_ID,
+    FakeCorpus,
+    FakeUpstreamServer,
+    create_fake_upstream_app,
+)
+from fastmcp import Client
+
+UPSTREAM_LATENCY = 0.3
+PARALLEL_SEARCHES = 20
+
+
+@pytest.fixture
+def upstream():
+    corpus = FakeCorpus({"company.txt": "TechCorp Solutions revenue and products"})
+    app = create_fake_upstream_app(corpus, latency=UPSTREAM_LATENCY)
+    with FakeUpstreamServer(app) as running:
+        yield running
+
+
+async def _parallel_searches(backend, count: int) -> tuple[float, list]:
+    mcp = server.create_server(backend)
+    async with Client(mcp) as client:
+        # Warm up the connection pool so the timing only measures searches
+        await client.call_tool("search", {"query": "TechCorp"})
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *(
+                client.call_tool("search", {"query": f"TechCorp revenue {i}"})
+                for i in range(count)
+            )
+        )
+        elapsed = time.perf_counter() - start
+        return elapsed, [json.loads(r[0].text)["results"] for r in responses]
+
+
+def test_parallel_searches_take_about_one_upstream_latency(upstream):
+    client = server.create_openai_client(api_key="test", base_url=upstream.base_url)
+    backend = OpenAIVectorStoreBackend(client, DEFAULT_VECTOR_STORE_ID)
+
+    elapsed, results = asyncio.run(_parallel_searches(backend, PARALLEL_SEARCHES))
+
+    assert all(result and result[0]["title"] == "company.txt" for result in results)
+    # Serialized calls would take PARALLEL_SEARCHES * UPSTREAM_LATENCY (6s)
+    assert elapsed < 3 * UPSTREAM_LATENCY
+
+
+def test_connection_pool_limit_bounds_concurrency(upstream, monkeypatch):
+    monkeypatch.setattr(server, "HTTP_MAX_CONNECTIONS", 1)
+    client = server.create_openai_client(api_key="test", base_url=upstream.base_url)
+    backend = OpenAIVectorStoreBackend(client, DEFAULT_VECTOR_STORE_ID)
+
+    elapsed, results = asyncio.run(_parallel_searches(backend, 4))
+
+    assert all(results)
+    assert elapsed >= 4 * UPSTREAM_LATENCY
+
+
+def test_batch_tools_fan_out_and_keep_order(upstream):
+    client = server.create_openai_client(api_key="test", base_url=upstream.base_url)
+    mcp = server.create_server(
+        OpenAIVectorStoreBackend(client, DEFAULT_VECTOR_STORE_ID)
+    )
+    queries = [f"TechCorp products {i}" for i in range(6)] + [""]
+    ids = ["file-fake000000", "file-missing", "file-fake000000"]
+
+    async def run():
+        async with Client(mcp) as mcp_client:
+            start = time.perf_counter()
+            searches = await mcp_client.call_tool("search_many", {"queries": queries})
+            elapsed = time.perf_counter() - start
+            documents = await mcp_client.call_tool("fetch_many", {"ids": ids})
+            return (
+                json.loads(searches[0].text)["results"],
+                json.loads(documents[0].text)["documents"],
+                elapsed,
+            )
+
+    searches, documents, elapsed = asyncio.run(run())
+
+    assert [item["query"] for item in searches] == queries
+    assert all(item["results"] and item["error"] is None for item in searches[:-1])
+    assert searches[-1]["results"] == []
+    assert elapsed < 3 * UPSTREAM_LATENCY
+
+    assert [item["id"] for item in documents] == ids
+    assert "TechCorp" in documents[0]["text"] and documents[0]["error"] is None
+    assert "No file found" in documents[1]["error"]
+    assert documents[2]["text"] == documents[0]["text"]
+
+
+def test_batch_tools_reject_oversized_batches(upstream, monkeypatch):
+    monkeypatch.setattr(server, "BATCH_MAX_ITEMS", 2)
+    client = server.create_openai_client(api_key="test", base_url=upstream.base_url)
+    mcp = server.create_server(
+        OpenAIVectorStoreBackend(client, DEFAULT_VECTOR_STORE_ID)
+    )
+
+    async def run():
+        async with Client(mcp) as mcp_client:
+            await mcp_client.call_tool("fetch_many", {"ids": ["a", "b", "c"]})
+
+    with pytest.raises(Exception, match="exceeds the limit"):
+        asyncio.run(run())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for the fake vector store upstream used by the load test harness.
+"""
+
+import asyncio
+import json
+import statistics
+
+import server
+from backends import OpenAIVectorStoreBackend
+from fake_vector_store import (
+    DEFAULT_VECTOR_STORE_ID,
+    FakeCorpus,
+    FakeUpstreamServer,
+    UpstreamBehavior,
+    create_fake_upstream_app,
+)
+from fastmcp import Client
+from resilience import CircuitBreaker, TokenBucket, UpstreamGuard
+
+
+def test_behavior_draws_latency_and_failures_from_its_distribution():
+    behavior = UpstreamBehavior(
+        latency=0.05,
+        jitter=0.5,
+        tail_rate=0.02,
+        tail_latency=1.0,
+        error_rate=0.1,
+        rate_limit_rate=0.05,
+        seed=1,
+    )
+    delays = [behavior.delay() for _ in range(5000)]
+    failures = [behavior.failure() for _ in range(5000)]
+    statuses = [failure.status_code for failure in failures if failure is not None]
+
+    assert 0.04 < statistics.median(delays) < 0.06
+    assert 0.01 < delays.count(1.0) / len(delays) < 0.03
+    assert 0.08 < statuses.count(500) / len(failures) < 0.12
+    assert 0.03 < statuses.count(429) / len(failures) < 0.07
+    assert UpstreamBehavior(latency=0.2).delay() == 0.2
+
+
+def test_server_retries_through_injected_upstream_failures():
+    corpus = FakeCorpus({"company.txt": "TechCorp Solutions revenue and products"})
+    behavior = UpstreamBehavior(
+        latency=0.01, error_rate=0.2, rate_limit_rate=0.2, retry_after=0.01, seed=3
+    )
+    app = create_fake_upstream_app(corpus, behavior=behavior)
+    guard = UpstreamGuard(
+        TokenBucket(rate=0, burst=1),
+        CircuitBreaker(failure_threshold=0, reset_timeout=30),
+        max_retries=8,
+        base_delay=0.01,
+    )
+
+    async def run(base_url: str) -> list:
+        client = server.create_openai_client(api_key="test", base_url=base_url)
+        backend = OpenAIVectorStoreBackend(client, DEFAULT_VECTOR_STORE_ID, guard=guard)
+        async with Client(server.create_server(backend)) as mcp_client:
+            responses = await asyncio.gather(
+                *(
+                    mcp_client.call_tool("search", {"query": f"TechCorp revenue {i}"})
+                    for i in range(20)
+                )
+            )
+        return [json.loads(response[0].text)["results"] for response in responses]
+
+    with FakeUpstreamServer(app) as upstream:
+        results = asyncio.run(run(upstream.base_url))
+
+    assert all(result and result[0]["title"] == "company.txt" for result in results)
+    assert app.state.calls["errors"] + app.state.calls["rate_limited"] > 0
+    assert guard.retries == app.state.calls["errors"] + app.state.calls["rate_limited"]
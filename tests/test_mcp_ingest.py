@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental vector store ingestion.
+"""
+
+import asyncio
+import os
+from pathlib import Path
+
+import ingest
+import pytest
+import server
+from fake_vector_store import (
+    DEFAULT_VECTOR_STORE_ID,
+    FakeCorpus,
+    FakeUpstreamServer,
+    UpstreamBehavior,
+    create_fake_upstream_app,
+)
+from ingest import VectorStoreSync
+
+
+@pytest.fixture
+def upstream():
+    store = FakeCorpus({})
+    app = create_fake_upstream_app(store, latency=0.01)
+    with FakeUpstreamServer(app) as running:
+        running.app, running.store = app, store
+        yield running
+
+
+def _sync(upstream, corpus: Path, manifest: Path) -> dict:
+    client = server.create_openai_client(api_key="test", base_url=upstream.base_url)
+    sync = VectorStoreSync(
+        client, DEFAULT_VECTOR_STORE_ID, corpus, manifest_path=manifest, concurrency=4
+    )
+    return asyncio.run(sync.run())
+
+
+def _write_corpus(corpus: Path, count: int):
+    (corpus / "nested").mkdir(parents=True)
+    for i in range(count):
+        folder = corpus / "nested" if i % 2 else corpus
+        (folder / f"doc_{i}.md").write_text(f"Document {i} about TechCorp")
+    (corpus / ".hidden.md").write_text("not ingested")
+    (corpus / "image.png").write_bytes(b"not ingested")
+
+
+def test_resync_only_uploads_changes_and_deletes_removed_files(
+    upstream, tmp_path, monkeypatch
+):
+    corpus, manifest = tmp_path / "files", tmp_path / "manifest.json"
+    _write_corpus(corpus, 6)
+    calls = upstream.app.state.calls
+
+    first = _sync(upstream, corpus, manifest)
+    assert (first["files"], first["upload"], first["failed"]) == (6, 6, [])
+    assert calls["upload"] == calls["attach"] == 6
+
+    # Nothing changed: no file is read and nothing is sent upstream
+    hashed = []
+    sha256 = ingest.file_sha256
+    monkeypatch.setattr(
+        ingest, "file_sha256", lambda path: hashed.append(path) or sha256(path)
+    )
+    second = _sync(upstream, corpus, manifest)
+    assert (second["unchanged"], second["upload"], second["delete"]) == (6, 0, 0)
+    assert hashed == [] and calls["upload"] == 6
+
+    # One edit, one touch without changes and one deletion
+    (corpus / "doc_0.md").write_text("Document 0 now about Globex")
+    os.utime(corpus / "doc_2.md", ns=(0, 0))
+    (corpus / "nested" / "doc_1.md").unlink()
+    third = _sync(upstream, corpus, manifest)
+    assert (third["upload"], third["delete"], third["unchanged"]) == (1, 1, 4)
+    assert calls["upload"] == 7
+    # The replaced version and the deleted file are removed from the store
+    assert calls["detach"] == calls["delete"] == 2
+
+    store = upstream.store
+    by_path = {store.attributes[i]["path"]: text for i, text in store.texts.items()}
+    assert len(by_path) == len(upstream.app.state.uploads) == 5
+    assert by_path["doc_0.md"] == "Document 0 now about Globex"
+    assert "nested/doc_1.md" not in by_path
+
+
+def test_failed_uploads_are_retried_on_the_next_run(tmp_path):
+    corpus, manifest = tmp_path / "files", tmp_path / "manifest.json"
+    _write_corpus(corpus, 10)
+    behavior = UpstreamBehavior(latency=0.005, error_rate=0.3, seed=7)
+    store = FakeCorpus({})
+    app = create_fake_upstream_app(store, behavior=behavior)
+
+    with FakeUpstreamServer(app) as upstream:
+        first = _sync(upstream, corpus, manifest)
+        assert first["failed"]
+
+        behavior.error_rate = 0
+        second = _sync(upstream, corpus, manifest)
+
+    assert second["upload"] == len(first["failed"])
+    assert second["failed"] == []
+    assert sorted(store.texts.values()) == sorted(
+        f"Document {i} about TechCorp" for i in range(10)
+    )
+
+
+def test_dry_run_makes_no_api_calls(tmp_path, monkeypatch, capsys):
+    corpus = tmp_path / "files"
+    _write_corpus(corpus, 3)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+
+    def no_store(*args):
+        raise AssertionError("a dry run must not create a store")
+
+    monkeypatch.setattr(ingest, "create_vector_store", no_store)
+    argv = ["ingest.py", "--dry-run", "--corpus", str(corpus)]
+
+    monkeypatch.setattr("sys.argv", [*argv, "--create", "Research files"])
+    with pytest.raises(SystemExit):
+        ingest.main()
+    assert "--create cannot be combined with --dry-run" in capsys.readouterr().err
+
+    manifest = str(tmp_path / "manifest.json")
+    monkeypatch.setattr(
+        "sys.argv", [*argv, "--vector-store-id", "vs_new", "--manifest", manifest]
+    )
+    ingest.main()
+    assert "3 files: 0 unchanged, 3 to upload" in capsys.readouterr().out
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the BM25 index and hybrid retrieval in the local backend.
+"""
+
+import asyncio
+from pathlib import Path
+
+from backends import LocalVectorIndexBackend
+from lexical import BM25Index, reciprocal_rank_fusion
+
+
+def test_bm25_ranks_exact_terms_and_updates_incrementally():
+    index = BM25Index()
+    index.add("a", "The XR-4821 sensor ships in March")
+    index.add("b", "Sensor pricing and shipping updates")
+    index.add("c", "Quarterly revenue summary")
+
+    assert index.search("XR-4821", k=2)[0][0] == "a"
+
+    index.remove("a")
+    assert "a" not in index
+    assert all(doc_id != "a" for doc_id, _ in index.search("XR-4821 sensor"))
+
+    index.add("c", "Replacement XR-4821 units")
+    assert index.search("XR-4821")[0][0] == "c"
+    assert len(index) == 2
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]])
+    assert fused[0][0] == "b"
+    assert {item for item, _ in fused} == {"a", "b", "c", "d"}
+
+
+def _write_corpus(directory: Path, documents: int = 30):
+    directory.mkdir()
+    for i in range(documents):
+        (directory / f"note_{i:02d}.txt").write_text(
+            f"Team meeting notes about customer onboarding and product roadmap {i}."
+        )
+    (directory / "catalog.txt").write_text(
+        "Team meeting notes about customer onboarding. Part number QZ7731 is back."
+    )
+
+
+def test_hybrid_search_finds_exact_codes(tmp_path):
+    corpus = tmp_path / "files"
+    _write_corpus(corpus)
+    backend = LocalVectorIndexBackend(corpus, index_dir=tmp_path / "index").load()
+
+    hits = asyncio.run(backend.search("QZ7731"))
+
+    assert hits[0]["title"] == "catalog.txt"
+
+
+def test_hybrid_search_scores_and_thresholds_on_cosine_similarity(tmp_path):
+    corpus = tmp_path / "files"
+    _write_corpus(corpus)
+    backend = LocalVectorIndexBackend(corpus, index_dir=tmp_path / "index").load()
+    query = "QZ7731 onboarding"
+
+    hits = asyncio.run(backend.search(query))
+    catalog = LocalVectorIndexBackend.file_id_for("catalog.txt")
+    cosine = backend.chunk_similarity(query, [(catalog, 0)])[(catalog, 0)]
+    assert hits[0]["title"] == "catalog.txt" and hits[0]["score"] == cosine
+
+    # Keyword matches below the threshold are dropped like vector matches
+    hits = asyncio.run(backend.search(query, score_threshold=cosine))
+    assert "catalog.txt" in [hit["title"] for hit in hits]
+    assert all(hit["score"] >= cosine for hit in hits) and len(hits) < 5
+    assert asyncio.run(backend.search(query, score_threshold=0.9)) == []
+
+
+def test_lexical_index_is_updated_only_for_changed_files(tmp_path):
+    corpus = tmp_path / "files"
+    _write_corpus(corpus)
+    backend = LocalVectorIndexBackend(corpus, index_dir=tmp_path / "index").load()
+    added = []
+    original_add = backend.lexical.add
+    backend.lexical.add = lambda doc_id, text: (
+        added.append(doc_id),
+        original_add(doc_id, text),
+    )
+
+    (corpus / "catalog.txt").write_text("Part number KM1204 replaces QZ7731.")
+    (corpus / "note_00.txt").unlink()
+    asyncio.run(backend.store_version())
+
+    assert {file_id for file_id, _ in added} == {
+        LocalVectorIndexBackend.file_id_for("catalog.txt")
+    }
+    hits = asyncio.run(backend.search("KM1204"))
+    assert hits[0]["title"] == "catalog.txt"
+    assert len(backend.lexical) == len(backend.chunks)
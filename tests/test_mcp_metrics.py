@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for the MCP server's metrics and health endpoints.
+"""
+
+import asyncio
+
+from backends import LocalVectorIndexBackend, OpenAIVectorStoreBackend
+from fastmcp import Client
+from prometheus_client.parser import text_string_to_metric_families
+from server import create_server
+from starlette.testclient import TestClient
+
+
+def _local_server(tmp_path):
+    corpus = tmp_path / "files"
+    corpus.mkdir()
+    (corpus / "company.txt").write_text("TechCorp Solutions reported revenue of $50M.")
+    backend = LocalVectorIndexBackend(corpus, index_dir=tmp_path / "index").load()
+    return create_server(backend)
+
+
+def _samples(text: str) -> dict[tuple, float]:
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(text)
+        for sample in family.samples
+    }
+
+
+def test_metrics_report_tool_latency_errors_and_cache_hits(tmp_path):
+    server = _local_server(tmp_path)
+
+    async def run():
+        async with Client(server) as client:
+            for _ in range(3):
+                await client.call_tool("search", {"query": "TechCorp revenue"})
+            await client.call_tool("fetch", {"id": "local-missing"})
+
+    asyncio.run(run())
+    response = TestClient(server.http_app()).get("/metrics")
+    assert response.status_code == 200
+    samples = _samples(response.text)
+
+    assert samples[("mcp_tool_duration_seconds_count", (("tool", "search"),))] == 3
+    assert (
+        samples[("mcp_upstream_duration_seconds_count", (("operation", "search"),))]
+        == 1
+    )
+    assert samples[("mcp_tool_errors_total", (("tool", "fetch"),))] == 1
+    assert samples[("mcp_upstream_errors_total", (("operation", "fetch"),))] == 1
+    assert samples[("mcp_tool_in_flight", (("tool", "search"),))] == 0
+    assert samples[("mcp_cache_hit_ratio", (("cache", "search"),))] == 2 / 3
+
+
+def test_health_and_readiness(tmp_path):
+    client = TestClient(_local_server(tmp_path).http_app())
+    assert client.get("/healthz").json() == {"status": "ok"}
+    assert client.get("/readyz").json()["status"] == "ready"
+
+    unconfigured = create_server(
+        OpenAIVectorStoreBackend(client=None, vector_store_id=None)
+    )
+    response = TestClient(unconfigured.http_app()).get("/readyz")
+    assert response.status_code == 503
+    assert "not initialized" in response.json()["reason"]
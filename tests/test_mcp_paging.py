@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for paged and query-focused fetch responses.
+"""
+
+import asyncio
+import json
+
+import pytest
+from backends import LocalVectorIndexBackend
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+from paging import page_document, select_passages
+from server import create_server
+
+FILLER = "The quarterly report covers general operations and staffing updates. "
+NEEDLE = "The Nimbus X7 platform generated $12M in new annual recurring revenue. "
+
+
+def _document(text: str) -> dict:
+    return {"id": "doc", "title": "doc.txt", "text": text, "url": "", "metadata": None}
+
+
+def test_paging_walks_the_whole_document():
+    text = "".join(f"{i:04d} " for i in range(1000))
+    pages = []
+    offset = 0
+    while offset is not None:
+        page = page_document(_document(text), offset=offset, max_chars=700)
+        assert len(page["text"]) <= 700
+        assert page["total_chars"] == len(text)
+        pages.append(page["text"])
+        offset = page["next_offset"]
+
+    assert "".join(pages) == text
+
+
+def test_paging_without_limit_returns_everything():
+    page = page_document(_document("short text"))
+    assert page["text"] == "short text"
+    assert page["next_offset"] is None
+
+
+def test_select_passages_returns_best_match_within_budget():
+    text = FILLER * 40 + NEEDLE + FILLER * 40
+    result = select_passages(_document(text), "Nimbus X7 recurring revenue", 700)
+
+    assert "Nimbus X7" in result["text"]
+    assert len(result["text"]) < 1000
+    assert result["total_chars"] == len(text)
+    offsets = [passage["offset"] for passage in result["passages"]]
+    assert offsets == sorted(offsets)
+    # Passages locate the selected text instead of repeating it
+    for passage in result["passages"]:
+        excerpt = text[passage["offset"] : passage["offset"] + passage["length"]]
+        assert set(passage) == {"offset", "length", "score"}
+        assert excerpt in result["text"]
+    assert len(json.dumps(result)) < len(result["text"]) + 500
+
+
+def test_fetch_tool_pages_and_focuses(tmp_path):
+    corpus = tmp_path / "files"
+    corpus.mkdir()
+    (corpus / "report.txt").write_text(FILLER * 40 + NEEDLE + FILLER * 40)
+    backend = LocalVectorIndexBackend(corpus, index_dir=tmp_path / "index").load()
+    file_id = next(iter(backend.documents))
+    server = create_server(backend)
+
+    async def run():
+        async with Client(server) as client:
+            page = await client.call_tool("fetch", {"id": file_id, "max_chars": 500})
+            focused = await client.call_tool(
+                "fetch", {"id": file_id, "query": "Nimbus X7 revenue", "max_chars": 800}
+            )
+            return json.loads(page[0].text), json.loads(focused[0].text)
+
+    page, focused = asyncio.run(run())
+
+    assert len(page["text"]) == 500 and page["next_offset"] == 500
+
+    async def invalid(arguments: dict):
+        async with Client(server) as client:
+            await client.call_tool("fetch", {"id": file_id, **arguments})
+
+    # Negative offsets would slice from the end and page backwards
+    for arguments in ({"offset": -5}, {"max_chars": 0}, {"max_chars": -5}):
+        with pytest.raises(ToolError):
+            asyncio.run(invalid(arguments))
+    with pytest.raises(ValueError):
+        page_document(_document("short text"), 10, -5)
+    assert "Nimbus X7" in focused["text"]
+    assert len(focused["text"]) <= 800 + 10
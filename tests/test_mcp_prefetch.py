@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for speculative prefetch of search hits into the document cache.
+"""
+
+import asyncio
+
+import server
+from backends import VectorStoreBackend
+from caching import TTLCache
+from fastmcp import Client
+from prefetch import Prefetcher
+from starlette.testclient import TestClient
+
+BACKEND_LATENCY = 0.05
+
+
+class DocumentsBackend(VectorStoreBackend):
+    """Fake backend returning three hits and recording fetched IDs."""
+
+    name = "documents"
+    store_id = "documents"
+
+    def __init__(self):
+        self.fetched = []
+
+    async def search(self, query: str, **options) -> list[dict]:
+        return [
+            {"id": f"doc-{i}", "title": f"doc {i}", "text": query, "url": "u"}
+            for i in range(3)
+        ]
+
+    async def fetch(self, file_id: str) -> dict:
+        self.fetched.append(file_id)
+        await asyncio.sleep(BACKEND_LATENCY)
+        return {"id": file_id, "title": file_id, "text": "body", "url": "u"}
+
+
+def test_fetch_after_search_is_served_from_prefetch():
+    backend = DocumentsBackend()
+    mcp = server.create_server(
+        backend,
+        document_cache=TTLCache(max_bytes=1_000_000, ttl=60),
+        search_cache=TTLCache(max_bytes=1_000_000, ttl=60),
+        prefetch_top_k=2,
+    )
+
+    async def run():
+        async with Client(mcp) as client:
+            await client.call_tool("search", {"query": "TechCorp"})
+            # Joins the prefetch still in flight
+            await client.call_tool("fetch", {"id": "doc-0"})
+            await asyncio.sleep(BACKEND_LATENCY * 2)
+            # Served from the completed prefetch
+            await client.call_tool("fetch", {"id": "doc-1"})
+            # Not prefetched (beyond top_k)
+            await client.call_tool("fetch", {"id": "doc-2"})
+
+    asyncio.run(run())
+
+    assert sorted(backend.fetched) == ["doc-0", "doc-1", "doc-2"]
+    http = TestClient(mcp.http_app())
+    stats = http.get("/stats").json()["prefetch"]
+    metrics = http.get("/metrics").text
+    assert (stats["scheduled"], stats["completed"], stats["hits"]) == (2, 2, 2)
+    assert (stats["hit_rate"], stats["wasted_rate"]) == (1.0, 0.0)
+    assert "mcp_prefetch_hit_rate 1.0" in metrics
+
+
+def test_evicted_prefetches_count_as_wasted():
+    cache = TTLCache(max_bytes=100, ttl=60)
+    prefetcher = Prefetcher(cache, top_k=3)
+
+    async def loader():
+        return "x" * 40
+
+    async def run():
+        prefetcher.schedule([(f"doc-{i}", loader) for i in range(3)])
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    # Only two 40-byte documents fit: the first was evicted unused
+    prefetcher.claim("doc-2")
+    stats = prefetcher.stats()
+    assert (stats["completed"], stats["hits"], stats["wasted"]) == (3, 1, 1)
+    assert stats["unused"] == 1
+
+
+def test_prefetches_are_cancelled_under_load():
+    cache = TTLCache(max_bytes=1000, ttl=60)
+    busy = False
+    prefetcher = Prefetcher(cache, top_k=4, concurrency=1, busy=lambda: busy)
+    started = []
+
+    async def slow_loader():
+        started.append(1)
+        await asyncio.sleep(10)
+        return "body"
+
+    async def run():
+        nonlocal busy
+        prefetcher.schedule([(f"doc-{i}", slow_loader) for i in range(4)])
+        await asyncio.sleep(0.01)
+        busy = True
+        prefetcher.shed_if_busy()
+        await asyncio.sleep(0.01)
+        # Nothing new starts while the server is busy
+        prefetcher.schedule([("doc-9", slow_loader)])
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5))
+
+    assert len(started) == 1
+    assert not cache.loading("doc-0") and len(cache) == 0
+    stats = prefetcher.stats()
+    assert (stats["scheduled"], stats["shed"], stats["completed"]) == (4, 5, 0)
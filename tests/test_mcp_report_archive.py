@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the research report archive and its MCP tools.
+"""
+
+import asyncio
+import json
+
+import pytest
+import server
+from backends import VectorStoreBackend
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+from report_archive import ReportArchive, extract_citations
+
+EV_REPORT = """# Electric vehicle adoption in Europe
+
+Sales grew 20% ([IEA outlook](https://www.iea.org/ev-outlook)), led by
+Norway. See also https://example.com/norway-ev. and [the summary](#summary).
+"""
+CLOUD_REPORT = "# Cloud pricing\n\nHyperscalers cut storage prices in Europe."
+SNEAKER_REPORT = "# Sneaker culture\n\nGen Z sneaker resale keeps growing."
+
+
+class NoBackend(VectorStoreBackend):
+    name = "none"
+    store_id = "none"
+
+
+def test_citations_are_extracted_from_markdown():
+    assert extract_citations(EV_REPORT) == [
+        {"title": "IEA outlook", "url": "https://www.iea.org/ev-outlook"},
+        {"title": "", "url": "https://example.com/norway-ev"},
+    ]
+
+
+def test_search_ranks_reports_matching_every_word_first(tmp_path):
+    clock = iter([1000.0, 2000.0, 3000.0])
+    archive = ReportArchive(tmp_path / "archive.db", clock=lambda: next(clock))
+    ev = archive.add(EV_REPORT, "EV adoption in Europe")
+    cloud = archive.add(CLOUD_REPORT, "Cloud storage pricing")
+    archive.add(SNEAKER_REPORT, "Gen Z sneakers")
+
+    results = archive.search("What is EV adoption like in Europe?")
+    assert [r["id"] for r in results] == [ev, cloud]
+    assert "**Europe**" in results[0]["snippet"]
+    assert results[0]["citations"][0]["url"] == "https://www.iea.org/ev-outlook"
+    assert results[0]["created_at"].startswith("1970-01-01T00:16:40")
+
+    assert [r["id"] for r in archive.search("Europe", since=1500)] == [cloud]
+    # FTS5 syntax in the text is treated as plain words
+    assert archive.search('sneaker" OR (NEAR') != []
+    assert archive.search("?!") == []
+    assert archive.get(ev)["markdown"] == EV_REPORT
+    assert archive.get(999) is None
+
+
+def test_report_tools_serve_the_archive(tmp_path):
+    archive = ReportArchive(tmp_path / "archive.db")
+    report_id = archive.add(SNEAKER_REPORT, "Gen Z sneakers")
+    mcp = server.create_server(NoBackend(), report_archive=archive)
+
+    async def run():
+        async with Client(mcp) as client:
+            found = await client.call_tool(
+                "search_reports", {"query": "sneaker resale"}
+            )
+            report = await client.call_tool("get_report", {"id": report_id})
+            with pytest.raises(ToolError):
+                await client.call_tool("get_report", {"id": report_id + 1})
+            return json.loads(found[0].text), json.loads(report[0].text)
+
+    found, report = asyncio.run(run())
+    assert [r["query"] for r in found["results"]] == ["Gen Z sneakers"]
+    assert report["markdown"] == SNEAKER_REPORT
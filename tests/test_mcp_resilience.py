@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Tests for upstream admission control (rate limiter, retries, circuit breaker).
+"""
+
+import asyncio
+import json
+import random
+import time
+
+import httpx
+import openai
+import pytest
+import server
+from backends import OpenAIVectorStoreBackend
+from fastmcp import Client
+from fastmcp.exceptions import ToolError
+from resilience import (
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    TokenBucket,
+    UpstreamGuard,
+    UpstreamUnavailableError,
+    retry_after_seconds,
+)
+
+
+def _status_error(status: int, headers: dict | None = None) -> openai.APIStatusError:
+    response = httpx.Response(
+        status, headers=headers or {}, request=httpx.Request("POST", "http://x")
+    )
+    error_class = openai.RateLimitError if status == 429 else openai.APIStatusError
+    return error_class(f"HTTP {status}", response=response, body=None)
+
+
+def _guard(max_retries: int = 3, threshold: int = 5, clock=time.monotonic):
+    sleeps = []
+
+    async def sleep(seconds: float):
+        sleeps.append(seconds)
+
+    guard = UpstreamGuard(
+        TokenBucket(rate=0, burst=1),
+        CircuitBreaker(threshold, reset_timeout=30, clock=clock),
+        max_retries=max_retries,
+        base_delay=0.5,
+        max_delay=20,
+        sleep=sleep,
+        rng=random.Random(0),
+    )
+    return guard, sleeps
+
+
+def _flaky(errors: list[Exception], result="ok"):
+    calls = []
+
+    async def request():
+        calls.append(1)
+        if errors:
+            raise errors.pop(0)
+        return result
+
+    return request, calls
+
+
+def test_retry_after_headers_are_parsed():
+    assert retry_after_seconds({"retry-after-ms": "250"}) == 0.25
+    assert retry_after_seconds({"retry-after": "3"}) == 3.0
+    assert retry_after_seconds({"x-ratelimit-reset-requests": "1m30s"}) == 90.0
+    assert retry_after_seconds({"x-ratelimit-reset-tokens": "120ms"}) == 0.12
+    assert retry_after_seconds({}) is None
+
+
+def test_rate_limited_calls_wait_as_instructed_then_succeed():
+    guard, sleeps = _guard()
+    request, calls = _flaky([_status_error(429, {"retry-after-ms": "50"})])
+
+    assert asyncio.run(guard.call("search", request)) == "ok"
+    assert len(calls) == 2
+    assert 0.05 <= sleeps[0] <= 0.55
+    assert guard.limiter.waits == 1  # Other callers were held too
+    assert guard.rate_limited == 1
+    assert guard.breaker.failures == 0  # throttling is not an outage
+
+
+def test_server_errors_use_jittered_backoff_and_give_up():
+    guard, sleeps = _guard(max_retries=2)
+    request, calls = _flaky([_status_error(503) for _ in range(5)])
+
+    with pytest.raises(UpstreamUnavailableError):
+        asyncio.run(guard.call("search", request))
+    assert len(calls) == 3
+    assert 0 <= sleeps[0] <= 0.5 and 0 <= sleeps[1] <= 1.0
+
+
+def test_client_errors_are_not_retried():
+    guard, _ = _guard()
+    request, calls = _flaky([_status_error(404)])
+
+    with pytest.raises(openai.APIStatusError):
+        asyncio.run(guard.call("fetch", request))
+    assert len(calls) == 1
+
+
+def test_circuit_opens_fails_fast_and_recovers(clock):
+    guard, _ = _guard(max_retries=0, threshold=2, clock=clock)
+    for _ in range(2):
+        request, _ = _flaky([_status_error(500)])
+        with pytest.raises(UpstreamUnavailableError):
+            asyncio.run(guard.call("search", request))
+    assert guard.breaker.state == OPEN
+
+    request, calls = _flaky([])
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(guard.call("search", request))
+    assert calls == []
+
+    clock.now = 31  # Past the reset timeout: one trial call closes the circuit
+    assert asyncio.run(guard.call("search", request)) == "ok"
+    assert guard.stats()["breaker_state"] == "closed"
+
+
+def test_cancelled_trial_call_does_not_wedge_the_circuit(clock):
+    guard, _ = _guard(max_retries=0, threshold=1, clock=clock)
+
+    async def hang():
+        await asyncio.sleep(60)
+
+    async def cancel(request):
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(guard.call("search", request), 0.01)
+
+    # Cancelled once in flight, and once while still waiting for a token
+    for paused in (False, True):
+        request, _ = _flaky([_status_error(500)])
+        with pytest.raises(UpstreamUnavailableError):
+            asyncio.run(guard.call("search", request))
+        assert guard.breaker.state == OPEN
+
+        clock.now += 31  # The next call is the half-open trial
+        if paused:
+            guard.limiter.pause(60)
+        asyncio.run(cancel(hang))
+        # A cancelled trial says nothing about upstream health
+        assert guard.breaker.state == HALF_OPEN and guard.breaker.failures == 1
+        guard.limiter = TokenBucket(rate=0, burst=1)
+
+        request, calls = _flaky([])
+        assert asyncio.run(guard.call("search", request)) == "ok"
+        assert calls == [1]
+
+
+def test_token_bucket_paces_bursts():
+    async def run():
+        bucket = TokenBucket(rate=100, burst=5)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await asyncio.gather(*(bucket.acquire() for _ in range(15)))
+        return loop.time() - start, bucket.waits
+
+    elapsed, waits = asyncio.run(run())
+    assert elapsed >= 0.09  # 10 requests beyond the burst at 100/s
+    assert waits >= 1
+
+
+def test_search_surfaces_outage_instead_of_empty_results():
+    class FailingClient:
+        class vector_stores:
+            @staticmethod
+            async def search(**kwargs):
+                raise _status_error(503)
+
+    guard, _ = _guard(max_retries=1)
+    backend = OpenAIVectorStoreBackend(FailingClient(), "vs_1", guard=guard)
+    mcp = server.create_server(backend)
+
+    async def run():
+        async with Client(mcp) as client:
+            with pytest.raises(ToolError, match="failed after"):
+                await client.call_tool("search", {"query": "TechCorp"})
+            stats = await client.call_tool("search_many", {"queries": ["TechCorp"]})
+            return json.loads(stats[0].text)
+
+    batch = asyncio.run(run())
+    assert "failed after" in batch["results"][0]["error"]
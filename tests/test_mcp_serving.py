@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Tests for serving the MCP server over SSE and streamable HTTP.
+"""
+
+import asyncio
+import json
+
+import pytest
+import server
+from backends import LocalVectorIndexBackend
+from fake_vector_store import FakeUpstreamServer
+from fastmcp import Client
+
+
+def test_both_transports_are_served_from_one_app(tmp_path):
+    corpus = tmp_path / "files"
+    corpus.mkdir()
+    (corpus / "company.txt").write_text("TechCorp Solutions reported revenue of $50M.")
+    backend = LocalVectorIndexBackend(corpus, index_dir=tmp_path / "index").load()
+    app = server.create_app(server.create_server(backend), transport="both")
+
+    async def search(url: str) -> list[dict]:
+        async with Client(url) as client:
+            response = await client.call_tool("search", {"query": "TechCorp"})
+            return json.loads(response[0].text)["results"]
+
+    with FakeUpstreamServer(app) as running:
+        streamable = asyncio.run(search(f"{running.url}/mcp"))
+        sse = asyncio.run(search(f"{running.url}/sse"))
+
+    assert streamable == sse
+    assert streamable[0]["title"] == "company.txt"
+
+
+def test_multiple_workers_require_streamable_http(monkeypatch):
+    monkeypatch.setattr(server, "MCP_BACKEND", "local")
+    monkeypatch.setattr(server, "SERVER_WORKERS", 2)
+    monkeypatch.setattr(server, "SERVER_TRANSPORT", "both")
+
+    with pytest.raises(ValueError, match="streamable-http"):
+        server.main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tests for vector store ID discovery.
+"""
+
+import os
+from pathlib import Path
+
+import vector_utils
+from vector_utils import (
+    _find_vector_store_folders,
+    detect_vector_store_id,
+    detect_vector_store_ids,
+)
+
+
+def test_discovery_is_bounded_and_skips_dependency_folders(tmp_path):
+    (tmp_path / "Agency" / "files_vs_agency").mkdir(parents=True)
+    (tmp_path / "node_modules" / "pkg" / "files_vs_dependency").mkdir(parents=True)
+    (tmp_path / ".git" / "files_vs_git").mkdir(parents=True)
+    (tmp_path / "a" / "b" / "c" / "files_vs_deep").mkdir(parents=True)
+
+    shallow = _find_vector_store_folders([str(tmp_path)], max_depth=2)
+    deep = _find_vector_store_folders([str(tmp_path)], max_depth=3)
+
+    assert [Path(folder).name for folder in shallow] == ["files_vs_agency"]
+    assert sorted(Path(folder).name for folder in deep) == [
+        "files_vs_agency",
+        "files_vs_deep",
+    ]
+
+
+def test_manifest_is_reused_until_store_folders_change(tmp_path, monkeypatch):
+    project = tmp_path / "project"
+    agency = project / "Agency"
+    (agency / "files_vs_first").mkdir(parents=True)
+    (project / "Other").mkdir()  # An agent without a store yet
+    manifest = tmp_path / ".mcp_index" / "vector_store.json"
+    monkeypatch.chdir(project)
+    monkeypatch.delenv("VECTOR_STORE_ID", raising=False)
+    monkeypatch.delenv("VECTOR_STORE_IDS", raising=False)
+
+    walks = []
+    find = vector_utils._find_vector_store_folders
+
+    def counting_find(*args, **kwargs):
+        walks.append(1)
+        return find(*args, **kwargs)
+
+    monkeypatch.setattr(vector_utils, "_find_vector_store_folders", counting_find)
+
+    assert detect_vector_store_id(manifest) == "vs_first"
+    assert detect_vector_store_id(manifest) == "vs_first"
+    assert len(walks) == 1
+
+    # Replacing the store folder changes the agency directory's mtime
+    (agency / "files_vs_first").rename(agency / "files_vs_second")
+    os.utime(agency, (0, 0))
+    assert detect_vector_store_id(manifest) == "vs_second"
+    assert len(walks) == 2
+
+    # The other agent gets its first store folder
+    (project / "Other" / "files_vs_other").mkdir()
+    os.utime(project / "Other" / "files_vs_other", (0, 0))
+    assert detect_vector_store_ids(manifest) == ["vs_second", "vs_other"]
+    assert len(walks) == 3
+
+    # The older store folder is updated and becomes the newest
+    os.utime(agency / "files_vs_second", (0, 0))
+    os.utime(project / "Other" / "files_vs_other", (1, 1))
+    assert detect_vector_store_ids(manifest) == ["vs_other", "vs_second"]
+    assert len(walks) == 4
+
+
+def test_all_stores_are_detected_newest_first(tmp_path, monkeypatch):
+    (tmp_path / "Sales" / "files_vs_sales").mkdir(parents=True)
+    (tmp_path / "Research" / "files_vs_research").mkdir(parents=True)
+    os.utime(tmp_path / "Sales" / "files_vs_sales", (0, 0))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("VECTOR_STORE_ID", raising=False)
+    monkeypatch.delenv("VECTOR_STORE_IDS", raising=False)
+
+    assert detect_vector_store_ids("") == ["vs_research", "vs_sales"]
+    assert detect_vector_store_id("") == "vs_research"
+
+    monkeypatch.setenv("VECTOR_STORE_IDS", "vs_a, vs_b")
+    assert detect_vector_store_ids("") == ["vs_a", "vs_b"]
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for QlooInsightsTool's batch mode against the fake Qloo API.
+"""
+
+import asyncio
+
+import pytest
+import qloo_cache
+import qloo_client
+import qloo_limits
+from fake_qloo import FakeQlooServer, create_fake_qloo_app
+from qloo_cache import InsightCache
+from qloo_limits import QlooCircuitBreaker, QlooGuard
+from QlooInsightsTool import QLOO_BATCH_MAX_REQUESTS, QlooInsightsTool
+from resilience import TokenBucket
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+@pytest.fixture
+def app(monkeypatch):
+    app = create_fake_qloo_app()
+
+    async def not_found(request):
+        return JSONResponse({"error": "Not found"}, status_code=404)
+
+    # Trends always fail, without retries or breaker trips (404 is a client error)
+    app.router.routes.insert(0, Route("/v1/trends", not_found))
+    with FakeQlooServer(app) as server:
+        monkeypatch.setenv("QLOO_API_URL", server.base_url)
+        monkeypatch.setenv("QLOO_API_KEY", "test")
+        monkeypatch.setattr(qloo_cache, "_cache", InsightCache())
+        monkeypatch.setattr(
+            qloo_limits,
+            "_guard",
+            QlooGuard(TokenBucket(0, 1), QlooCircuitBreaker(5, 30)),
+        )
+        yield app
+
+
+def run(**fields) -> str:
+    async def call():
+        try:
+            return await QlooInsightsTool(**fields).run()
+        finally:
+            await qloo_client.close_client()
+
+    return asyncio.run(call())
+
+
+def test_batch_dedups_and_keeps_entity_order(app):
+    result = run(
+        entity="Nike",
+        entities=["Adidas", " nike ", "Puma", "ADIDAS", ""],
+        # "analysis" is served by the recommendations endpoint
+        insight_types=["recommendations", "affinities", "analysis"],
+    )
+
+    assert result.startswith("# 🎯 Qloo Cultural Insights: Nike vs Adidas vs Puma\n")
+    sections = [
+        result.index(f"Insights for '{name}'") for name in ("Nike", "Adidas", "Puma")
+    ]
+    assert sections == sorted(sections)
+    assert "Partial Results" not in result
+    assert app.state.calls == {"recommendations": 3, "affinities": 3}
+
+
+def test_batch_over_the_request_cap_is_rejected_without_calls(app):
+    entities = [f"Brand {i}" for i in range(QLOO_BATCH_MAX_REQUESTS)]
+    result = run(entity="Nike", entities=entities, insight_types=["affinities"])
+
+    assert result.startswith(
+        f"❌ Error: {QLOO_BATCH_MAX_REQUESTS + 1} entities × 1 insight types"
+    )
+    assert sum(app.state.calls.values()) == 0
+
+
+def test_batch_reports_partial_and_total_failures(app):
+    result = run(
+        entity="Nike", entities=["Adidas"], insight_types=["recommendations", "trends"]
+    )
+
+    assert "Insights for 'Nike'" in result and "Insights for 'Adidas'" in result
+    partial = result[result.index("### ⚠️ Partial Results") :]
+    assert "- trends for 'Nike'" in partial and "- trends for 'Adidas'" in partial
+    assert "recommendations for" not in partial
+
+    result = run(entity="Nike", entities=["Adidas"], insight_types=["trends"])
+    assert result.startswith("❌ Error accessing Qloo API:\n- trends for 'Nike'")
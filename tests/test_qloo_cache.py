@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the Qloo insight cache.
+"""
+
+import asyncio
+
+import pytest
+import qloo_client
+from fake_qloo import FakeQlooServer, create_fake_qloo_app
+from qloo_cache import InsightCache, InsightDiskStore, cache_key
+from qloo_client import QlooAPIError, build_request, get_insights
+
+
+@pytest.fixture
+def qloo(monkeypatch):
+    app = create_fake_qloo_app(api_key="test")
+    with FakeQlooServer(app) as server:
+        monkeypatch.setenv("QLOO_API_URL", server.base_url)
+        server.app = app
+        yield server
+
+
+def fetch(cache: InsightCache, api_key: str = "test", **request):
+    async def run():
+        path, params = build_request(**request)
+        try:
+            return await cache.get(
+                cache_key(path, params), lambda: get_insights(api_key, path, params)
+            )
+        finally:
+            # Let background refreshes finish before the loop closes
+            await asyncio.gather(*cache._loading.values(), return_exceptions=True)
+            await qloo_client.close_client()
+
+    return asyncio.run(run())
+
+
+def test_normalized_requests_share_entry_across_memory_and_disk(qloo, tmp_path):
+    store = InsightDiskStore(tmp_path / "qloo.db")
+    cache = InsightCache(ttl=60, store=store)
+
+    first, status, _ = fetch(cache, entity="Nike", tags=["sport", "Fashion"])
+    assert status == "miss"
+    again, status, _ = fetch(cache, entity=" nike ", tags=["fashion", "SPORT"])
+    assert (again, status) == (first, "fresh")
+
+    # A new process only has the disk tier
+    restarted = InsightCache(ttl=60, store=store)
+    _, status, _ = fetch(restarted, entity="NIKE", tags=["sport", "fashion"])
+    assert status == "fresh" and restarted.disk_hits == 1
+    assert qloo.app.state.calls["recommendations"] == 1
+    store.close()
+
+
+def test_stale_entry_is_served_and_refreshed_in_background(qloo, clock):
+    cache = InsightCache(ttl=60, stale_ttl=3600, clock=clock)
+    fetch(cache, entity="Nike", insight_type="trends")
+
+    clock.now += 120
+    _, status, age = fetch(cache, entity="Nike", insight_type="trends")
+    assert (status, age) == ("stale", 120)
+    assert qloo.app.state.calls["trends"] == 2  # refreshed behind the answer
+
+    _, status, _ = fetch(cache, entity="Nike", insight_type="trends")
+    assert status == "fresh" and cache.refreshes == 1
+
+
+def test_api_errors_fall_back_to_last_good_entry(qloo, clock):
+    cache = InsightCache(ttl=60, stale_ttl=300, clock=clock)
+    good, _, _ = fetch(cache, entity="Nike")
+
+    clock.now += 7200
+    insights, status, age = fetch(cache, api_key="revoked", entity="Nike")
+    assert (insights, status, age) == (good, "fallback", 7200)
+    assert cache.fallbacks == 1
+
+    with pytest.raises(QlooAPIError, match="Invalid Qloo API key"):
+        fetch(cache, api_key="revoked", entity="Adidas")
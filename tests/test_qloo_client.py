@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests for the Qloo API client used by QlooInsightsTool.
+"""
+
+import asyncio
+
+import pytest
+import qloo_client
+from fake_qloo import FakeQlooServer, create_fake_qloo_app
+from qloo_client import QlooAPIError, build_request, get_insights
+
+
+@pytest.fixture
+def qloo(monkeypatch):
+    app = create_fake_qloo_app(api_key="test")
+    with FakeQlooServer(app) as server:
+        monkeypatch.setenv("QLOO_API_URL", server.base_url)
+        server.app = app
+        yield server
+
+
+def test_build_request_maps_insight_types_to_endpoints():
+    path, params = build_request("Nike", ["fashion", "sport"], "Gen Z", None, "trends")
+    assert path == "/trends"
+    assert params == {
+        "entity": "Nike",
+        "limit": 20,
+        "tags": "fashion,sport",
+        "demographics": "Gen Z",
+    }
+    assert build_request("Nike", insight_type="analysis")[0] == "/recommendations"
+
+
+def test_calls_reuse_one_pooled_connection(qloo):
+    async def run():
+        first = qloo_client.get_client()
+        results = []
+        for insight_type in ("recommendations", "affinities", "trends"):
+            path, params = build_request("Nike", insight_type=insight_type)
+            results.append(await get_insights("test", path, params))
+        assert qloo_client.get_client() is first
+        await qloo_client.close_client()
+        return results
+
+    recommendations, affinities, trends = asyncio.run(run())
+    assert recommendations["recommendations"][0]["name"] == "Nike pick 1"
+    assert affinities["affinities"] and trends["trends"]
+    assert sum(qloo.app.state.calls.values()) == 3
+    assert len(qloo.app.state.connections) == 1
+
+
+def test_http_errors_become_agent_readable_messages(qloo):
+    path, params = build_request("Nike")
+    with pytest.raises(QlooAPIError, match="Invalid Qloo API key"):
+        asyncio.run(get_insights("wrong", path, params))
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for the fake Qloo API's latency and failure behavior.
+"""
+
+import asyncio
+import random
+
+import pytest
+import qloo_client
+from fake_qloo import FakeQlooServer, QlooBehavior, create_fake_qloo_app
+from qloo_client import QlooAPIError, build_request, get_insights
+from qloo_limits import QlooCircuitBreaker, QlooGuard
+from resilience import TokenBucket
+
+
+def call(behavior: QlooBehavior, monkeypatch, guard: QlooGuard | None = None):
+    app = create_fake_qloo_app(behavior=behavior)
+    with FakeQlooServer(app) as server:
+        monkeypatch.setenv("QLOO_API_URL", server.base_url)
+
+        async def run():
+            path, params = build_request("Nike", insight_type="affinities")
+            try:
+                if guard is None:
+                    return await get_insights("test", path, params)
+                return await guard.call(
+                    "insights", lambda: get_insights("test", path, params)
+                )
+            finally:
+                await qloo_client.close_client()
+
+        return asyncio.run(run())
+
+
+def test_behavior_draws_latency_and_failures_reproducibly():
+    first, second = (
+        QlooBehavior(latency=0.05, jitter=0.5, tail_rate=0.1, seed=7) for _ in "ab"
+    )
+    delays = [first.delay() for _ in range(200)]
+    assert delays == [second.delay() for _ in range(200)]
+    body = [delay for delay in delays if delay != 1.0]
+    assert len(body) < 195 and min(body) < 0.05 < max(body) < 0.5
+
+    behavior = QlooBehavior(error_rate=0.2, rate_limit_rate=0.1, seed=3)
+    statuses = [getattr(behavior.failure(), "status_code", 200) for _ in range(1000)]
+    assert 60 < statuses.count(429) < 140 and 150 < statuses.count(500) < 250
+
+
+@pytest.mark.parametrize(
+    "behavior, status",
+    [
+        (QlooBehavior(latency=0, error_rate=1), 500),
+        (QlooBehavior(latency=0, rate_limit_rate=1, retry_after=2.5), 429),
+    ],
+)
+def test_failures_reach_the_client_with_status(monkeypatch, behavior, status):
+    with pytest.raises(QlooAPIError) as raised:
+        call(behavior, monkeypatch)
+    assert raised.value.status_code == status
+    assert raised.value.retry_after == (2.5 if status == 429 else None)
+
+
+def test_guard_rides_out_intermittent_failures(monkeypatch):
+    guard = QlooGuard(
+        TokenBucket(0, 1),
+        QlooCircuitBreaker(failure_threshold=10, reset_timeout=30),
+        max_retries=10,
+        base_delay=0.01,
+        rng=random.Random(0),
+    )
+    behavior = QlooBehavior(
+        latency=0, error_rate=0.4, rate_limit_rate=0.3, retry_after=0.01, seed=1
+    )
+    insights = call(behavior, monkeypatch, guard)
+    assert insights["affinities"] and guard.retries > 0
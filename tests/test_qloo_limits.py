@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Tests for the client-side Qloo API limits.
+"""
+
+import asyncio
+import random
+
+import pytest
+import qloo_client
+from fake_qloo import FakeQlooServer, create_fake_qloo_app
+from qloo_client import QlooAPIError, build_request, get_insights
+from qloo_limits import CircuitOpenError, QlooCircuitBreaker, QlooGuard
+from resilience import CLOSED, HALF_OPEN, OPEN, TokenBucket, retry_after_seconds
+
+
+def run_calls(guard: QlooGuard, calls: int):
+    async def run():
+        async def one(i: int):
+            path, params = build_request(f"entity {i}")
+            return await guard.call(
+                "insights", lambda: get_insights("test", path, params)
+            )
+
+        try:
+            return await asyncio.gather(*(one(i) for i in range(calls)))
+        finally:
+            await qloo_client.close_client()
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("paced", [False, True])
+def test_quota_pacing_and_retry_after(monkeypatch, paced):
+    app = create_fake_qloo_app(rate_limit=20)
+    with FakeQlooServer(app) as server:
+        monkeypatch.setenv("QLOO_API_URL", server.base_url)
+        guard = QlooGuard(
+            TokenBucket(rate=5 if paced else 0, burst=1),
+            QlooCircuitBreaker(failure_threshold=5, reset_timeout=30),
+            max_retries=10,
+            base_delay=0.05,
+            rng=random.Random(0),
+        )
+        results = run_calls(guard, calls=6)
+
+    assert len(results) == 6 and all(r["recommendations"] for r in results)
+    if paced:
+        # Pacing below the quota avoids throttling altogether
+        assert app.state.rate_limited == 0 and guard.retries == 0
+    else:
+        # Bursts are throttled, then retried after Retry-After until they pass
+        assert app.state.rate_limited > 0
+        assert guard.rate_limited == guard.retries == app.state.rate_limited
+    assert guard.breaker.state == CLOSED
+
+
+def test_breaker_opens_on_outage_and_closes_after_trial_success(clock):
+    sleeps, attempts = [], []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    guard = QlooGuard(
+        TokenBucket(rate=0, burst=1, clock=clock),
+        QlooCircuitBreaker(failure_threshold=3, reset_timeout=30, clock=clock),
+        max_retries=1,
+        sleep=sleep,
+        rng=random.Random(0),
+    )
+
+    async def down():
+        attempts.append(1)
+        raise QlooAPIError("Qloo API error (HTTP 503): unavailable", 503)
+
+    async def up():
+        return {"recommendations": []}
+
+    with pytest.raises(QlooAPIError, match=r"gave up after 2 attempt\(s\)"):
+        asyncio.run(guard.call("insights", down))
+    with pytest.raises(QlooAPIError):
+        asyncio.run(guard.call("insights", down))
+    assert guard.breaker.state == OPEN and len(attempts) == 3
+
+    # While open, calls fail fast without reaching the API
+    with pytest.raises(CircuitOpenError, match="try again in 30s"):
+        asyncio.run(guard.call("insights", down))
+    assert len(attempts) == 3 and len(sleeps) == 1
+
+    clock.now += 31
+    assert asyncio.run(guard.call("insights", up)) == {"recommendations": []}
+    assert guard.breaker.state == CLOSED
+
+
+def test_client_errors_are_not_retried_and_retry_after_pauses_bucket(clock):
+    calls = []
+
+    async def unauthorized():
+        calls.append(1)
+        raise QlooAPIError("Invalid Qloo API key.", 401)
+
+    guard = QlooGuard(TokenBucket(0, 1), QlooCircuitBreaker(3, 30))
+    with pytest.raises(QlooAPIError, match="Invalid Qloo API key.$"):
+        asyncio.run(guard.call("insights", unauthorized))
+    assert len(calls) == 1 and guard.breaker.failures == 0
+
+    assert retry_after_seconds({"retry-after": "2.5"}) == 2.5
+    assert retry_after_seconds({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0
+    assert retry_after_seconds({"retry-after": "soon"}) is None
+
+    bucket = TokenBucket(rate=2, burst=2, clock=clock)
+    assert bucket.reserve() == bucket.reserve() == 0
+    bucket.pause(5)
+    # Paused callers queue up behind the pause at the quota rate
+    assert [bucket.reserve() for _ in range(3)] == [5.5, 6.0, 6.5]
+
+
+def test_cancelled_trial_call_does_not_wedge_the_circuit(clock):
+    attempts = []
+
+    async def down():
+        raise QlooAPIError("Qloo API error (HTTP 503): unavailable", 503)
+
+    async def hang():
+        await asyncio.sleep(60)
+
+    async def up():
+        attempts.append(1)
+        return {"recommendations": []}
+
+    async def cancel(request):
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(guard.call("insights", request), 0.01)
+
+    guard = QlooGuard(
+        TokenBucket(rate=0, burst=1),
+        QlooCircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock),
+        max_retries=0,
+    )
+    # Cancelled once in flight, and once while still waiting for the bucket
+    for paused in (False, True):
+        with pytest.raises(QlooAPIError):
+            asyncio.run(guard.call("insights", down))
+        assert guard.breaker.state == OPEN
+
+        clock.now += 31  # The next call is the half-open trial
+        if paused:
+            guard.limiter.pause(60)
+        asyncio.run(cancel(hang))
+        # A cancelled trial says nothing about API health
+        assert guard.breaker.state == HALF_OPEN and guard.breaker.failures == 1
+        guard.limiter = TokenBucket(rate=0, burst=1)
+
+        assert asyncio.run(guard.call("insights", up)) == {"recommendations": []}
+    assert len(attempts) == 2 and guard.breaker.state == CLOSED
@@ -6,7 +6,13 @@ This package contains:
 - pdf: PDF generation utilities for research reports
 """
 
-from .demo import copilot_demo, stream_demo, run_agency_demo
+from .demo import copilot_demo, stream_demo, run_agency_demo, save_research_report
 from .pdf import save_research_to_pdf
 
-__all__ = ["copilot_demo", "stream_demo", "run_agency_demo", "save_research_to_pdf"]
+__all__ = [
+    "copilot_demo",
+    "stream_demo",
+    "run_agency_demo",
+    "save_research_report",
+    "save_research_to_pdf",
+]
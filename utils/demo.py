@@ -274,17 +274,44 @@ def copilot_demo(agency: Agency, save_pdf_func: Callable[[str, str], str] | None
         print("Install with: pip install agency-swarm[copilot]")
 
 
+def archive_research_report(response, query, pdf_path=None):
+    """Add the report's markdown, query and citations to the searchable archive."""
+    try:
+        # Lives with the MCP server, which serves it to agents; the agency
+        # entry points put mcp/ on the path
+        from report_archive import DEFAULT_ARCHIVE_PATH, ReportArchive
+    except ImportError:
+        print("\n⚠️ Report archive unavailable (mcp/ is not on the path); skipping")
+        return None
+
+    archive_path = os.getenv("REPORT_ARCHIVE_PATH", str(DEFAULT_ARCHIVE_PATH))
+    try:
+        archive = ReportArchive(archive_path)
+        try:
+            report_id = archive.add(str(response), query, pdf_path=pdf_path)
+        finally:
+            archive.close()
+        print(f"🗄️ Research report archived as #{report_id}")
+        return report_id
+    except Exception as e:
+        print(f"\n❌ Error archiving report: {e}")
+        return None
+
+
 def save_research_report(response, query, output_dir="reports"):
-    """Save response to PDF with error handling."""
+    """Save response to PDF and the report archive with error handling."""
     try:
         pdf_path = save_research_to_pdf(
             research_content=str(response), query=query, output_dir=output_dir
         )
         print(f"\n📄 Research report saved to: {pdf_path}")
-        return pdf_path
     except Exception as e:
         print(f"\n❌ Error saving PDF: {e}")
-        return None
+        pdf_path = None
+
+    # Archived even without a PDF, so the research is never lost
+    archive_research_report(response, query, pdf_path)
+    return pdf_path
 
 
 def run_agency_demo(agency: Agency):